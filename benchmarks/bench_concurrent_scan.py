@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""Benchmark the concurrent scanner against the serial one on a slow mount.
+
+Builds a synthetic targets/ tree and refreshes the scan manifest over it
+with every stat() and directory listing delayed by a fixed latency, as
+on an NFS/SMB mount: once cold (every directory listed) and once warm
+(one stat per directory), serially and at a few concurrency limits.
+
+Usage: python benchmarks/bench_concurrent_scan.py [files] [latency ms]
+"""
+import os
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import scan_manifest  # noqa: E402
+from scan_manifest import refresh_listing  # noqa: E402
+from synthetic_tree import build_tree  # noqa: E402
+
+CONCURRENCY_LEVELS = (None, 4, 16, 64)
+
+
+@contextmanager
+def simulated_latency(seconds):
+    """Delay os.stat() and the manifest's directory listings by seconds each."""
+    real_stat, real_list = os.stat, scan_manifest.list_directory
+
+    def slow_stat(*args, **kwargs):
+        time.sleep(seconds)
+        return real_stat(*args, **kwargs)
+
+    def slow_list(path):
+        time.sleep(seconds)
+        return real_list(path)
+
+    os.stat, scan_manifest.list_directory = slow_stat, slow_list
+    try:
+        yield
+    finally:
+        os.stat, scan_manifest.list_directory = real_stat, real_list
+
+
+def timed_refresh(manifest, concurrency):
+    start = time.perf_counter()
+    listing, rescanned = refresh_listing(manifest, 'targets', concurrency)
+    return time.perf_counter() - start, listing, rescanned
+
+
+def main():
+    total_files = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    latency = (float(sys.argv[2]) if len(sys.argv) > 2 else 2.0) / 1000
+    with tempfile.TemporaryDirectory() as tmp:
+        written = build_tree(tmp, total_files=total_files)
+        cwd = os.getcwd()
+        os.chdir(tmp)
+        try:
+            print(f"{written} files; {latency * 1000:.1f} ms per stat/listing")
+            expected = None
+            with simulated_latency(latency):
+                for concurrency in CONCURRENCY_LEVELS:
+                    manifest = {'dirs': {}, 'outputs': {}}
+                    cold, listing, rescanned = timed_refresh(manifest, concurrency)
+                    warm, warm_listing, _ = timed_refresh(manifest, concurrency)
+                    label = f'concurrency {concurrency}' if concurrency else 'serial'
+                    print(f"  {label:16} cold {cold * 1000:8.1f} ms  warm {warm * 1000:8.1f} ms  "
+                          f"({len(listing)} dirs)")
+                    result = (list(listing.items()), rescanned, list(warm_listing.items()))
+                    if expected is None:
+                        expected = result
+                    elif result != expected:
+                        print("  WARNING: listing differs from the serial scan")
+        finally:
+            os.chdir(cwd)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""Benchmark header probing of many image files.
+
+Writes a tree of synthetic PNG and JPEG files (default 5000) with real
+headers and trailers around a sparse payload, a few of them truncated,
+then probes them three ways:
+
+  read     - the old approach: open() and read() up to the frame header,
+             no validation
+  mmap     - image_probe.image_size(), mapped and validated, one thread
+  threads  - image_probe.probe_images() on its thread pool
+
+The files were just written, so they are in the page cache; the thread
+pool gains most when they are not (cold NFS/USB storage).
+
+Usage: python benchmarks/bench_probe.py [files] [payload KB]
+"""
+import argparse
+import os
+import random
+import struct
+import sys
+import tempfile
+import time
+import zlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from image_probe import (PNG_IEND, PNG_SIGNATURE, SOF_MARKERS, STANDALONE_MARKERS, image_size,  # noqa: E402
+                         probe_images)
+
+# One file in this many is truncated before its trailer
+TRUNCATED_EVERY = 50
+
+
+def png_bytes(width, height):
+    ihdr = struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)
+    chunk = struct.pack('>I', len(ihdr)) + b'IHDR' + ihdr + struct.pack('>I', zlib.crc32(b'IHDR' + ihdr))
+    return PNG_SIGNATURE + chunk + b'\x00\x00\x00\x00IDAT', PNG_IEND
+
+
+def jpeg_bytes(width, height):
+    app0 = b'\xff\xe0' + struct.pack('>H', 16) + b'JFIF\x00\x01\x01\x00\x00\x01\x00\x01\x00\x00'
+    sof = b'\xff\xc0' + struct.pack('>HBHHB', 17, 8, height, width, 3) + b'\x01\x22\x00\x02\x11\x01\x03\x11\x01'
+    sos = b'\xff\xda' + struct.pack('>H', 12) + b'\x03\x01\x00\x02\x11\x03\x11\x00\x3f\x00'
+    return b'\xff\xd8' + app0 + sof + sos, b'\xff\xd9'
+
+
+def write_files(root, count, payload, seed=1):
+    """count files under root, each header + sparse payload + trailer; returns their paths."""
+    rng = random.Random(seed)
+    paths = []
+    for i in range(count):
+        width, height = rng.randint(500, 4000), rng.randint(500, 4000)
+        ext = 'png' if i % 3 == 0 else 'jpg'
+        head, tail = png_bytes(width, height) if ext == 'png' else jpeg_bytes(width, height)
+        directory = os.path.join(root, f'target{i // 100:03d}')
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f'image{i:06d}.{ext}')
+        with open(path, 'wb') as f:
+            f.write(head)
+            # Sparse: the payload takes no disk space but is mapped like data
+            f.seek(payload, 1)
+            if i % TRUNCATED_EVERY:
+                f.write(tail)
+            else:
+                f.truncate()
+        paths.append(path)
+    return paths
+
+
+def legacy_image_size(path):
+    """The old image_probe.image_size(): sequential reads, no trailer check."""
+    with open(path, 'rb') as f:
+        start = f.read(8)
+        if start == PNG_SIGNATURE:
+            header = f.read(16)
+            if len(header) < 16 or header[4:8] != b'IHDR':
+                raise ValueError('PNG without IHDR chunk')
+            return struct.unpack('>II', header[8:16])
+        if start[:2] != b'\xff\xd8':
+            raise ValueError('not a PNG or JPEG file')
+        f.seek(2)
+        while True:
+            byte = f.read(1)
+            if not byte:
+                raise ValueError('JPEG ended before a frame header')
+            if byte != b'\xff':
+                continue
+            marker = f.read(1)
+            while marker == b'\xff':
+                marker = f.read(1)
+            code = marker[0]
+            if code in STANDALONE_MARKERS or code == 0x00:
+                continue
+            length = struct.unpack('>H', f.read(2))[0]
+            if code in SOF_MARKERS:
+                height, width = struct.unpack('>xHH', f.read(5))
+                return width, height
+            f.seek(length - 2, 1)
+
+
+def sequential(probe, paths):
+    results = {}
+    for path in paths:
+        try:
+            results[path] = probe(path)
+        except (OSError, ValueError) as e:
+            results[path] = e
+    return results
+
+
+def timed(func, repeat=3):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Time header probing of synthetic image files.')
+    parser.add_argument('files', type=int, nargs='?', default=5000, help='files to write (default 5000)')
+    parser.add_argument('payload_kb', type=int, nargs='?', default=1024, metavar='payload KB',
+                        help='sparse payload per file in KB (default 1024)')
+    args = parser.parse_args()
+    count = args.files
+    payload = args.payload_kb * 1024
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        paths = write_files(tmp, count, payload)
+        print(f"Wrote {count} files of ~{payload // 1024} KB in {time.perf_counter() - start:.1f}s")
+
+        runs = (
+            ('read', lambda: sequential(legacy_image_size, paths)),
+            ('mmap', lambda: sequential(image_size, paths)),
+            ('threads', lambda: probe_images(paths)),
+        )
+        for label, func in runs:
+            seconds, results = timed(func)
+            rejected = sum(isinstance(r, Exception) for r in results.values())
+            print(f"  {label:8} {seconds * 1000:8.1f} ms  {count / seconds:9.0f} files/s  "
+                  f"{rejected} rejected")
+
+
+if __name__ == '__main__':
+    main()
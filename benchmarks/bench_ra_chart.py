@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""Benchmark RA-hour bucketing and coordinate formatting for the RA chart.
+
+Lays out a synthetic catalog (default 100k objects) three ways:
+
+  loop    - the old approach: int(ra) % 24 per object, a lambda sort per
+            hour, and one format per object
+  python  - sky_catalog batch helpers without NumPy
+  numpy   - sky_catalog batch helpers with NumPy (lexsort, vectorized h/m/d),
+            whatever the size; the page only uses it from
+            sky_catalog.NUMPY_MIN_OBJECTS on
+
+Usage: python benchmarks/bench_ra_chart.py [objects]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import sky_catalog  # noqa: E402
+from sky_catalog import format_coordinates_batch, ra_hour_columns  # noqa: E402
+
+
+def synthetic_objects(count, seed=1):
+    rng = random.Random(seed)
+    return {i: {'ra': rng.uniform(0, 24), 'dec': rng.uniform(-90, 90)} for i in range(count)}
+
+
+def loop_layout(objects):
+    columns = {hour: [] for hour in range(24)}
+    for key, data in objects.items():
+        ra, dec = data['ra'], data['dec']
+        ra_h = int(ra)
+        ra_m = int((ra - ra_h) * 60)
+        dec_sign = '+' if dec >= 0 else ''
+        coords = f"RA {ra_h}h{ra_m}m, Dec {dec_sign}{int(dec)}°"
+        columns[ra_h % 24].append({'key': key, 'dec': dec, 'coords': coords})
+    for hour in columns:
+        columns[hour].sort(key=lambda x: x['dec'], reverse=True)
+    return [[obj['coords'] for obj in columns[hour]] for hour in range(24)]
+
+
+def batch_layout(objects):
+    keys = list(objects)
+    ra = [objects[k]['ra'] for k in keys]
+    dec = [objects[k]['dec'] for k in keys]
+    columns = ra_hour_columns(ra, dec)
+    coords = format_coordinates_batch(ra, dec)
+    return [[coords[i] for i in column] for column in columns]
+
+
+def timed(func, objects):
+    start = time.perf_counter()
+    result = func(objects)
+    return time.perf_counter() - start, result
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    objects = synthetic_objects(count)
+
+    loop_time, expected = timed(loop_layout, objects)
+    runs = [('loop', loop_time, expected)]
+
+    threshold = sky_catalog.NUMPY_MIN_OBJECTS
+    try:
+        sky_catalog.NUMPY_MIN_OBJECTS = float('inf')
+        runs.append(('python',) + timed(batch_layout, objects))
+        sky_catalog.NUMPY_MIN_OBJECTS = 0
+        if sky_catalog._numpy(count) is not None:
+            runs.append(('numpy',) + timed(batch_layout, objects))
+        else:
+            print("NumPy not installed; skipping the numpy run")
+    finally:
+        sky_catalog.NUMPY_MIN_OBJECTS = threshold
+
+    print(f"Laid out {count} objects in 24 RA columns")
+    for label, elapsed, result in runs:
+        status = '' if result == expected else '  MISMATCH'
+        print(f"  {label:7s} {elapsed * 1000:8.1f} ms{status}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""Benchmark streaming page rendering against building one big string.
+
+Renders the all-targets gallery for a synthetic catalog (default 10k
+targets) two ways and reports wall time and peak traced memory:
+
+  concat  - the old approach: html += fragment, then one f.write()
+  stream  - render_html() fragments written through site_output.write_page
+
+Usage: python benchmarks/bench_render.py [targets]
+"""
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from build_all_targets_gallery import render_html  # noqa: E402
+from discovery import CATEGORIES, Catalog, TargetImage, format_target_name  # noqa: E402
+from site_output import write_page  # noqa: E402
+
+
+def synthetic_catalog(count):
+    """A Catalog with count NGC/IC targets spread over the categories."""
+    targets = {}
+    categories = list(CATEGORIES.items())
+    for i in range(count):
+        name = f'ngc{i + 1}' if i % 2 else f'ic{i + 1}'
+        category, obj_type = categories[i % len(categories)]
+        path = f'targets/{category}/{name}/Stacked_{i % 900 + 1}_{name.upper()}_10.0s_IRCUT_20260110-200000.jpg'
+        targets[name] = TargetImage(name=name, path=path, type=obj_type, category=category,
+                                    display_name=format_target_name(name))
+    return Catalog(targets=targets, messier={})
+
+
+def concat_write(catalog, path):
+    html = ''
+    for fragment in render_html(catalog):
+        html += fragment
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(html)
+
+
+def stream_write(catalog, path):
+    write_page(path, render_html(catalog))
+
+
+def measure(func, catalog, path):
+    tracemalloc.start()
+    start = time.perf_counter()
+    func(catalog, path)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    catalog = synthetic_catalog(count)
+    with tempfile.TemporaryDirectory() as tmp:
+        concat_path = os.path.join(tmp, 'concat.html')
+        stream_path = os.path.join(tmp, 'stream.html')
+        concat_time, concat_peak = measure(concat_write, catalog, concat_path)
+        stream_time, stream_peak = measure(stream_write, catalog, stream_path)
+        with open(concat_path, 'rb') as a, open(stream_path, 'rb') as b:
+            identical = a.read() == b.read()
+        size = os.path.getsize(stream_path)
+
+    print(f"Rendered {count} targets ({size / 1024 / 1024:.1f} MB of HTML)")
+    print(f"  concat: {concat_time * 1000:8.1f} ms, peak {concat_peak / 1024 / 1024:6.1f} MB")
+    print(f"  stream: {stream_time * 1000:8.1f} ms, peak {stream_peak / 1024 / 1024:6.1f} MB")
+    if not identical:
+        print("  WARNING: outputs differ")
+
+
+if __name__ == '__main__':
+    main()
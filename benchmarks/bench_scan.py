@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""Benchmark find_all_target_images() against the old rglob-based scanner.
+
+Usage: python benchmarks/bench_scan.py [total_files]
+"""
+import os
+import re
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from discovery import find_all_target_images  # noqa: E402
+from synthetic_tree import build_tree  # noqa: E402
+
+
+def legacy_best_image(target_dir):
+    """The pre-index selection loop: four rglob walks plus exists() per hit."""
+    target_name = target_dir.name
+    best_image, best_priority, best_date = None, 999, ''
+
+    for png in target_dir.rglob('*.png'):
+        if '_thn.png' in str(png) or 'process' in str(png) or 'lights' in str(png):
+            continue
+        if not png.exists():
+            continue
+        match = re.search(r'(\w+)_(\d{4}-\d{2}-\d{2})\.png$', png.name, re.IGNORECASE)
+        if match and match.group(1).lower() in target_name.lower():
+            if best_priority > 1 or match.group(2) > best_date:
+                best_image, best_priority, best_date = str(png), 1, match.group(2)
+
+    if best_priority > 2:
+        for png in target_dir.rglob('*.png'):
+            if '_thn.png' in str(png) or 'process' in str(png) or 'lights' in str(png):
+                continue
+            if not png.exists():
+                continue
+            if png.stem.lower() == target_name.lower():
+                best_image, best_priority = str(png), 2
+                break
+            elif png.stem.lower() in target_name.lower() or target_name.lower() in png.stem.lower():
+                if best_priority > 2:
+                    best_image, best_priority = str(png), 2
+
+    if best_priority > 3:
+        for jpg in target_dir.rglob('*.jpg'):
+            if '_thn.jpg' in str(jpg) or 'process' in str(jpg) or 'lights' in str(jpg):
+                continue
+            if not jpg.exists():
+                continue
+            match = re.search(r'(\w+)_(\d{4}-\d{2}-\d{2})\.jpg$', jpg.name, re.IGNORECASE)
+            if match and match.group(1).lower() in target_name.lower():
+                if best_priority > 3 or match.group(2) > best_date:
+                    best_image, best_priority, best_date = str(jpg), 3, match.group(2)
+
+    if best_priority > 4:
+        max_stack = 0
+        for jpg in target_dir.rglob('Stacked_*.jpg'):
+            if '_thn.jpg' in str(jpg) or 'lights' in str(jpg):
+                continue
+            if not jpg.exists():
+                continue
+            stack_match = re.search(r'Stacked_(\d+)_', jpg.name)
+            if stack_match and int(stack_match.group(1)) > max_stack:
+                best_image, max_stack = str(jpg), int(stack_match.group(1))
+
+    return best_image
+
+
+def legacy_find_all_target_images():
+    found = {}
+    for category in ('galaxies', 'clusters', 'nebulae'):
+        category_path = Path('targets') / category
+        if not category_path.exists():
+            continue
+        for target_dir in sorted(category_path.iterdir()):
+            if target_dir.is_dir():
+                best = legacy_best_image(target_dir)
+                if best:
+                    found[target_dir.name] = best
+    return found
+
+
+def timed(func, repeat=3):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    total_files = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        written = build_tree(tmp, total_files=total_files)
+        print(f"Built synthetic tree: {written} files in {time.perf_counter() - start:.1f}s")
+
+        cwd = os.getcwd()
+        os.chdir(tmp)
+        try:
+            old_time, old_result = timed(legacy_find_all_target_images)
+            new_time, new_result = timed(find_all_target_images)
+        finally:
+            os.chdir(cwd)
+
+    new_paths = {name: info.path for name, info in new_result.items()}
+    print(f"  rglob scanner:   {old_time * 1000:8.1f} ms ({len(old_result)} targets)")
+    print(f"  scandir index:   {new_time * 1000:8.1f} ms ({len(new_result)} targets)")
+    print(f"  speedup:         {old_time / new_time:8.1f}x")
+    if new_paths != old_result:
+        print("  WARNING: selections differ between scanners")
+
+
+if __name__ == '__main__':
+    main()
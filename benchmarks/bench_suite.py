@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""Benchmark suite: discovery and page generation on synthetic trees.
+
+For each tree size builds a synthetic targets/ tree (see synthetic_tree.py,
+with real image headers) and times, best of --repeat runs after one
+untimed warm-up (lazy catalog loads, first-use imports):
+
+  build_listing            one walk of targets/
+  find_messier_images      straight from disk
+  find_all_target_images   straight from disk
+  discover                 the whole pipeline from a listing, warm caches
+  generate_html            each page rendered from the discovered catalog
+  generate_ra_chart_html
+
+Each run is appended to --json FILE as one JSON line and compared with the
+previous run in that file, so regressions show up as ratios.
+
+Usage: python benchmarks/bench_suite.py [--sizes 100,1000,10000] [--repeat N]
+                                        [--json FILE]
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import build_all_targets_gallery  # noqa: E402
+import build_messier_gallery  # noqa: E402
+import build_messier_ra_chart  # noqa: E402
+from discovery import discover, find_all_target_images, find_messier_images  # noqa: E402
+from synthetic_tree import build_tree  # noqa: E402
+from target_scan import build_listing  # noqa: E402
+
+SUITE_VERSION = 1
+DEFAULT_SIZES = (100, 1_000, 10_000, 100_000)
+RESULTS_FILE = 'bench_results.jsonl'
+
+# Ratios beyond this are flagged when comparing with the previous run
+REGRESSION_RATIO = 1.2
+
+
+def targets_for(total_files):
+    """Target directories for a tree of total_files: ~100 files each, at most 3000."""
+    return min(3000, max(12, total_files // 100))
+
+
+def timed(func, repeat):
+    func()
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def run_size(total_files, repeat):
+    """Build one tree and time every benchmark on it; returns its result dict."""
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        written = build_tree(tmp, total_files=total_files, targets=targets_for(total_files), headers=True)
+        built = time.perf_counter() - start
+        print(f"{written} files ({built:.1f}s to build)")
+
+        cwd = os.getcwd()
+        os.chdir(tmp)
+        try:
+            timings = {}
+
+            def bench(name, func):
+                seconds, result = timed(func, repeat)
+                timings[name] = seconds
+                print(f"  {name:46} {seconds * 1000:10.1f} ms")
+                return result
+
+            listing = bench('build_listing', lambda: build_listing('targets'))
+            messier = bench('find_messier_images', find_messier_images)
+            targets = bench('find_all_target_images', find_all_target_images)
+            # The warm-up call fills the dedup and metadata caches in tmp
+            catalog = bench('discover', lambda: discover(listing))
+            bench('build_messier_gallery.generate_html',
+                  lambda: build_messier_gallery.generate_html(catalog))
+            bench('build_all_targets_gallery.generate_html',
+                  lambda: build_all_targets_gallery.generate_html(catalog))
+            bench('build_messier_ra_chart.generate_ra_chart_html',
+                  lambda: build_messier_ra_chart.generate_ra_chart_html(catalog))
+        finally:
+            os.chdir(cwd)
+
+    return {
+        'files': written,
+        'directories': len(listing),
+        'targets': len(targets),
+        'messier': len(messier),
+        'rejected': len(catalog.rejected),
+        'build_seconds': built,
+        'timings': timings,
+    }
+
+
+def git_revision():
+    """Short commit hash of the checkout being benchmarked, if it is a git repo."""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def load_previous(path):
+    """The last run recorded in path, or None."""
+    try:
+        with open(path) as f:
+            lines = [line for line in f if line.strip()]
+    except OSError:
+        return None
+    return json.loads(lines[-1]) if lines else None
+
+
+def compare(previous, current):
+    """Print current/previous timing ratios for every benchmark both runs have."""
+    print(f"\nCompared with {previous.get('revision') or 'previous run'} ({previous['started']}):")
+    for size, result in current['sizes'].items():
+        old = previous['sizes'].get(size)
+        if old is None:
+            continue
+        for name, seconds in result['timings'].items():
+            before = old['timings'].get(name)
+            if not before:
+                continue
+            ratio = seconds / before
+            flag = '  <- slower' if ratio > REGRESSION_RATIO else ''
+            print(f"  {size:>8} {name:46} {ratio:6.2f}x{flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Time discovery and page generation on synthetic trees.')
+    parser.add_argument('--sizes', default=','.join(str(n) for n in DEFAULT_SIZES),
+                        help='comma-separated tree sizes in files (up to 1000000)')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per benchmark; the best is kept')
+    parser.add_argument('--json', default=RESULTS_FILE, metavar='FILE',
+                        help=f'append the run to FILE and compare with its last run (default {RESULTS_FILE})')
+    args = parser.parse_args()
+
+    run = {
+        'version': SUITE_VERSION,
+        'started': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'repeat': args.repeat,
+        'sizes': {},
+    }
+    for total_files in (int(size) for size in args.sizes.split(',')):
+        run['sizes'][str(total_files)] = run_size(total_files, args.repeat)
+
+    previous = load_previous(args.json)
+    with open(args.json, 'a') as f:
+        f.write(json.dumps(run) + '\n')
+    print(f"\nResults appended to {args.json}")
+    if previous is not None and previous.get('version') == SUITE_VERSION:
+        compare(previous, run)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""Generate synthetic targets/ trees that mimic the real Seestar layout.
+
+Files are created empty by default; the scanners only look at names and
+directory structure, so content is irrelevant for timing them.  With
+headers=True the stacks and processed PNGs are written as tiny but valid
+images of distinct sizes, so the full discover() pipeline (duplicate
+hashing, header validation, metadata) treats them like real files.
+"""
+import os
+import random
+import struct
+import zlib
+
+CATEGORIES = ('galaxies', 'clusters', 'nebulae')
+FILTERS = ('IRCUT', 'LP')
+
+
+def _touch(path, content=b''):
+    with open(path, 'wb') as f:
+        f.write(content)
+
+
+def _png_chunk(tag, data):
+    return struct.pack('>I', len(data)) + tag + data + struct.pack('>I', zlib.crc32(tag + data))
+
+
+def image_bytes(ext, width, height):
+    """A minimal well-formed PNG or JPEG (header, frame size, trailer) with no pixels."""
+    if ext == 'png':
+        ihdr = struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)
+        return (b'\x89PNG\r\n\x1a\n' + _png_chunk(b'IHDR', ihdr)
+                + _png_chunk(b'IDAT', b'') + _png_chunk(b'IEND', b''))
+    sof = b'\xff\xc0' + struct.pack('>HBHHB', 17, 8, height, width, 3) + b'\x01\x22\x00\x02\x11\x01\x03\x11\x01'
+    return b'\xff\xd8' + sof + b'\xff\xd9'
+
+
+def _target_names(count):
+    """Target directory names: Messier first, then NGC/IC/Caldwell."""
+    names = [f'm{n}' for n in range(1, 111)]
+    n = 1
+    while len(names) < count:
+        names.extend((f'ngc{n}', f'ic{n}', f'c{n}'))
+        n += 1
+    return names[:count]
+
+
+def _designation(target):
+    """Object designation as the Seestar writes it into file names."""
+    for prefix, label in (('ngc', 'NGC '), ('ic', 'IC '), ('m', 'M '), ('c', 'C ')):
+        if target.startswith(prefix):
+            return label + target[len(prefix):]
+    return target
+
+
+def build_tree(root, total_files=100_000, targets=300, seed=1, headers=False):
+    """Create a synthetic tree under root/targets with ~total_files files.
+
+    Each target gets a couple of dated night folders holding Stacked_*.jpg
+    results, _thn thumbnails, an occasional processed PNG, and a lights/
+    folder that takes the bulk of the file budget as raw subframes.  Small
+    trees get fewer targets, so every target keeps some lights.  With
+    headers the selectable images get real content (see image_bytes).
+    Returns the number of files written.
+    """
+    rng = random.Random(seed)
+    base = os.path.join(root, 'targets')
+    names = _target_names(max(1, min(targets, total_files // 8)))
+    per_target = max(1, total_files // len(names))
+    written = 0
+
+    def write_image(path, ext):
+        # Distinct frame sizes keep the files distinct for duplicate detection
+        content = image_bytes(ext, 1000 + written % 3000, 1000 + written // 3000) if headers else b''
+        _touch(path, content)
+
+    for i, target in enumerate(names):
+        category = CATEGORIES[i % len(CATEGORIES)]
+        target_dir = os.path.join(base, category, target)
+        obj = _designation(target)
+        budget = per_target
+
+        for night in range(2):
+            date = f'2026-01-{10 + night:02d}'
+            stamp = date.replace('-', '') + f'-2{night}0000'
+            night_dir = os.path.join(target_dir, date, obj.replace(' ', ''))
+            os.makedirs(night_dir, exist_ok=True)
+            filt = rng.choice(FILTERS)
+            stack = rng.randint(1, 900)
+            stem = f'Stacked_{stack}_{obj}_10.0s_{filt}_{stamp}'
+            write_image(os.path.join(night_dir, stem + '.jpg'), 'jpg')
+            _touch(os.path.join(night_dir, stem + '_thn.jpg'))
+            written += 2
+            budget -= 2
+
+        if i % 4 == 0:
+            write_image(os.path.join(target_dir, f'{target}_2026-01-2{i % 10}.png'), 'png')
+            written += 1
+            budget -= 1
+
+        lights = os.path.join(target_dir, '2026-01-10', 'lights')
+        os.makedirs(lights, exist_ok=True)
+        for n in range(max(0, budget)):
+            _touch(os.path.join(lights, f'Light_{obj}_10.0s_IRCUT_20260110-{n:06d}.fit'))
+        written += max(0, budget)
+
+    return written
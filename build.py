@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""Build every gallery page from a single scan of targets/.
+
+Usage: python build.py [--force] [--workers N] [--variants 320,640,1280]
+                      [--changed-list FILE] [--watch [--debounce SECONDS]] [--feed]
+                      [--compress] [--concurrency N] [--weights NAME=VALUE,...]
+                      [--profile [--profile-json FILE] [--profile-pstats DIR]]
+
+The scan manifest is refreshed once, discovery runs once, and all pages
+are rendered from that one in-memory Catalog.  Pages whose inputs did not
+change since they were last built are left untouched unless --force, and
+a re-rendered page only replaces the old file if its content differs.
+
+With --watch the build keeps running: filesystem events (inotify, or
+polling elsewhere) are debounced, and only the pages whose selected
+images changed are re-rendered.
+
+With --feed the pages that can grow with the catalog (all targets, RA
+chart) are written as a thin shell plus a JSON feed that the browser
+renders windowed; see virtual_feed.py.
+
+With --compress pages are minified as they are written, and every HTML,
+CSS, JS and JSON output gets .gz/.br siblings for static serving; see
+precompress.py.
+
+With --concurrency the directory listings and stat calls of the scan run
+that many at a time, for targets/ on a network mount; see
+concurrent_scan.py.
+
+With --weights the image selection weights are overridden, e.g.
+tier=0 to let a newer or longer stack beat an older processed image;
+see target_scan.best_candidate.
+
+With --profile the build reports wall/CPU time, counts and bytes per
+phase; see profiling.py.
+"""
+import build_all_targets_gallery
+import build_messier_gallery
+import build_messier_ra_chart
+import pages
+from concurrent_scan import DEFAULT_CONCURRENCY
+from dedup import report_duplicates
+from discovery import discover
+from precompress import compress_outputs, remove_stale_siblings, report_sizes, written_siblings
+from profiling import profiler_from_args, timed_phase, write_profiled
+from scan_manifest import (output_is_current, record_output, recorded_files, refresh_listing, save_manifest,
+                           scan_targets)
+from site_assets import write_assets
+from site_output import minify_html, report_changes
+from thumbnails import VARIANT_WIDTHS, add_derivatives
+from virtual_feed import feed_fragments, feed_path
+from watch import make_watcher, wait_for_batch
+
+# Output file -> (generator module, render function, Catalog field it shows)
+PAGES = {
+    'messier_catalog.html': (build_messier_gallery, build_messier_gallery.render_html, 'messier'),
+    'messier_ra_chart.html': (build_messier_ra_chart, build_messier_ra_chart.render_ra_chart_html, 'messier'),
+    'all_targets.html': (build_all_targets_gallery, build_all_targets_gallery.render_html, 'targets'),
+}
+
+# Pages with a feed mode: output -> (feed render function, shell render function)
+FEEDS = {
+    'messier_ra_chart.html': (build_messier_ra_chart.render_feed, build_messier_ra_chart.render_shell_html),
+    'all_targets.html': (build_all_targets_gallery.render_feed, build_all_targets_gallery.render_shell_html),
+}
+
+
+def report_rejected(catalog):
+    """Print the selected images that failed validation and were passed over."""
+    for path, reason in sorted(catalog.rejected.items()):
+        print(f"Skipping corrupt image {path}: {reason}")
+
+
+def page_state(manifest, listing, output, files, feed=False, compress=False, weights=None,
+               widths=VARIANT_WIDTHS):
+    """pages.page_state() of one of PAGES."""
+    return pages.page_state(manifest, listing, PAGES[output][0].__file__, files, weights,
+                            feed and output in FEEDS, compress, widths)
+
+
+def render_pages(manifest, listing, catalog, outputs, feed=False, compress=False, workers=None,
+                 profiler=None, weights=None, widths=VARIANT_WIDTHS):
+    """Write the given pages from catalog; return the files changed or removed.
+
+    With feed, pages in FEEDS are written as a shell plus their JSON feed.
+    With compress, pages are minified and all outputs precompressed.
+    Compressed siblings older than their page are removed either way.
+    """
+    with timed_phase(profiler, 'writing'):
+        results = write_assets()
+    minified = {}
+
+    def page(output, fragments):
+        if compress:
+            fragments = minify_html(fragments, minified.setdefault(output, {}))
+        results[output] = write_profiled(profiler, output, fragments)
+
+    for output in outputs:
+        _, render, _ = PAGES[output]
+        if feed and output in FEEDS:
+            render_feed, render_shell = FEEDS[output]
+            data_file = feed_path(output)
+            results[data_file] = write_profiled(profiler, data_file, feed_fragments(render_feed(catalog)))
+            page(output, render_shell(catalog, data_file))
+        else:
+            page(output, render(catalog))
+        state = page_state(manifest, listing, output, catalog.section_files(PAGES[output][2]), feed, compress, weights, widths)
+        record_output(manifest, output, state)
+    save_manifest(manifest)
+    compressed = []
+    if compress:
+        with timed_phase(profiler, 'compress') as phase:
+            compressed = compress_outputs(results, workers=workers)
+            phase.count('files', len(compressed))
+            phase.count('bytes', sum(size for _, size, _, _, _ in compressed))
+        results.update(dict.fromkeys(written_siblings(compressed), True))
+    # Siblings left from an earlier --compress build would be served instead of the new page
+    removed = remove_stale_siblings(results)
+    changed = report_changes(results)
+    for path in removed:
+        print(f"  removed:   {path}")
+    report_sizes(compressed, minified)
+    return changed + removed
+
+
+def build(force=False, workers=None, widths=VARIANT_WIDTHS, feed=False, compress=False, concurrency=None,
+          profiler=None, weights=None):
+    """Render all pages from one discovery pass; return the files whose content changed.
+
+    weights override target_scan.DEFAULT_WEIGHTS for image selection.
+    """
+    with timed_phase(profiler, 'discovery') as phase:
+        manifest, listing, rescanned = scan_targets(concurrency=concurrency)
+        phase.count('dirs', len(listing))
+        phase.count('rescanned', len(rescanned))
+
+    stale = []
+    for output in PAGES:
+        # The files the page was last built from, restat()ed: catches in-place
+        # rewrites and deleted thumbnails
+        files = recorded_files(manifest, output)
+        state = page_state(manifest, listing, output, files, feed, compress, weights, widths)
+        if force or not output_is_current(manifest, output, state):
+            stale.append(output)
+
+    if not stale:
+        # Assets are written only when missing, so a deleted one still comes back
+        restored = report_changes({path: True for path, written in write_assets().items() if written})
+        print("No changes under targets/, all pages left untouched")
+        return restored
+
+    catalog = discover(listing, rescanned, weights, concurrency=concurrency, profiler=profiler)
+    with timed_phase(profiler, 'thumbnails') as phase:
+        add_derivatives(catalog, workers=workers, widths=widths)
+        phase.count('sources', len(catalog.thumbnails))
+    print(f"{len(rescanned)} directories rescanned, "
+          f"{len(catalog.targets)} targets, {len(catalog.messier)} of 110 Messier objects captured")
+    report_duplicates(catalog.duplicates)
+    report_rejected(catalog)
+    return render_pages(manifest, listing, catalog, stale, feed, compress, workers, profiler, weights, widths)
+
+
+def affected_pages(old, new, changed_paths):
+    """Pages whose catalog section differs, or whose shown images were rewritten."""
+    pages = []
+    for output, (_, _, section) in PAGES.items():
+        before, after = getattr(old, section), getattr(new, section)
+        if before != after or changed_paths.intersection(new.section_files(section)):
+            pages.append(output)
+    return pages
+
+
+def watch(workers=None, widths=VARIANT_WIDTHS, debounce=2.0, poll_interval=2.0, feed=False,
+          compress=False, concurrency=None, weights=None):
+    """Build once, then rebuild affected pages whenever targets/ changes.
+
+    The scan manifest and Catalog stay in memory between rebuilds; each
+    change only re-lists directories whose mtime moved.
+    """
+    manifest, listing, rescanned = scan_targets(concurrency=concurrency)
+    catalog = discover(listing, rescanned, weights, concurrency=concurrency)
+    add_derivatives(catalog, workers=workers, widths=widths)
+    report_duplicates(catalog.duplicates)
+    report_rejected(catalog)
+    render_pages(manifest, listing, catalog, list(PAGES), feed, compress, workers, weights=weights, widths=widths)
+
+    watcher = make_watcher(poll_interval)
+    watcher.watch_dirs(listing)
+    print(f"Watching targets/ with {type(watcher).__name__} (Ctrl-C to stop)")
+    try:
+        while True:
+            changed_paths = wait_for_batch(watcher, debounce)
+            listing, rescanned = refresh_listing(manifest, concurrency=concurrency)
+            watcher.watch_dirs(listing)
+
+            # Rewritten images are probed again: the metadata cache checks size and mtime
+            new_catalog = discover(listing, rescanned, weights, concurrency=concurrency)
+            report_rejected(new_catalog)
+            outputs = affected_pages(catalog, new_catalog, changed_paths)
+            catalog = new_catalog
+            if not outputs:
+                save_manifest(manifest)
+                continue
+
+            print(f"\n{len(rescanned)} directories rescanned; rebuilding {', '.join(outputs)}")
+            add_derivatives(catalog, workers=workers, widths=widths)
+            render_pages(manifest, listing, catalog, outputs, feed, compress, workers, weights=weights,
+                         widths=widths)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+
+
+def write_changed_list(path, changed):
+    """Write changed page paths one per line, for downstream sync / cache purges."""
+    with open(path, 'w') as f:
+        f.writelines(f'{page}\n' for page in changed)
+
+
+if __name__ == '__main__':
+    parser = pages.generator_parser(__doc__.splitlines()[0])
+    parser.add_argument('--workers', type=int, default=None,
+                        help='image encoding and compression processes (default: one per usable CPU)')
+    parser.add_argument('--variants', default=','.join(map(str, VARIANT_WIDTHS)),
+                        help='comma-separated srcset widths for gallery cards (default: %(default)s)')
+    parser.add_argument('--changed-list', metavar='FILE',
+                        help='write the files whose content changed to FILE, one per line, '
+                             'including rewritten and removed .gz/.br siblings')
+    parser.add_argument('--watch', action='store_true',
+                        help='keep running and rebuild affected pages as targets/ changes')
+    parser.add_argument('--debounce', type=float, default=2.0,
+                        help='seconds of quiet before a watch rebuild (default: %(default)s)')
+    parser.add_argument('--feed', action='store_true',
+                        help='write the all-targets and RA chart pages as a shell plus a JSON feed '
+                             'rendered windowed in the browser')
+    parser.add_argument('--compress', action='store_true',
+                        help='minify pages and write .gz/.br siblings of every HTML, CSS, JS and JSON output')
+    parser.add_argument('--concurrency', type=int, default=None, metavar='N',
+                        help='run N directory listings / stat calls at a time, for targets/ on a '
+                             f'network mount (default: one at a time; {DEFAULT_CONCURRENCY} suits NFS)')
+    args = parser.parse_args()
+    widths = tuple(int(w) for w in args.variants.split(',') if w.strip())
+    if args.watch:
+        watch(workers=args.workers, widths=widths, debounce=args.debounce, feed=args.feed,
+              compress=args.compress, concurrency=args.concurrency, weights=args.weights)
+    else:
+        profiler = profiler_from_args(args)
+        changed = build(force=args.force, workers=args.workers, widths=widths, feed=args.feed,
+                        compress=args.compress, concurrency=args.concurrency, profiler=profiler,
+                        weights=args.weights)
+        if args.changed_list:
+            write_changed_list(args.changed_list, changed)
+        if profiler is not None:
+            profiler.finish(args.profile_json)
@@ -1,157 +1,109 @@
 #!/usr/bin/env python3
 import os
 import re
+import sys
 from pathlib import Path
 from urllib.parse import quote
 
-def find_all_target_images():
-    """Find the best image for each target across all categories."""
-    target_images = {}
-
-    # Define target categories
-    categories = {
-        'galaxies': 'Galaxy',
-        'clusters': 'Cluster',
-        'nebulae': 'Nebula'
-    }
-
-    for category, obj_type in categories.items():
-        category_path = Path('targets') / category
-        if not category_path.exists():
-            continue
-
-        # Get all target directories
-        for target_dir in sorted(category_path.iterdir()):
-            if not target_dir.is_dir():
-                continue
-
-            target_name = target_dir.name
-            best_image = None
-            best_priority = 999
-            best_date = ''
-
-            # Priority 1: Dated PNG files (name_YYYY-MM-DD.png)
-            for png in target_dir.rglob('*.png'):
-                # Skip thumbnails and intermediate files
-                if '_thn.png' in str(png) or 'process' in str(png) or 'lights' in str(png):
-                    continue
-
-                # Skip broken symlinks
-                if not png.exists():
-                    continue
-
-                # Match dated pattern: targetname_YYYY-MM-DD.png
-                match = re.search(r'(\w+)_(\d{4}-\d{2}-\d{2})\.png$', png.name, re.IGNORECASE)
-                if match and match.group(1).lower() in target_name.lower():
-                    date_str = match.group(2)
-                    if best_priority > 1 or (best_priority == 1 and date_str > best_date):
-                        best_image = str(png)
-                        best_priority = 1
-                        best_date = date_str
-
-            # Priority 2: Undated PNG files (targetname.png)
-            if best_priority > 2:
-                for png in target_dir.rglob('*.png'):
-                    if '_thn.png' in str(png) or 'process' in str(png) or 'lights' in str(png):
-                        continue
-
-                    # Skip broken symlinks
-                    if not png.exists():
-                        continue
-
-                    # Prefer exact match first
-                    if png.stem.lower() == target_name.lower():
-                        best_image = str(png)
-                        best_priority = 2
-                        best_date = ''
-                        break
-                    # Then partial match
-                    elif png.stem.lower() in target_name.lower() or target_name.lower() in png.stem.lower():
-                        if best_priority > 2:
-                            best_image = str(png)
-                            best_priority = 2
-                            best_date = ''
-
-            # Priority 3: Dated JPG files (name_YYYY-MM-DD.jpg)
-            if best_priority > 3:
-                for jpg in target_dir.rglob('*.jpg'):
-                    # Skip thumbnails and intermediate files
-                    if '_thn.jpg' in str(jpg) or 'process' in str(jpg) or 'lights' in str(jpg):
-                        continue
-
-                    # Skip broken symlinks
-                    if not jpg.exists():
-                        continue
-
-                    # Match dated pattern: targetname_YYYY-MM-DD.jpg
-                    match = re.search(r'(\w+)_(\d{4}-\d{2}-\d{2})\.jpg$', jpg.name, re.IGNORECASE)
-                    if match and match.group(1).lower() in target_name.lower():
-                        date_str = match.group(2)
-                        if best_priority > 3 or (best_priority == 3 and date_str > best_date):
-                            best_image = str(jpg)
-                            best_priority = 3
-                            best_date = date_str
-
-            # Priority 4: Stacked JPG files (highest stack count)
-            if best_priority > 4:
-                max_stack = 0
-                for jpg in target_dir.rglob('Stacked_*.jpg'):
-                    if '_thn.jpg' in str(jpg) or 'lights' in str(jpg):
-                        continue
-
-                    # Skip broken symlinks
-                    if not jpg.exists():
-                        continue
-
-                    stack_match = re.search(r'Stacked_(\d+)_', jpg.name)
-                    if stack_match:
-                        stack_count = int(stack_match.group(1))
-                        if stack_count > max_stack:
-                            best_image = str(jpg)
-                            best_priority = 4
-                            max_stack = stack_count
-
-            if best_image:
-                target_images[target_name] = {
-                    'path': best_image,
-                    'type': obj_type,
-                    'category': category,
-                    'display_name': format_target_name(target_name)
-                }
-
-    return target_images
-
-def format_target_name(name):
-    """Format target name for display."""
-    # Handle Messier objects
-    if name.lower().startswith('m') and name[1:].split('_')[0].isdigit():
-        m_num = name[1:].split('_')[0]
-        return f'M{m_num}'
-
-    # Handle NGC objects
-    if 'ngc' in name.lower():
-        ngc_match = re.search(r'ngc(\d+)', name, re.IGNORECASE)
-        if ngc_match:
-            return f'NGC {ngc_match.group(1)}'
-
-    # Handle IC objects
-    if 'ic' in name.lower():
-        ic_match = re.search(r'ic(\d+)', name, re.IGNORECASE)
-        if ic_match:
-            return f'IC {ic_match.group(1)}'
-
-    # Handle Caldwell objects
-    if name.lower().startswith('c') and name[1:].split('_')[0].isdigit():
-        c_num = name[1:].split('_')[0]
-        return f'C{c_num}'
-
-    # Otherwise, title case with underscores replaced by spaces
-    return name.replace('_', ' ').title()
+from discovery import discover
+from pages import generator_parser, page_state
+from precompress import remove_stale_siblings
+from profiling import profiler_from_args, timed_phase, write_profiled
+from scan_manifest import output_is_current, record_output, recorded_files, save_manifest, scan_targets
+from search_index import build_index, card_tokens, search_index_html
+from site_assets import MODAL_HTML, SITE_CSS, SITE_SCRIPT_TAG, minify_css, write_assets
+from sky_catalog import format_coordinates
+from thumbnails import add_derivatives
+
+# Rendered width of a .target-image: full width on phones, else one grid column
+CARD_SIZES = '(max-width: 480px) 100vw, 300px'
+
+# Page-specific styles; the shared ones are in site_assets
+PAGE_CSS = minify_css("""
+.category-section {
+    margin-bottom: 40px;
+}
+.category-header {
+    font-size: 1.8em;
+    margin-bottom: 15px;
+    padding: 10px;
+    background: #1a1a1a;
+    border-left: 4px solid #4a9eff;
+}
+.target-grid {
+    display: grid;
+    grid-template-columns: repeat(auto-fill, minmax(200px, 1fr));
+    gap: 15px;
+    margin-bottom: 30px;
+}
+.target-card {
+    background: #1a1a1a;
+    border: 2px solid #333;
+    border-radius: 8px;
+    padding: 10px;
+    cursor: pointer;
+    transition: all 0.2s;
+}
+.target-card:hover {
+    border-color: #4a9eff;
+    transform: scale(1.02);
+}
+.target-name {
+    font-weight: bold;
+    color: #4a9eff;
+    margin-bottom: 5px;
+    text-align: center;
+}
+.target-type {
+    font-size: 0.8em;
+    color: #888;
+    text-align: center;
+    margin-bottom: 8px;
+}
+.target-coords {
+    font-size: 0.75em;
+    color: #666;
+    text-align: center;
+    margin: -4px 0 8px;
+}
+.target-capture {
+    font-size: 0.75em;
+    color: #888;
+    text-align: center;
+    margin: -4px 0 8px;
+}
+.target-image {
+    width: 100%;
+    height: 180px;
+    object-fit: cover;
+    border-radius: 4px;
+}
+""")
+
+# Feed mode: card fields in the JSON feed, and the fixed geometry the
+# windowed grid lays cards out with (matching .target-grid)
+FEED_FIELDS = ('name', 'display_name', 'type', 'coords', 'path', 'thumb', 'srcset', 'width', 'height', 'capture')
+CARD_MIN_WIDTH = 200
+CARD_HEIGHT = 290
+GRID_GAP = 15
+HEADER_HEIGHT = 90
+
+FEED_CSS = minify_css(f"""
+.target-list .target-card {{
+    height: {CARD_HEIGHT}px;
+    box-sizing: border-box;
+    overflow: hidden;
+}}
+.target-row {{
+    display: grid;
+    gap: {GRID_GAP}px;
+}}
+""")
 
 def sort_key_numeric(item):
     """Sort key that handles numeric catalog numbers properly."""
     name, info = item
-    display_name = info['display_name']
+    display_name = info.display_name
 
     # Extract numeric part for Caldwell objects (C comes first alphabetically)
     if display_name.startswith('C') and len(display_name) > 1:
@@ -180,291 +132,268 @@ def sort_key_numeric(item):
     # Everything else sorts alphabetically after catalogs
     return (4, 0, display_name)
 
-def generate_html():
-    """Generate HTML for all targets gallery."""
-    targets = find_all_target_images()
+# Category directory -> (section title, card data-type, fallback type label)
+SECTIONS = (
+    ('galaxies', 'Galaxies', 'galaxy', 'Galaxy'),
+    ('clusters', 'Clusters', 'cluster', 'Cluster'),
+    ('nebulae', 'Nebulae', 'nebula', 'Nebula'),
+)
 
-    # Group by category
-    galaxies = {k: v for k, v in targets.items() if v['category'] == 'galaxies'}
-    clusters = {k: v for k, v in targets.items() if v['category'] == 'clusters'}
-    nebulae = {k: v for k, v in targets.items() if v['category'] == 'nebulae'}
+def card_type(info, category_type):
+    """Catalog object type for a card, falling back to the category's type."""
+    return info.sky.type_label if info.sky else category_type
 
-    total_count = len(targets)
 
-    html = f"""<!DOCTYPE html>
+def coords_line(info):
+    """Coordinates <div> for a card, or '' for targets not in the sky catalog."""
+    if info.sky is None:
+        return ''
+    return f"""
+                <div class="target-coords">{format_coordinates(info.sky.ra, info.sky.dec)}</div>"""
+
+
+def capture_line(catalog, info):
+    """Capture details <div> for a card, or '' when nothing is known."""
+    details = catalog.capture_details(info.path)
+    if not details:
+        return ''
+    return f"""
+                <div class="target-capture">{details}</div>"""
+
+
+def search_tokens(name, info, data_type, category_type):
+    """Search index tokens for a card: directory name, display name, types, constellation."""
+    texts = [name, info.display_name, data_type, card_type(info, category_type)]
+    if info.sky is not None:
+        texts += [info.sky.constellation, info.sky.constellation_name]
+    return card_tokens(*texts)
+
+
+def page_head(total_count, extra_css=''):
+    """Page start through the stats line; extra_css is added to the stylesheet."""
+    return f"""<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>All Targets Gallery</title>
-    <style>
-        body {{
-            font-family: Arial, sans-serif;
-            background: #000;
-            color: #fff;
-            margin: 0;
-            padding: 20px;
-        }}
-        h1 {{
-            text-align: center;
-            margin-bottom: 10px;
-        }}
-        .filter-box {{
-            text-align: center;
-            margin-bottom: 15px;
-        }}
-        .filter-box input {{
-            padding: 10px;
-            width: 300px;
-            font-size: 16px;
-            border: 2px solid #4a9eff;
-            border-radius: 5px;
-            background: #1a1a1a;
-            color: #fff;
-        }}
-        .filter-box input:focus {{
-            outline: none;
-            border-color: #6bb6ff;
-        }}
-        .stats {{
-            text-align: center;
-            margin-bottom: 20px;
-            font-size: 1.2em;
-        }}
-        .category-section {{
-            margin-bottom: 40px;
-        }}
-        .category-header {{
-            font-size: 1.8em;
-            margin-bottom: 15px;
-            padding: 10px;
-            background: #1a1a1a;
-            border-left: 4px solid #4a9eff;
-        }}
-        .target-grid {{
-            display: grid;
-            grid-template-columns: repeat(auto-fill, minmax(200px, 1fr));
-            gap: 15px;
-            margin-bottom: 30px;
-        }}
-        .target-card {{
-            background: #1a1a1a;
-            border: 2px solid #333;
-            border-radius: 8px;
-            padding: 10px;
-            cursor: pointer;
-            transition: all 0.2s;
-        }}
-        .target-card:hover {{
-            border-color: #4a9eff;
-            transform: scale(1.02);
-        }}
-        .target-name {{
-            font-weight: bold;
-            color: #4a9eff;
-            margin-bottom: 5px;
-            text-align: center;
-        }}
-        .target-type {{
-            font-size: 0.8em;
-            color: #888;
-            text-align: center;
-            margin-bottom: 8px;
-        }}
-        .target-image {{
-            width: 100%;
-            height: 180px;
-            object-fit: cover;
-            border-radius: 4px;
-        }}
-        .nav-home {{
-            position: fixed;
-            top: 20px;
-            left: 20px;
-            padding: 10px 20px;
-            background: #1a1a1a;
-            border: 2px solid #4a9eff;
-            border-radius: 5px;
-            color: #4a9eff;
-            text-decoration: none;
-            font-size: 0.9em;
-            transition: all 0.2s;
-            z-index: 100;
-        }}
-        .nav-home:hover {{
-            background: #4a9eff;
-            color: #000;
-        }}
-        .modal {{
-            display: none;
-            position: fixed;
-            z-index: 1000;
-            left: 0;
-            top: 0;
-            width: 100%;
-            height: 100%;
-            background-color: rgba(0, 0, 0, 0.95);
-            cursor: pointer;
-        }}
-        .modal.active {{
-            display: flex;
-            align-items: center;
-            justify-content: center;
-        }}
-        .modal-content {{
-            max-width: 90%;
-            max-height: 90vh;
-            object-fit: contain;
-            border: 3px solid #4a9eff;
-            border-radius: 8px;
-            box-shadow: 0 0 30px rgba(74, 158, 255, 0.5);
-        }}
-        .modal-close {{
-            position: absolute;
-            top: 20px;
-            right: 35px;
-            color: #fff;
-            font-size: 40px;
-            font-weight: bold;
-            cursor: pointer;
-        }}
-        .modal-close:hover {{
-            color: #4a9eff;
-        }}
-    </style>
+    <link rel="stylesheet" href="{SITE_CSS}">
+    <style>{PAGE_CSS}{extra_css}</style>
 </head>
 <body>
     <a href="index.html" class="nav-home">← Home</a>
     <h1>All Targets Gallery</h1>
     <div class="filter-box">
-        <input type="text" id="filterInput" placeholder="Filter targets (e.g., M31, NGC, Nebula)..." onkeyup="filterTargets()">
+        <input type="text" id="filterInput" placeholder="Filter targets (e.g., M31, NGC, Nebula)...">
     </div>
     <div class="stats">
         <strong>{total_count}</strong> targets captured
     </div>
 """
 
-    # Add galaxies section
-    if galaxies:
-        html += f"""
-    <div class="category-section">
-        <div class="category-header">Galaxies ({len(galaxies)})</div>
-        <div class="target-grid">
-"""
-        for name, info in sorted(galaxies.items(), key=sort_key_numeric):
-            path_encoded = quote(info['path'])
-            html += f"""
-            <div class="target-card" data-name="{name}" data-type="galaxy" onclick="openModal('{path_encoded}')">
-                <div class="target-name">{info['display_name']}</div>
-                <div class="target-type">Galaxy</div>
-                <img src="{path_encoded}" class="target-image" alt="{info['display_name']}">
-            </div>
-"""
-        html += """
-        </div>
-    </div>
-"""
 
-    # Add clusters section
-    if clusters:
-        html += f"""
+# After the cards: the image modal and the shared site script
+PAGE_SCRIPTS = "\n" + MODAL_HTML + "\n" + SITE_SCRIPT_TAG
+
+
+def render_html(catalog=None):
+    """Generate HTML for all targets gallery, yielding it fragment by fragment."""
+    if catalog is None:
+        catalog = discover()
+    targets = catalog.targets
+    search = []
+
+    yield page_head(len(targets))
+
+    for category, title, data_type, category_type in SECTIONS:
+        section = {k: v for k, v in targets.items() if v.category == category}
+        if not section:
+            continue
+        yield f"""
     <div class="category-section">
-        <div class="category-header">Clusters ({len(clusters)})</div>
+        <div class="category-header">{title} ({len(section)})</div>
         <div class="target-grid">
 """
-        for name, info in sorted(clusters.items(), key=sort_key_numeric):
-            path_encoded = quote(info['path'])
-            html += f"""
-            <div class="target-card" data-name="{name}" data-type="cluster" onclick="openModal('{path_encoded}')">
-                <div class="target-name">{info['display_name']}</div>
-                <div class="target-type">Cluster</div>
-                <img src="{path_encoded}" class="target-image" alt="{info['display_name']}">
+        for name, info in sorted(section.items(), key=sort_key_numeric):
+            path_encoded = quote(info.path)
+            thumb_encoded = quote(catalog.thumbnail(info.path, 'card'))
+            srcset = catalog.srcset_attrs(info.path, CARD_SIZES)
+            img_attrs = catalog.img_attrs(info.path)
+            search.append(search_tokens(name, info, data_type, category_type))
+            yield f"""
+            <div class="target-card" data-name="{name}" data-type="{data_type}" onclick="openModal('{path_encoded}')">
+                <div class="target-name">{info.display_name}</div>
+                <div class="target-type">{card_type(info, category_type)}</div>{coords_line(info)}{capture_line(catalog, info)}
+                <img src="{thumb_encoded}"{srcset}{img_attrs} class="target-image" alt="{info.display_name}">
             </div>
 """
-        html += """
+        yield """
         </div>
     </div>
 """
 
-    # Add nebulae section
-    if nebulae:
-        html += f"""
-    <div class="category-section">
-        <div class="category-header">Nebulae ({len(nebulae)})</div>
-        <div class="target-grid">
-"""
-        for name, info in sorted(nebulae.items(), key=sort_key_numeric):
-            path_encoded = quote(info['path'])
-            html += f"""
-            <div class="target-card" data-name="{name}" data-type="nebula" onclick="openModal('{path_encoded}')">
-                <div class="target-name">{info['display_name']}</div>
-                <div class="target-type">Nebula</div>
-                <img src="{path_encoded}" class="target-image" alt="{info['display_name']}">
-            </div>
-"""
-        html += """
-        </div>
-    </div>
+    yield "\n" + search_index_html(search, '.target-card')
+    yield PAGE_SCRIPTS
+    yield """</body>
+</html>
 """
 
-    html += """
-    <!-- Modal for full-size image viewing -->
-    <div id="imageModal" class="modal" onclick="closeModal()">
-        <span class="modal-close">&times;</span>
-        <img class="modal-content" id="modalImage">
-    </div>
 
-    <script>
-        function openModal(imagePath) {
-            const modal = document.getElementById('imageModal');
-            const modalImg = document.getElementById('modalImage');
-            modal.classList.add('active');
-            modalImg.src = decodeURIComponent(imagePath);
-        }
-
-        function closeModal() {
-            const modal = document.getElementById('imageModal');
-            modal.classList.remove('active');
-        }
-
-        // Close modal on Escape key
-        document.addEventListener('keydown', function(event) {
-            if (event.key === 'Escape') {
-                closeModal();
-            }
-        });
-
-        // Filter function
-        function filterTargets() {
-            const filter = document.getElementById('filterInput').value.toLowerCase();
-            const cards = document.querySelectorAll('.target-card');
-
-            cards.forEach(card => {
-                const name = card.dataset.name.toLowerCase();
-                const type = card.dataset.type.toLowerCase();
-                const text = name + ' ' + type;
-
-                if (text.includes(filter)) {
-                    card.style.display = '';
-                } else {
-                    card.style.display = 'none';
+def render_feed(catalog=None):
+    """Feed for the windowed page: sections of FEED_FIELDS card arrays and a search index."""
+    if catalog is None:
+        catalog = discover()
+    targets = catalog.targets
+    sections = []
+    search = []
+
+    for category, title, data_type, category_type in SECTIONS:
+        section = {k: v for k, v in targets.items() if v.category == category}
+        if not section:
+            continue
+        cards = []
+        for name, info in sorted(section.items(), key=sort_key_numeric):
+            width, height = catalog.dimensions.get(info.path, (0, 0))
+            coords = format_coordinates(info.sky.ra, info.sky.dec) if info.sky else ''
+            cards.append([name, info.display_name, card_type(info, category_type), coords,
+                          quote(info.path), quote(catalog.thumbnail(info.path, 'card')),
+                          catalog.srcset(info.path), width, height, catalog.capture_details(info.path)])
+            search.append(search_tokens(name, info, data_type, category_type))
+        sections.append({'title': title, 'type': data_type, 'cards': cards})
+
+    return {'fields': FEED_FIELDS, 'sizes': CARD_SIZES, 'sections': sections,
+            'search': build_index(search)}
+
+
+def render_shell_html(catalog=None, feed='all_targets.json'):
+    """Page shell that fetches feed and renders only the cards near the viewport."""
+    if catalog is None:
+        catalog = discover()
+    yield page_head(len(catalog.targets), FEED_CSS)
+    yield f"""    <div id="targetList" class="target-list" data-feed="{feed}" data-min-width="{CARD_MIN_WIDTH}"
+         data-card-height="{CARD_HEIGHT}" data-gap="{GRID_GAP}" data-header-height="{HEADER_HEIGHT}"></div>
+"""
+    yield PAGE_SCRIPTS
+    yield """    <script>
+        (function() {
+            const list = document.getElementById('targetList');
+            const input = document.getElementById('filterInput');
+            const size = name => parseInt(list.dataset[name]);
+            const rows = new VirtualRows(list, window);
+            let feed = null;
+
+            function card(fields) {
+                const [name, displayName, type, coords, path, thumb, srcset, width, height, capture] = fields;
+                const element = make('div', 'target-card');
+                element.dataset.name = name;
+                element.addEventListener('click', () => openModal(path));
+                element.appendChild(make('div', 'target-name', displayName));
+                element.appendChild(make('div', 'target-type', type));
+                if (coords) element.appendChild(make('div', 'target-coords', coords));
+                if (capture) element.appendChild(make('div', 'target-capture', capture));
+                const img = make('img', 'target-image');
+                img.decoding = 'async';
+                if (srcset) {
+                    img.srcset = srcset;
+                    img.sizes = feed.sizes;
+                }
+                if (width) {
+                    img.width = width;
+                    img.height = height;
                 }
-            });
-        }
+                img.src = thumb;
+                img.alt = displayName;
+                element.appendChild(img);
+                return element;
+            }
+
+            // Rows for the current filter and width: a header per section,
+            // then its matching cards, as many per row as fit
+            function layout() {
+                const matches = searchMatches(feed.search, input.value);
+                const gap = size('gap');
+                const columns = Math.max(1, Math.floor((list.clientWidth + gap) / (size('minWidth') + gap)));
+                const layoutRows = [];
+                let first = 0;
+                feed.sections.forEach(section => {
+                    const cards = section.cards.filter((_, i) => matches === null || matches.has(first + i));
+                    first += section.cards.length;
+                    if (!cards.length) return;
+                    layoutRows.push({height: size('headerHeight'), render: () =>
+                        make('div', 'category-header', `${section.title} (${section.cards.length})`)});
+                    for (let i = 0; i < cards.length; i += columns) {
+                        const rowCards = cards.slice(i, i + columns);
+                        layoutRows.push({height: size('cardHeight') + gap, render: () => {
+                            const row = make('div', 'target-row');
+                            row.style.gridTemplateColumns = `repeat(${columns}, 1fr)`;
+                            rowCards.forEach(fields => row.appendChild(card(fields)));
+                            return row;
+                        }});
+                    }
+                });
+                rows.setRows(layoutRows);
+            }
+
+            fetch(list.dataset.feed)
+                .then(response => response.json())
+                .then(data => {
+                    feed = data;
+                    layout();
+
+                    let timer = null;
+                    input.addEventListener('input', function() {
+                        clearTimeout(timer);
+                        timer = setTimeout(layout, 150);
+                    });
+                    let width = list.clientWidth;
+                    window.addEventListener('resize', function() {
+                        if (list.clientWidth !== width) {
+                            width = list.clientWidth;
+                            layout();
+                        }
+                    });
+                });
+        })();
     </script>
 </body>
 </html>
 """
 
-    return html
+
+def generate_html(catalog=None):
+    """Return the whole page as one string (see render_html)."""
+    return ''.join(render_html(catalog))
 
 if __name__ == '__main__':
     # Change to parent directory to access targets
     os.chdir('/home/dlwiii/astro')
-    html = generate_html()
-
     output_path = Path('gallery/all_targets.html')
-    with open(output_path, 'w') as f:
-        f.write(html)
 
-    print(f"Generated {output_path}")
+    args = generator_parser('Build the all-targets gallery (gallery/all_targets.html).').parse_args()
+    profiler = profiler_from_args(args)
+
+    # Refresh the scan manifest; only directories whose mtime changed are listed
+    with timed_phase(profiler, 'discovery'):
+        manifest, listing, rescanned = scan_targets()
+    state = page_state(manifest, listing, __file__, recorded_files(manifest, str(output_path)), args.weights)
+    # Assets are written only when missing, so a deleted one comes back even if the page is current
+    write_assets(output_path.parent)
+    if not args.force and output_is_current(manifest, str(output_path), state):
+        print(f"No changes under targets/, {output_path} left untouched")
+        sys.exit(0)
+
+    catalog = discover(listing, rescanned, args.weights, profiler=profiler)
+    with timed_phase(profiler, 'thumbnails'):
+        add_derivatives(catalog)
+    changed = write_profiled(profiler, output_path, render_html(catalog))
+    for path in remove_stale_siblings([str(output_path)]):
+        print(f"Removed stale {path}")
+
+    state = page_state(manifest, listing, __file__, catalog.section_files('targets'), args.weights)
+    record_output(manifest, str(output_path), state)
+    save_manifest(manifest)
+
+    print(f"{'Generated' if changed else 'Unchanged'} {output_path} ({len(rescanned)} directories rescanned)")
+
+    if profiler is not None:
+        profiler.finish(args.profile_json)
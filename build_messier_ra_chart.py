@@ -1,460 +1,501 @@
 #!/usr/bin/env python3
-import os
-import re
-from pathlib import Path
+import sys
 from urllib.parse import quote
 
-# Find all stacked Messier images
-def find_messier_images():
-    messier_images = {}
-
-    # Priority 1: Look for final processed PNG files (M##_YYYY-MM-DD.png or M##.png)
-    all_pngs = list(Path('targets').rglob('M*.png')) + list(Path('targets').rglob('m*.png'))
-    for png in all_pngs:
-        # Try to match dated pattern first: M31_2026-01-30.png
-        match = re.search(r'M(\d{1,3})_(\d{4}-\d{2}-\d{2})\.png$', str(png), re.IGNORECASE)
-        if match:
-            m_num = int(match.group(1))
-            date_str = match.group(2)
-
-            # Only accept valid Messier numbers (1-110)
-            if m_num < 1 or m_num > 110:
-                continue
-
-            # Keep the most recent date (highest date string)
-            if m_num not in messier_images or date_str > messier_images[m_num][1]:
-                messier_images[m_num] = (str(png), date_str, 'png')
-        else:
-            # Try undated pattern: M33.png
-            match = re.search(r'M(\d{1,3})\.png$', str(png), re.IGNORECASE)
-            if match:
-                m_num = int(match.group(1))
-
-                # Only accept valid Messier numbers (1-110)
-                if m_num < 1 or m_num > 110:
-                    continue
-
-                # Only use if we don't already have a dated PNG
-                if m_num not in messier_images or messier_images[m_num][2] != 'png':
-                    messier_images[m_num] = (str(png), '0000-00-00', 'png')
-
-    # Priority 2: Fallback to stacked JPG images (only if no PNG exists)
-    for jpg in Path('targets').rglob('Stacked_*M*.jpg'):
-        if '_thn.jpg' in str(jpg):
-            continue
-
-        # Extract Messier number from filename
-        match = re.search(r'[_\s]M\s+(\d{1,3})[\s_\.]', str(jpg), re.IGNORECASE)
-        if match:
-            m_num = int(match.group(1))
-            if m_num < 1 or m_num > 110:
-                continue
-
-            # Skip if we already have a PNG for this object
-            if m_num in messier_images and messier_images[m_num][2] == 'png':
-                continue
-
-            # Extract stack count
-            stack_match = re.search(r'Stacked_(\d+)_', str(jpg))
-            stack_count = int(stack_match.group(1)) if stack_match else 0
-
-            # Keep the highest stack count image
-            if m_num not in messier_images or stack_count > messier_images[m_num][1]:
-                messier_images[m_num] = (str(jpg), stack_count, 'jpg')
-
-    return {k: v[0] for k, v in messier_images.items()}
-
-# Messier objects with RA (hours), Dec (degrees), and names
+from discovery import discover
+from pages import generator_parser, page_state
+from precompress import remove_stale_siblings
+from profiling import profiler_from_args, timed_phase, write_profiled
+from scan_manifest import output_is_current, record_output, recorded_files, save_manifest, scan_targets
+from search_index import build_index, card_tokens, search_index_html
+from site_assets import MODAL_HTML, SITE_CSS, SITE_SCRIPT_TAG, minify_css, write_assets
+from sky_catalog import format_coordinates_batch, load_catalog, ra_hour_columns
+from thumbnails import add_derivatives
+
+# Messier objects with RA (hours), Dec (degrees), names, types and
+# constellations, from sky_catalog.bin
 # RA is in decimal hours, Dec is in decimal degrees
 messier_data = {
-    1: {"name": "Crab Nebula", "ra": 5.575, "dec": 22.017},
-    2: {"name": "Globular Cluster", "ra": 21.558, "dec": -0.823},
-    3: {"name": "Globular Cluster", "ra": 13.703, "dec": 28.377},
-    4: {"name": "Globular Cluster", "ra": 16.393, "dec": -26.525},
-    5: {"name": "Globular Cluster", "ra": 15.308, "dec": 2.081},
-    6: {"name": "Butterfly Cluster", "ra": 17.667, "dec": -32.217},
-    7: {"name": "Ptolemy Cluster", "ra": 17.897, "dec": -34.817},
-    8: {"name": "Lagoon Nebula", "ra": 18.061, "dec": -24.383},
-    9: {"name": "Globular Cluster", "ra": 17.318, "dec": -18.517},
-    10: {"name": "Globular Cluster", "ra": 16.950, "dec": -4.100},
-    11: {"name": "Wild Duck Cluster", "ra": 18.850, "dec": -6.267},
-    12: {"name": "Globular Cluster", "ra": 16.783, "dec": -1.950},
-    13: {"name": "Hercules Cluster", "ra": 16.694, "dec": 36.460},
-    14: {"name": "Globular Cluster", "ra": 17.628, "dec": -3.250},
-    15: {"name": "Globular Cluster", "ra": 21.500, "dec": 12.167},
-    16: {"name": "Eagle Nebula", "ra": 18.314, "dec": -13.783},
-    17: {"name": "Omega Nebula", "ra": 18.344, "dec": -16.183},
-    18: {"name": "Open Cluster", "ra": 18.333, "dec": -17.117},
-    19: {"name": "Globular Cluster", "ra": 17.044, "dec": -26.267},
-    20: {"name": "Trifid Nebula", "ra": 18.035, "dec": -23.033},
-    21: {"name": "Open Cluster", "ra": 18.079, "dec": -22.500},
-    22: {"name": "Sagittarius Cluster", "ra": 18.605, "dec": -23.900},
-    23: {"name": "Open Cluster", "ra": 17.950, "dec": -19.017},
-    24: {"name": "Sagittarius Star Cloud", "ra": 18.283, "dec": -18.417},
-    25: {"name": "Open Cluster", "ra": 18.528, "dec": -19.250},
-    26: {"name": "Open Cluster", "ra": 18.758, "dec": -9.400},
-    27: {"name": "Dumbbell Nebula", "ra": 19.992, "dec": 22.717},
-    28: {"name": "Globular Cluster", "ra": 18.408, "dec": -24.867},
-    29: {"name": "Open Cluster", "ra": 20.397, "dec": 38.533},
-    30: {"name": "Globular Cluster", "ra": 21.673, "dec": -23.183},
-    31: {"name": "Andromeda Galaxy", "ra": 0.712, "dec": 41.269},
-    32: {"name": "Dwarf Galaxy", "ra": 0.712, "dec": 40.867},
-    33: {"name": "Triangulum Galaxy", "ra": 1.564, "dec": 30.660},
-    34: {"name": "Open Cluster", "ra": 2.708, "dec": 42.767},
-    35: {"name": "Open Cluster", "ra": 6.148, "dec": 24.333},
-    36: {"name": "Open Cluster", "ra": 5.602, "dec": 34.133},
-    37: {"name": "Open Cluster", "ra": 5.875, "dec": 32.550},
-    38: {"name": "Open Cluster", "ra": 5.478, "dec": 35.833},
-    39: {"name": "Open Cluster", "ra": 21.533, "dec": 48.433},
-    40: {"name": "Winnecke 4", "ra": 12.367, "dec": 58.083},
-    41: {"name": "Open Cluster", "ra": 6.783, "dec": -20.750},
-    42: {"name": "Orion Nebula", "ra": 5.588, "dec": -5.400},
-    43: {"name": "De Mairan's Nebula", "ra": 5.592, "dec": -5.267},
-    44: {"name": "Beehive Cluster", "ra": 8.667, "dec": 19.983},
-    45: {"name": "Pleiades", "ra": 3.783, "dec": 24.117},
-    46: {"name": "Open Cluster", "ra": 7.698, "dec": -14.817},
-    47: {"name": "Open Cluster", "ra": 7.608, "dec": -14.500},
-    48: {"name": "Open Cluster", "ra": 8.227, "dec": -5.800},
-    49: {"name": "Elliptical Galaxy", "ra": 12.498, "dec": 8.000},
-    50: {"name": "Open Cluster", "ra": 7.053, "dec": -8.333},
-    51: {"name": "Whirlpool Galaxy", "ra": 13.498, "dec": 47.195},
-    52: {"name": "Open Cluster", "ra": 23.408, "dec": 61.583},
-    53: {"name": "Globular Cluster", "ra": 13.213, "dec": 18.167},
-    54: {"name": "Globular Cluster", "ra": 18.917, "dec": -30.483},
-    55: {"name": "Globular Cluster", "ra": 19.667, "dec": -30.967},
-    56: {"name": "Globular Cluster", "ra": 19.278, "dec": 30.183},
-    57: {"name": "Ring Nebula", "ra": 18.892, "dec": 33.033},
-    58: {"name": "Barred Spiral Galaxy", "ra": 12.620, "dec": 11.817},
-    59: {"name": "Elliptical Galaxy", "ra": 12.703, "dec": 11.650},
-    60: {"name": "Elliptical Galaxy", "ra": 12.728, "dec": 11.550},
-    61: {"name": "Spiral Galaxy", "ra": 12.365, "dec": 4.467},
-    62: {"name": "Globular Cluster", "ra": 17.017, "dec": -30.117},
-    63: {"name": "Sunflower Galaxy", "ra": 13.260, "dec": 42.033},
-    64: {"name": "Black Eye Galaxy", "ra": 12.943, "dec": 21.683},
-    65: {"name": "Spiral Galaxy", "ra": 11.308, "dec": 13.100},
-    66: {"name": "Spiral Galaxy", "ra": 11.333, "dec": 12.983},
-    67: {"name": "Open Cluster", "ra": 8.850, "dec": 11.800},
-    68: {"name": "Globular Cluster", "ra": 12.658, "dec": -26.750},
-    69: {"name": "Globular Cluster", "ra": 18.517, "dec": -32.350},
-    70: {"name": "Globular Cluster", "ra": 18.723, "dec": -32.283},
-    71: {"name": "Globular Cluster", "ra": 19.897, "dec": 18.783},
-    72: {"name": "Globular Cluster", "ra": 20.892, "dec": -12.533},
-    73: {"name": "Asterism", "ra": 20.980, "dec": -12.633},
-    74: {"name": "Spiral Galaxy", "ra": 1.614, "dec": 15.783},
-    75: {"name": "Globular Cluster", "ra": 20.101, "dec": -21.917},
-    76: {"name": "Little Dumbbell Nebula", "ra": 1.703, "dec": 51.575},
-    77: {"name": "Spiral Galaxy", "ra": 2.713, "dec": -0.013},
-    78: {"name": "Reflection Nebula", "ra": 5.775, "dec": 0.050},
-    79: {"name": "Globular Cluster", "ra": 5.405, "dec": -24.533},
-    80: {"name": "Globular Cluster", "ra": 16.283, "dec": -22.983},
-    81: {"name": "Bode's Galaxy", "ra": 9.928, "dec": 69.067},
-    82: {"name": "Cigar Galaxy", "ra": 9.928, "dec": 69.683},
-    83: {"name": "Southern Pinwheel", "ra": 13.617, "dec": -29.867},
-    84: {"name": "Lenticular Galaxy", "ra": 12.423, "dec": 12.883},
-    85: {"name": "Lenticular Galaxy", "ra": 12.425, "dec": 18.192},
-    86: {"name": "Lenticular Galaxy", "ra": 12.433, "dec": 12.950},
-    87: {"name": "Virgo A", "ra": 12.514, "dec": 12.392},
-    88: {"name": "Spiral Galaxy", "ra": 12.533, "dec": 14.417},
-    89: {"name": "Elliptical Galaxy", "ra": 12.592, "dec": 12.550},
-    90: {"name": "Spiral Galaxy", "ra": 12.610, "dec": 13.167},
-    91: {"name": "Barred Spiral Galaxy", "ra": 12.590, "dec": 14.500},
-    92: {"name": "Globular Cluster", "ra": 17.283, "dec": 43.133},
-    93: {"name": "Open Cluster", "ra": 7.745, "dec": -23.867},
-    94: {"name": "Spiral Galaxy", "ra": 12.850, "dec": 41.120},
-    95: {"name": "Barred Spiral Galaxy", "ra": 10.738, "dec": 11.700},
-    96: {"name": "Spiral Galaxy", "ra": 10.775, "dec": 11.817},
-    97: {"name": "Owl Nebula", "ra": 11.247, "dec": 55.017},
-    98: {"name": "Spiral Galaxy", "ra": 12.230, "dec": 14.900},
-    99: {"name": "Spiral Galaxy", "ra": 12.315, "dec": 14.417},
-    100: {"name": "Spiral Galaxy", "ra": 12.373, "dec": 15.817},
-    101: {"name": "Pinwheel Galaxy", "ra": 14.053, "dec": 54.350},
-    102: {"name": "Spindle Galaxy", "ra": 15.100, "dec": 55.750},
-    103: {"name": "Open Cluster", "ra": 1.558, "dec": 60.667},
-    104: {"name": "Sombrero Galaxy", "ra": 12.667, "dec": -11.617},
-    105: {"name": "Elliptical Galaxy", "ra": 10.788, "dec": 12.583},
-    106: {"name": "Spiral Galaxy", "ra": 12.317, "dec": 47.300},
-    107: {"name": "Globular Cluster", "ra": 16.542, "dec": -13.050},
-    108: {"name": "Spiral Galaxy", "ra": 11.193, "dec": 55.667},
-    109: {"name": "Barred Spiral Galaxy", "ra": 11.958, "dec": 53.383},
-    110: {"name": "Dwarf Galaxy", "ra": 0.672, "dec": 41.683}
+    m_num: {"name": obj.name, "ra": obj.ra, "dec": obj.dec, "type": obj.type_label,
+            "constellation": (obj.constellation, obj.constellation_name)}
+    for m_num, obj in ((m, load_catalog().get(f'M{m}')) for m in range(1, 111))
 }
 
-def generate_ra_chart_html():
-    images = find_messier_images()
+def ra_layout(objects):
+    """Bucket {key: {'ra', 'dec', ...}} by RA hour in one batch.
 
-    # Organize objects by RA hour (0-23)
-    ra_columns = {hour: [] for hour in range(24)}
+    Returns (keys, columns, coords): columns[hour] lists indices into keys
+    sorted by declination (north first), coords the formatted coordinates.
+    """
+    keys = list(objects)
+    ra = [objects[k]['ra'] for k in keys]
+    dec = [objects[k]['dec'] for k in keys]
+    return keys, ra_hour_columns(ra, dec), format_coordinates_batch(ra, dec)
 
-    for m_num, data in messier_data.items():
-        ra_hour = int(data['ra']) % 24
-        ra_columns[ra_hour].append({
-            'num': m_num,
-            'name': data['name'],
-            'ra': data['ra'],
-            'dec': data['dec'],
-            'image': images.get(m_num)
-        })
 
-    # Sort each column by declination (highest/north at top)
-    for hour in ra_columns:
-        ra_columns[hour].sort(key=lambda x: x['dec'], reverse=True)
+# Page-specific styles; the shared ones are in site_assets
+PAGE_CSS = minify_css("""
+.scroll-wrapper-top {
+    overflow-x: auto;
+    overflow-y: hidden;
+    margin-bottom: 10px;
+}
+.scroll-content-top {
+    height: 20px;
+}
+/* Custom scrollbar styling */
+.scroll-wrapper-top::-webkit-scrollbar,
+.ra-grid::-webkit-scrollbar {
+    height: 12px;
+}
+.scroll-wrapper-top::-webkit-scrollbar-track,
+.ra-grid::-webkit-scrollbar-track {
+    background: #0a0a0a;
+    border-radius: 10px;
+}
+.scroll-wrapper-top::-webkit-scrollbar-thumb,
+.ra-grid::-webkit-scrollbar-thumb {
+    background: linear-gradient(90deg, #4a9eff, #2a5eff);
+    border-radius: 10px;
+}
+.scroll-wrapper-top::-webkit-scrollbar-thumb:hover,
+.ra-grid::-webkit-scrollbar-thumb:hover {
+    background: linear-gradient(90deg, #6ab5ff, #4a7eff);
+}
+.ra-grid {
+    display: grid;
+    grid-template-columns: repeat(24, 1fr);
+    gap: 10px;
+    margin: 0 auto;
+    overflow-x: auto;
+}
+.ra-column {
+    min-width: 120px;
+    border: 1px solid #333;
+    border-radius: 8px;
+    background: #0a0a0a;
+}
+.ra-header {
+    background: #1a1a1a;
+    padding: 10px;
+    text-align: center;
+    font-weight: bold;
+    border-bottom: 2px solid #333;
+    position: sticky;
+    top: 0;
+    z-index: 10;
+}
+.messier-item {
+    padding: 8px;
+    margin: 5px;
+    background: #1a1a1a;
+    border-radius: 4px;
+    border: 1px solid #333;
+    cursor: pointer;
+    transition: all 0.2s;
+}
+.messier-item:hover {
+    background: #252525;
+    border-color: #555;
+}
+.messier-item.captured {
+    border-color: #4a9eff;
+    background: #1a2a3a;
+}
+.messier-item.up-tonight {
+    box-shadow: inset 3px 0 0 #4caf50;
+}
+.messier-item.down-tonight {
+    opacity: 0.45;
+}
+.tonight-info {
+    color: #888;
+    font-size: 0.85em;
+}
+.messier-number {
+    font-weight: bold;
+    color: #4a9eff;
+    font-size: 0.95em;
+}
+.messier-name {
+    font-size: 0.75em;
+    color: #aaa;
+    margin-top: 2px;
+}
+.coords {
+    font-size: 0.7em;
+    color: #666;
+    margin-top: 2px;
+}
+.thumbnail {
+    width: 100%;
+    height: 80px;
+    object-fit: cover;
+    border-radius: 3px;
+    margin-top: 5px;
+}
+.placeholder {
+    width: 100%;
+    height: 80px;
+    background: #0a0a0a;
+    border-radius: 3px;
+    display: flex;
+    align-items: center;
+    justify-content: center;
+    color: #333;
+    font-size: 2em;
+    margin-top: 5px;
+}
+.controls {
+    display: flex;
+    gap: 15px;
+    justify-content: center;
+    align-items: center;
+    margin: 20px 0;
+    flex-wrap: wrap;
+}
+.control-group {
+    display: flex;
+    gap: 8px;
+    align-items: center;
+}
+.control-group label {
+    color: #888;
+    font-size: 0.9em;
+}
+select, button {
+    background: #1a1a1a;
+    color: #fff;
+    border: 2px solid #333;
+    border-radius: 6px;
+    padding: 8px 12px;
+    font-size: 0.9em;
+    cursor: pointer;
+    transition: all 0.2s;
+}
+select:hover, button:hover {
+    border-color: #4a9eff;
+}
+select:focus, button:focus {
+    outline: none;
+    border-color: #4a9eff;
+}
+button {
+    padding: 8px 16px;
+}
+button:active {
+    transform: scale(0.98);
+}
+@media (max-width: 1400px) {
+    .ra-grid {
+        grid-template-columns: repeat(12, 1fr);
+    }
+}
+@media (max-width: 800px) {
+    .ra-grid {
+        grid-template-columns: repeat(6, 1fr);
+    }
+}
+""")
 
-    captured = len(images)
-    percent = round(captured / 110 * 100, 1)
 
-    html = f"""<!DOCTYPE html>
+# Scroll sync, column ordering and tonight's plan, shared by the
+# static page and the feed shell.  Each adds markTonight(tonight), which
+# applies tonight(designation) -> {hoursUp, title} or null to the items,
+# and sortItems(), which orders each column for the current sortTonight.
+CHART_SCRIPT = """        // Sync scroll bars
+        const scrollTop = document.getElementById('scrollTop');
+        const raGrid = document.getElementById('raGrid');
+        const scrollContentTop = document.getElementById('scrollContentTop');
+
+        // Set the width of top scroller to match content width
+        function updateScrollWidth() {
+            scrollContentTop.style.width = raGrid.scrollWidth + 'px';
+        }
+
+        // Sync scroll positions
+        scrollTop.addEventListener('scroll', function() {
+            raGrid.scrollLeft = scrollTop.scrollLeft;
+        });
+
+        raGrid.addEventListener('scroll', function() {
+            scrollTop.scrollLeft = raGrid.scrollLeft;
+        });
+
+        // Update on load and resize
+        window.addEventListener('load', updateScrollWidth);
+        window.addEventListener('resize', updateScrollWidth);
+        updateScrollWidth();
+
+        // RA Column Ordering
+        let isReversed = localStorage.getItem('raReversed') === 'true' || false;
+        let startRA = parseInt(localStorage.getItem('raStart') || '20');
+
+        // Set initial values
+        document.getElementById('startRA').value = startRA;
+
+        function reorderColumns() {
+            const grid = document.getElementById('raGrid');
+            const columns = Array.from(grid.querySelectorAll('.ra-column'));
+
+            // Create order array
+            let order = [];
+            for (let i = 0; i < 24; i++) {
+                order.push((startRA + i) % 24);
+            }
+
+            // Reverse if needed
+            if (isReversed) {
+                order.reverse();
+            }
+
+            // Sort columns by order
+            columns.sort((a, b) => {
+                const raA = parseInt(a.dataset.ra);
+                const raB = parseInt(b.dataset.ra);
+                return order.indexOf(raA) - order.indexOf(raB);
+            });
+
+            // Reappend in new order
+            columns.forEach(col => grid.appendChild(col));
+
+            // Update scroll width
+            updateScrollWidth();
+        }
+
+        // Start RA selector
+        document.getElementById('startRA').addEventListener('change', function() {
+            startRA = parseInt(this.value);
+            localStorage.setItem('raStart', startRA);
+            reorderColumns();
+        });
+
+        // Reverse button
+        document.getElementById('reverseBtn').addEventListener('click', function() {
+            isReversed = !isReversed;
+            localStorage.setItem('raReversed', isReversed);
+            reorderColumns();
+        });
+
+        // Apply initial order
+        reorderColumns();
+
+        // Tonight's observability, precomputed by planner.py (optional):
+        // observability.json indexes a uint8 table of nights x objects x fields,
+        // of which only tonight's row is fetched
+        let sortTonight = localStorage.getItem('raSortTonight') === 'true';
+
+        // Evening date of the current night: planner.py nights run noon to
+        // noon, so until local noon it is still last night
+        function observingDate() {
+            const now = new Date();
+            return new Date(now.getTime() - now.getTimezoneOffset() * 60000 - 12 * 3600000)
+                .toISOString().slice(0, 10);
+        }
+
+        // Tonight's row of the table (objects x fields), by HTTP Range request;
+        // a server that ignores Range sends the whole table, sliced here
+        function fetchNight(index, night) {
+            const [, count, width] = index.table.shape;
+            const start = night * count * width, end = start + count * width;
+            return fetch(index.table.file, {headers: {Range: `bytes=${start}-${end - 1}`}})
+                .then(response => response.ok ? response.arrayBuffer() : Promise.reject())
+                .then(buffer => buffer.byteLength === end - start
+                    ? new Uint8Array(buffer) : new Uint8Array(buffer, start, end - start));
+        }
+
+        function applyPlan(index, night, row) {
+            const [, , width] = index.table.shape;
+            const fields = {};
+            index.table.fields.forEach((field, i) => { fields[field.name] = [i, field.scale, field.offset]; });
+            const position = new Map(index.designations.map((d, i) => [d, i]));
+
+            // Tonight's values for a designation, or null if it is not in the plan
+            function tonight(designation) {
+                const i = position.get(designation);
+                if (i === undefined) return null;
+                const base = i * width;
+                const value = name => {
+                    const [f, scale, offset] = fields[name];
+                    return row[base + f] * scale + offset;
+                };
+                const hoursUp = value('hours_up');
+                const transit = value('transit') % 24;
+                return {
+                    hoursUp: hoursUp,
+                    title: `Up ${hoursUp.toFixed(1)} h tonight, transit ` +
+                        `${String(Math.floor(transit)).padStart(2, '0')}:${String(Math.round(transit % 1 * 60) % 60).padStart(2, '0')}, ` +
+                        `max ${value('max_alt')}°, ${value('moon_sep')}° from the Moon`,
+                };
+            }
+            markTonight(tonight);
+
+            const info = index.nights[night];
+            document.getElementById('tonightInfo').textContent =
+                `Tonight: ${info.dark_hours} h dark, Moon ${Math.round(info.moon_illumination * 100)}% lit`;
+            const button = document.getElementById('tonightBtn');
+            button.hidden = false;
+            button.addEventListener('click', function() {
+                sortTonight = !sortTonight;
+                localStorage.setItem('raSortTonight', sortTonight);
+                sortItems();
+            });
+
+            // Open the chart at the RA overhead at dusk unless one was picked
+            if (localStorage.getItem('raStart') === null && info.start_ra !== null) {
+                startRA = info.start_ra;
+                document.getElementById('startRA').value = startRA;
+                reorderColumns();
+            }
+            sortItems();
+        }
+
+        fetch('observability.json')
+            .then(response => response.ok ? response.json() : Promise.reject())
+            .then(index => {
+                const night = index.nights.findIndex(n => n.date === observingDate());
+                if (night < 0) return;  // plan does not cover tonight
+                return fetchNight(index, night).then(row => applyPlan(index, night, row));
+            })
+            .catch(() => {});
+"""
+
+# Static page: items are in the HTML; their build order is kept in data-order
+STATIC_SCRIPT = """        function sortItems() {
+            document.querySelectorAll('.ra-column').forEach(col => {
+                const items = Array.from(col.querySelectorAll('.messier-item'));
+                items.sort((a, b) => sortTonight
+                    ? (parseFloat(b.dataset.hoursUp) || 0) - (parseFloat(a.dataset.hoursUp) || 0)
+                      || a.dataset.order - b.dataset.order
+                    : a.dataset.order - b.dataset.order);
+                items.forEach(item => col.appendChild(item));
+            });
+        }
+
+        function markTonight(tonight) {
+            document.querySelectorAll('.messier-item').forEach((item, order) => {
+                item.dataset.order = order;
+                const plan = tonight(item.dataset.object);
+                if (plan === null) return;
+                item.dataset.hoursUp = plan.hoursUp;
+                item.classList.add(plan.hoursUp >= 1 ? 'up-tonight' : 'down-tonight');
+                item.title = plan.title;
+            });
+        }
+"""
+
+
+# Feed mode: item fields in the JSON feed, and the fixed height of one
+# item slot (including its margins) in a windowed column
+FEED_FIELDS = ('designation', 'name', 'coords', 'path', 'thumb')
+ITEM_HEIGHT = 150
+
+FEED_CSS = minify_css(f"""
+.ra-items {{
+    max-height: 75vh;
+    overflow-y: auto;
+}}
+.ra-items .messier-item {{
+    height: {ITEM_HEIGHT - 10}px;
+    box-sizing: border-box;
+    overflow: hidden;
+}}
+""")
+
+# Feed shell: items come from the JSON feed, and each column only renders
+# the items scrolled into view
+FEED_SCRIPT = """        const filterInput = document.getElementById('filterInput');
+        const columnRows = {};
+        let feed = null;
+        let tonightPlan = null;
+
+        document.querySelectorAll('.ra-column').forEach(col => {
+            columnRows[col.dataset.ra] = new VirtualRows(
+                col.querySelector('.ra-list'), col.querySelector('.ra-items'), 300);
+        });
+
+        function itemElement(n) {
+            const [designation, name, coords, path, thumb] = feed.items[n];
+            const item = make('div', path ? 'messier-item captured' : 'messier-item');
+            item.dataset.object = designation;
+            item.appendChild(make('div', 'messier-number', designation));
+            item.appendChild(make('div', 'messier-name', name));
+            item.appendChild(make('div', 'coords', coords));
+            if (path) {
+                const img = make('img', 'thumbnail');
+                img.decoding = 'async';
+                img.src = thumb;
+                img.alt = designation;
+                img.style.cursor = 'pointer';
+                img.addEventListener('click', () => openModal(path));
+                item.appendChild(img);
+            } else {
+                item.appendChild(make('div', 'placeholder', '?'));
+            }
+            const plan = tonightPlan && tonightPlan(designation);
+            if (plan) {
+                item.classList.add(plan.hoursUp >= 1 ? 'up-tonight' : 'down-tonight');
+                item.title = plan.title;
+            }
+            return item;
+        }
+
+        // Filter, optionally sort by tonight's hours up (stable, so ties keep
+        // declination order), and hand each column its rows
+        function layoutColumns() {
+            if (feed === null) return;
+            const matches = searchMatches(feed.search, filterInput.value);
+            const height = parseInt(raGrid.dataset.itemHeight);
+            const hoursUp = n => {
+                const plan = tonightPlan && tonightPlan(feed.items[n][0]);
+                return plan ? plan.hoursUp : 0;
+            };
+            feed.columns.forEach((numbers, hour) => {
+                const shown = numbers.filter(n => matches === null || matches.has(n));
+                if (sortTonight && tonightPlan) shown.sort((a, b) => hoursUp(b) - hoursUp(a));
+                columnRows[hour].setRows(shown.map(n => ({height: height, render: () => itemElement(n)})));
+            });
+        }
+
+        function markTonight(tonight) {
+            tonightPlan = tonight;
+            layoutColumns();
+        }
+
+        function sortItems() {
+            layoutColumns();
+        }
+
+        fetch(raGrid.dataset.feed)
+            .then(response => response.json())
+            .then(data => {
+                feed = data;
+                layoutColumns();
+                let timer = null;
+                filterInput.addEventListener('input', function() {
+                    clearTimeout(timer);
+                    timer = setTimeout(layoutColumns, 150);
+                });
+            });
+"""
+
+
+def chart_head(captured, percent, extra_css=''):
+    """Page start through the controls, up to the RA grid; extra_css is added to the stylesheet."""
+    return f"""<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>Messier Catalog by Right Ascension</title>
-    <style>
-        body {{
-            font-family: Arial, sans-serif;
-            background: #000;
-            color: #fff;
-            margin: 0;
-            padding: 20px;
-        }}
-        h1 {{
-            text-align: center;
-            margin-bottom: 10px;
-        }}
-        .filter-box {{
-            text-align: center;
-            margin-bottom: 15px;
-        }}
-        .filter-box input {{
-            padding: 10px;
-            width: 300px;
-            font-size: 16px;
-            border: 2px solid #4a9eff;
-            border-radius: 5px;
-            background: #1a1a1a;
-            color: #fff;
-        }}
-        .filter-box input:focus {{
-            outline: none;
-            border-color: #6bb6ff;
-        }}
-        .stats {{
-            text-align: center;
-            margin-bottom: 20px;
-            font-size: 1.2em;
-        }}
-        .scroll-wrapper-top {{
-            overflow-x: auto;
-            overflow-y: hidden;
-            margin-bottom: 10px;
-        }}
-        .scroll-content-top {{
-            height: 20px;
-        }}
-        /* Custom scrollbar styling */
-        .scroll-wrapper-top::-webkit-scrollbar,
-        .ra-grid::-webkit-scrollbar {{
-            height: 12px;
-        }}
-        .scroll-wrapper-top::-webkit-scrollbar-track,
-        .ra-grid::-webkit-scrollbar-track {{
-            background: #0a0a0a;
-            border-radius: 10px;
-        }}
-        .scroll-wrapper-top::-webkit-scrollbar-thumb,
-        .ra-grid::-webkit-scrollbar-thumb {{
-            background: linear-gradient(90deg, #4a9eff, #2a5eff);
-            border-radius: 10px;
-        }}
-        .scroll-wrapper-top::-webkit-scrollbar-thumb:hover,
-        .ra-grid::-webkit-scrollbar-thumb:hover {{
-            background: linear-gradient(90deg, #6ab5ff, #4a7eff);
-        }}
-        /* Modal styles */
-        .modal {{
-            display: none;
-            position: fixed;
-            z-index: 1000;
-            left: 0;
-            top: 0;
-            width: 100%;
-            height: 100%;
-            background-color: rgba(0, 0, 0, 0.95);
-            cursor: pointer;
-        }}
-        .modal.active {{
-            display: flex;
-            align-items: center;
-            justify-content: center;
-        }}
-        .modal-content {{
-            max-width: 90%;
-            max-height: 90vh;
-            object-fit: contain;
-            border: 3px solid #4a9eff;
-            border-radius: 8px;
-            box-shadow: 0 0 30px rgba(74, 158, 255, 0.5);
-        }}
-        .modal-close {{
-            position: absolute;
-            top: 20px;
-            right: 35px;
-            color: #fff;
-            font-size: 40px;
-            font-weight: bold;
-            cursor: pointer;
-        }}
-        .modal-close:hover {{
-            color: #4a9eff;
-        }}
-        .ra-grid {{
-            display: grid;
-            grid-template-columns: repeat(24, 1fr);
-            gap: 10px;
-            margin: 0 auto;
-            overflow-x: auto;
-        }}
-        .ra-column {{
-            min-width: 120px;
-            border: 1px solid #333;
-            border-radius: 8px;
-            background: #0a0a0a;
-        }}
-        .ra-header {{
-            background: #1a1a1a;
-            padding: 10px;
-            text-align: center;
-            font-weight: bold;
-            border-bottom: 2px solid #333;
-            position: sticky;
-            top: 0;
-            z-index: 10;
-        }}
-        .messier-item {{
-            padding: 8px;
-            margin: 5px;
-            background: #1a1a1a;
-            border-radius: 4px;
-            border: 1px solid #333;
-            cursor: pointer;
-            transition: all 0.2s;
-        }}
-        .messier-item:hover {{
-            background: #252525;
-            border-color: #555;
-        }}
-        .messier-item.captured {{
-            border-color: #4a9eff;
-            background: #1a2a3a;
-        }}
-        .messier-number {{
-            font-weight: bold;
-            color: #4a9eff;
-            font-size: 0.95em;
-        }}
-        .messier-name {{
-            font-size: 0.75em;
-            color: #aaa;
-            margin-top: 2px;
-        }}
-        .coords {{
-            font-size: 0.7em;
-            color: #666;
-            margin-top: 2px;
-        }}
-        .thumbnail {{
-            width: 100%;
-            height: 80px;
-            object-fit: cover;
-            border-radius: 3px;
-            margin-top: 5px;
-        }}
-        .placeholder {{
-            width: 100%;
-            height: 80px;
-            background: #0a0a0a;
-            border-radius: 3px;
-            display: flex;
-            align-items: center;
-            justify-content: center;
-            color: #333;
-            font-size: 2em;
-            margin-top: 5px;
-        }}
-        .controls {{
-            display: flex;
-            gap: 15px;
-            justify-content: center;
-            align-items: center;
-            margin: 20px 0;
-            flex-wrap: wrap;
-        }}
-        .control-group {{
-            display: flex;
-            gap: 8px;
-            align-items: center;
-        }}
-        .control-group label {{
-            color: #888;
-            font-size: 0.9em;
-        }}
-        select, button {{
-            background: #1a1a1a;
-            color: #fff;
-            border: 2px solid #333;
-            border-radius: 6px;
-            padding: 8px 12px;
-            font-size: 0.9em;
-            cursor: pointer;
-            transition: all 0.2s;
-        }}
-        select:hover, button:hover {{
-            border-color: #4a9eff;
-        }}
-        select:focus, button:focus {{
-            outline: none;
-            border-color: #4a9eff;
-        }}
-        button {{
-            padding: 8px 16px;
-        }}
-        button:active {{
-            transform: scale(0.98);
-        }}
-        @media (max-width: 1400px) {{
-            .ra-grid {{
-                grid-template-columns: repeat(12, 1fr);
-            }}
-        }}
-        @media (max-width: 800px) {{
-            .ra-grid {{
-                grid-template-columns: repeat(6, 1fr);
-            }}
-        }}
-        .nav-home {{
-            position: fixed;
-            top: 20px;
-            left: 20px;
-            padding: 10px 20px;
-            background: #1a1a1a;
-            border: 2px solid #4a9eff;
-            border-radius: 5px;
-            color: #4a9eff;
-            text-decoration: none;
-            font-size: 0.9em;
-            transition: all 0.2s;
-            z-index: 100;
-        }}
-        .nav-home:hover {{
-            background: #4a9eff;
-            color: #000;
-        }}
-    </style>
+    <link rel="stylesheet" href="{SITE_CSS}">
+    <style>{PAGE_CSS}{extra_css}</style>
 </head>
 <body>
     <a href="index.html" class="nav-home">← Home</a>
     <h1>Messier Catalog by Right Ascension</h1>
     <div class="filter-box">
-        <input type="text" id="filterInput" placeholder="Filter objects (e.g., M31, Galaxy, Nebula)..." onkeyup="filterObjects()">
+        <input type="text" id="filterInput" placeholder="Filter objects (e.g., M31, Galaxy, Nebula)...">
     </div>
     <div class="stats">
         <strong>{captured}</strong> of <strong>110</strong> objects captured ({percent}%)
@@ -492,45 +533,65 @@ def generate_ra_chart_html():
             </select>
         </div>
         <button id="reverseBtn">↔ Reverse Order</button>
+        <button id="tonightBtn" hidden>★ Best Tonight First</button>
+        <span id="tonightInfo" class="tonight-info"></span>
     </div>
     <div class="scroll-wrapper-top" id="scrollTop">
         <div class="scroll-content-top" id="scrollContentTop"></div>
     </div>
-    <div class="ra-grid" id="raGrid">
+"""
+
+
+def render_ra_chart_html(catalog=None):
+    if catalog is None:
+        catalog = discover()
+    images = catalog.messier
+
+    # Organize objects by RA hour (0-23), north at the top of each column
+    m_nums, columns, coords = ra_layout(messier_data)
+    ra_columns = {
+        hour: [{
+            'num': m_nums[i],
+            'name': messier_data[m_nums[i]]['name'],
+            'coords': coords[i],
+            'image': images.get(m_nums[i])
+        } for i in columns[hour]]
+        for hour in range(24)
+    }
+
+    captured = len(images)
+    percent = round(captured / 110 * 100, 1)
+
+    yield chart_head(captured, percent)
+    yield """    <div class="ra-grid" id="raGrid">
 """
 
     # Start at RA 20h and increase, wrapping around: 20, 21, 22, 23, 0, 1, 2, ... 18, 19
     hour_order = list(range(20, 24)) + list(range(0, 20))
 
+    search = []
     for hour in hour_order:
-        html += f"""        <div class="ra-column" data-ra="{hour}">
+        yield f"""        <div class="ra-column" data-ra="{hour}">
             <div class="ra-header">RA {hour}h</div>
 """
         for obj in ra_columns[hour]:
             m_num = obj['num']
             name = obj['name']
-            ra = obj['ra']
-            dec = obj['dec']
+            coord_str = obj['coords']
             image_path = obj['image']
 
             item_class = "messier-item captured" if image_path else "messier-item"
-
-            # Format coordinates
-            ra_h = int(ra)
-            ra_m = int((ra - ra_h) * 60)
-            dec_sign = '+' if dec >= 0 else ''
-            dec_d = int(abs(dec))
-            dec_m = int((abs(dec) - dec_d) * 60)
-
-            coord_str = f"RA {ra_h}h{ra_m}m, Dec {dec_sign}{int(dec)}°"
+            data = messier_data[m_num]
+            search.append(card_tokens(f'M{m_num}', name, data['type'], *data['constellation']))
 
             if image_path:
                 image_path_encoded = quote(image_path)
-                img_html = f'<img src="{image_path_encoded}" class="thumbnail" alt="M{m_num}" onclick="openModal(\'{image_path_encoded}\')" style="cursor: pointer;">'
+                thumb_encoded = quote(catalog.thumbnail(image_path, 'chart'))
+                img_html = f'<img src="{thumb_encoded}"{catalog.img_attrs(image_path)} class="thumbnail" alt="M{m_num}" onclick="openModal(\'{image_path_encoded}\')" style="cursor: pointer;">'
             else:
                 img_html = '<div class="placeholder">?</div>'
 
-            html += f"""            <div class="{item_class}">
+            yield f"""            <div class="{item_class}" data-object="M{m_num}">
                 <div class="messier-number">M{m_num}</div>
                 <div class="messier-name">{name}</div>
                 <div class="coords">{coord_str}</div>
@@ -538,153 +599,96 @@ def generate_ra_chart_html():
             </div>
 """
 
-        html += """        </div>
+        yield """        </div>
 """
 
-    html += """    </div>
-
-    <!-- Modal for full-size image viewing -->
-    <div id="imageModal" class="modal" onclick="closeModal()">
-        <span class="modal-close">&times;</span>
-        <img class="modal-content" id="modalImage">
-    </div>
-
-    <script>
-        // Sync scroll bars
-        const scrollTop = document.getElementById('scrollTop');
-        const raGrid = document.getElementById('raGrid');
-        const scrollContentTop = document.getElementById('scrollContentTop');
-
-        // Set the width of top scroller to match content width
-        function updateScrollWidth() {
-            scrollContentTop.style.width = raGrid.scrollWidth + 'px';
-        }
-
-        // Sync scroll positions
-        scrollTop.addEventListener('scroll', function() {
-            raGrid.scrollLeft = scrollTop.scrollLeft;
-        });
-
-        raGrid.addEventListener('scroll', function() {
-            scrollTop.scrollLeft = raGrid.scrollLeft;
-        });
-
-        // Update on load and resize
-        window.addEventListener('load', updateScrollWidth);
-        window.addEventListener('resize', updateScrollWidth);
-        updateScrollWidth();
-
-        // Modal functions
-        function openModal(imagePath) {
-            const modal = document.getElementById('imageModal');
-            const modalImg = document.getElementById('modalImage');
-            modal.classList.add('active');
-            modalImg.src = imagePath;
-        }
-
-        function closeModal() {
-            const modal = document.getElementById('imageModal');
-            modal.classList.remove('active');
-        }
-
-        // Close modal on Escape key
-        document.addEventListener('keydown', function(event) {
-            if (event.key === 'Escape') {
-                closeModal();
-            }
-        });
-
-        // RA Column Ordering
-        let isReversed = localStorage.getItem('raReversed') === 'true' || false;
-        let startRA = parseInt(localStorage.getItem('raStart') || '20');
-
-        // Set initial values
-        document.getElementById('startRA').value = startRA;
-
-        function reorderColumns() {
-            const grid = document.getElementById('raGrid');
-            const columns = Array.from(grid.querySelectorAll('.ra-column'));
-
-            // Create order array
-            let order = [];
-            for (let i = 0; i < 24; i++) {
-                order.push((startRA + i) % 24);
-            }
-
-            // Reverse if needed
-            if (isReversed) {
-                order.reverse();
-            }
-
-            // Sort columns by order
-            columns.sort((a, b) => {
-                const raA = parseInt(a.dataset.ra);
-                const raB = parseInt(b.dataset.ra);
-                return order.indexOf(raA) - order.indexOf(raB);
-            });
-
-            // Reappend in new order
-            columns.forEach(col => grid.appendChild(col));
-
-            // Update scroll width
-            updateScrollWidth();
-        }
-
-        // Start RA selector
-        document.getElementById('startRA').addEventListener('change', function() {
-            startRA = parseInt(this.value);
-            localStorage.setItem('raStart', startRA);
-            reorderColumns();
-        });
-
-        // Reverse button
-        document.getElementById('reverseBtn').addEventListener('click', function() {
-            isReversed = !isReversed;
-            localStorage.setItem('raReversed', isReversed);
-            reorderColumns();
-        });
-
-        // Apply initial order
-        reorderColumns();
+    yield "    </div>\n\n"
+    yield search_index_html(search, '.messier-item')
+    yield "\n" + MODAL_HTML + "\n" + SITE_SCRIPT_TAG
+    yield "    <script>\n" + CHART_SCRIPT + "\n" + STATIC_SCRIPT + "    </script>\n</body>\n</html>\n"
+
+def render_feed(catalog=None):
+    """Feed for the windowed chart: FEED_FIELDS item arrays, item numbers per RA hour and a search index."""
+    if catalog is None:
+        catalog = discover()
+    images = catalog.messier
+
+    m_nums, columns, coords = ra_layout(messier_data)
+    items = []
+    search = []
+    for i, m_num in enumerate(m_nums):
+        data = messier_data[m_num]
+        image_path = images.get(m_num)
+        thumb = catalog.thumbnail(image_path, 'chart') if image_path else ''
+        items.append([f'M{m_num}', data['name'], coords[i], quote(image_path or ''), quote(thumb)])
+        search.append(card_tokens(f'M{m_num}', data['name'], data['type'], *data['constellation']))
+
+    return {'fields': FEED_FIELDS, 'items': items, 'columns': columns, 'search': build_index(search)}
+
+
+def render_shell_html(catalog=None, feed='messier_ra_chart.json'):
+    """Chart shell with empty RA columns; the items come from feed, rendered per column as scrolled."""
+    if catalog is None:
+        catalog = discover()
+    captured = len(catalog.messier)
+    percent = round(captured / 110 * 100, 1)
 
-        // Filter function
-        function filterObjects() {
-            const filter = document.getElementById('filterInput').value.toLowerCase();
-            const items = document.querySelectorAll('.messier-item');
-
-            items.forEach(item => {
-                const number = item.querySelector('.messier-number').textContent.toLowerCase();
-                const name = item.querySelector('.messier-name').textContent.toLowerCase();
-                const text = number + ' ' + name;
-
-                if (text.includes(filter)) {
-                    item.style.display = '';
-                } else {
-                    item.style.display = 'none';
-                }
-            });
-        }
-        window.filterObjects = filterObjects;
-    </script>
-</body>
-</html>
+    yield chart_head(captured, percent, FEED_CSS)
+    yield f"""    <div class="ra-grid" id="raGrid" data-feed="{feed}" data-item-height="{ITEM_HEIGHT}">
 """
+    hour_order = list(range(20, 24)) + list(range(0, 20))
+    for hour in hour_order:
+        yield f"""        <div class="ra-column" data-ra="{hour}">
+            <div class="ra-header">RA {hour}h</div>
+            <div class="ra-items"><div class="ra-list"></div></div>
+        </div>
+"""
+    yield "    </div>\n\n" + MODAL_HTML + "\n" + SITE_SCRIPT_TAG
+    yield "    <script>\n" + CHART_SCRIPT + "\n" + FEED_SCRIPT + "    </script>\n</body>\n</html>\n"
 
-    return html
+
+def generate_ra_chart_html(catalog=None):
+    """Return the whole page as one string (see render_ra_chart_html)."""
+    return ''.join(render_ra_chart_html(catalog))
 
 if __name__ == '__main__':
-    html = generate_ra_chart_html()
     output_file = 'messier_ra_chart.html'
-    with open(output_file, 'w') as f:
-        f.write(html)
-    print(f"Created {output_file}")
+
+    args = generator_parser('Build the Messier RA chart (messier_ra_chart.html).').parse_args()
+    profiler = profiler_from_args(args)
+
+    # Refresh the scan manifest; only directories whose mtime changed are listed
+    with timed_phase(profiler, 'discovery'):
+        manifest, listing, rescanned = scan_targets()
+    state = page_state(manifest, listing, __file__, recorded_files(manifest, output_file), args.weights)
+    # Assets are written only when missing, so a deleted one comes back even if the page is current
+    write_assets()
+    if not args.force and output_is_current(manifest, output_file, state):
+        print(f"No changes under targets/, {output_file} left untouched")
+        sys.exit(0)
+
+    catalog = discover(listing, rescanned, args.weights, profiler=profiler)
+    with timed_phase(profiler, 'thumbnails'):
+        add_derivatives(catalog)
+    changed = write_profiled(profiler, output_file, render_ra_chart_html(catalog))
+    for path in remove_stale_siblings([output_file]):
+        print(f"Removed stale {path}")
+    print(f"{'Created' if changed else 'Unchanged'} {output_file} ({len(rescanned)} directories rescanned)")
+
+    state = page_state(manifest, listing, __file__, catalog.section_files('messier'), args.weights)
+    record_output(manifest, output_file, state)
+    save_manifest(manifest)
 
     # Print summary by RA hour
-    images = find_messier_images()
+    images = catalog.messier
     hour_order = list(range(20, 24)) + list(range(0, 20))
     print(f"\nMessier objects organized by RA hour (20h → 23h → 0h → 19h):")
+    m_nums, columns, _ = ra_layout(messier_data)
     for hour in hour_order:
-        objects_in_hour = [m for m, data in messier_data.items() if int(data['ra']) % 24 == hour]
+        objects_in_hour = [m_nums[i] for i in columns[hour]]
         captured_in_hour = [m for m in objects_in_hour if m in images]
         if objects_in_hour:
             print(f"  RA {hour}h: {len(captured_in_hour)}/{len(objects_in_hour)} captured")
+
+    if profiler is not None:
+        profiler.finish(args.profile_json)
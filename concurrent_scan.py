@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""Concurrent directory walking for targets/ on network mounts.
+
+On NFS/SMB every stat() and directory listing is a network round trip,
+and a serial walk pays them one after another.  walk_concurrent() fans
+the per-directory work out over asyncio, with the blocking calls on a
+thread pool whose size bounds how many are in flight at once.  Callers
+(scan_manifest.refresh_listing, target_scan.build_listing) collect into
+dicts keyed by path and sort what they return, so the result does not
+depend on the order calls complete in.
+"""
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+# Requests in flight; enough to hide NFS latency without flooding the server
+DEFAULT_CONCURRENCY = 16
+
+
+def walk_concurrent(root, visit, concurrency=DEFAULT_CONCURRENCY):
+    """Call visit(path) for root and every directory below it.
+
+    visit runs on a pool of `concurrency` threads and returns the paths of
+    the subdirectories to visit next; a directory's children are started
+    as soon as it has been visited.  Returns once the whole tree is done;
+    an exception from visit propagates.
+    """
+    async def run():
+        loop = asyncio.get_running_loop()
+        with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+            async def walk(path):
+                children = await loop.run_in_executor(executor, visit, path)
+                await asyncio.gather(*(walk(child) for child in children))
+            await walk(os.fspath(root))
+
+    asyncio.run(run())
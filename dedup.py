@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""Content-hash deduplication of the images under targets/.
+
+The same file often lands in the tree more than once: copied into a
+second target directory, under a dated subfolder as well as the target
+root, or into both 'NGC6960/' and 'NGC 6960/' by an export.
+find_duplicates() groups the image files by size, hashes only those
+whose size collides, and returns the groups with identical content.
+Discovery maps every copy to one canonical path, so each image is
+selected, thumbnailed and shipped once.
+
+Hashes are streamed in chunks and cached in .dedup_index.json by
+(device, inode, size, mtime), so warm builds only stat the files and
+hard links are hashed once.  The same cache gives the selected images
+their digests for thumbnail names (cached_digests).
+"""
+import hashlib
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+DEDUP_INDEX = '.dedup_index.json'
+
+HASH_CHUNK = 1 << 20
+
+
+def file_digest(path):
+    """SHA-256 of a file, read in streaming chunks."""
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def load_dedup_index(path=DEDUP_INDEX):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_dedup_index(index, path=DEDUP_INDEX):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(index, f, indent=0, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def stat_key(st):
+    """Cache key of a file: changes whenever its content can have changed."""
+    return f'{st.st_dev}:{st.st_ino}:{st.st_size}:{st.st_mtime_ns}'
+
+
+def canonical_order(path):
+    """Sort key picking the copy to keep: shallowest, then shortest path."""
+    return path.count(os.sep), len(path), path
+
+
+def _stat(path):
+    try:
+        return os.stat(path)
+    except OSError:
+        return None
+
+
+def find_duplicates(paths, index=None, concurrency=None):
+    """{digest: [paths]} for every group of files with identical content.
+
+    Each group is sorted with the canonical copy first.  index is a hash
+    cache from load_dedup_index(); it is updated in place and left
+    holding only files among paths.  With concurrency the files are
+    stat()ed that many at a time, for network mounts.
+    """
+    paths = list(paths)
+    if concurrency:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            stats = list(pool.map(_stat, paths))
+    else:
+        stats = [_stat(path) for path in paths]
+
+    by_size = {}
+    for path, st in zip(paths, stats):
+        if st is not None:
+            by_size.setdefault(st.st_size, []).append((path, st))
+
+    cache = index if index is not None else {}
+    hashed = {}
+    groups = {}
+    for same_size in by_size.values():
+        # A file with a unique size cannot have a duplicate
+        if len(same_size) < 2:
+            continue
+        for path, st in same_size:
+            key = stat_key(st)
+            digest = hashed.get(key) or cache.get(key)
+            if digest is None:
+                try:
+                    digest = file_digest(path)
+                except OSError:
+                    continue
+            hashed[key] = digest
+            groups.setdefault(digest, []).append(path)
+
+    if index is not None:
+        # Keep the digests of unhashed files too (see cached_digests)
+        current = {stat_key(st) for st in stats if st is not None}
+        for key in set(index) - current:
+            del index[key]
+        index.update(hashed)
+    return {digest: sorted(group, key=canonical_order)
+            for digest, group in groups.items() if len(group) > 1}
+
+
+def cached_digests(paths, index):
+    """{path: SHA-256} of each readable file in paths, through the hash cache index."""
+    digests = {}
+    for path in paths:
+        try:
+            key = stat_key(os.stat(path))
+            if key not in index:
+                index[key] = file_digest(path)
+        except OSError:
+            continue
+        digests[path] = index[key]
+    return digests
+
+
+def canonical_paths(duplicates):
+    """{path of a copy: canonical path} for the groups from find_duplicates()."""
+    return {path: group[0] for group in duplicates.values() for path in group[1:]}
+
+
+def reclaimable_bytes(duplicates):
+    """Bytes freed by deleting every copy but the canonical one.
+
+    Hard links to the same inode share their storage and free nothing.
+    """
+    total = 0
+    for group in duplicates.values():
+        inodes = {}
+        for path in group:
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            inodes[(st.st_dev, st.st_ino)] = st.st_size
+        total += sum(inodes.values()) - max(inodes.values(), default=0)
+    return total
+
+
+def report_duplicates(duplicates):
+    """Print each group of duplicates and the total reclaimable bytes."""
+    if not duplicates:
+        return
+    copies = sum(len(group) - 1 for group in duplicates.values())
+    print(f"{copies} duplicate images, {reclaimable_bytes(duplicates) / 1e6:.1f} MB reclaimable:")
+    for group in sorted(duplicates.values()):
+        print(f"  {group[0]}")
+        for path in group[1:]:
+            print(f"    = {path}")
@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""Shared discovery engine for all gallery pages.
+
+targets/ is scanned once (optionally through the scan manifest) and the
+result is turned into a typed Catalog holding both the best image per
+target directory and the best image per Messier number.  Every page
+renderer reads from that one in-memory result.
+"""
+import argparse
+import os
+import re
+from dataclasses import dataclass, field
+from urllib.parse import quote
+
+from dedup import cached_digests, canonical_paths, find_duplicates, load_dedup_index, save_dedup_index
+from image_metadata import cached_metadata, format_exposure
+from image_names import parse_image_name
+from profiling import timed_phase
+from sky_catalog import SkyObject, lookup_target
+from target_scan import (DEFAULT_WEIGHTS, best_candidate, build_listing, index_target_dir, integration_seconds,
+                         iter_image_files, list_subdirs, parse_weights, select_best_image, usable_candidates)
+
+# Target categories (directory name -> display type)
+CATEGORIES = {
+    'galaxies': 'Galaxy',
+    'clusters': 'Cluster',
+    'nebulae': 'Nebula'
+}
+
+
+@dataclass
+class TargetImage:
+    """Best image chosen for one target directory."""
+    name: str
+    path: str
+    type: str
+    category: str
+    display_name: str
+    sky: SkyObject = None     # sky catalog entry, when the name is a designation
+
+
+@dataclass
+class Catalog:
+    """Everything the page renderers need from one scan of targets/."""
+    targets: dict             # target directory name -> TargetImage
+    messier: dict             # Messier number -> image path
+    listing: dict = None      # {dir path: (files, subdirs)} the catalog was built from
+    rescanned: list = field(default_factory=list)
+    thumbnails: dict = field(default_factory=dict)  # image path -> {size name: thumbnail path}
+    variants: dict = field(default_factory=dict)    # image path -> [(path, width), ...] for srcset
+    dimensions: dict = field(default_factory=dict)  # image path -> (width, height) from its header
+    metadata: dict = field(default_factory=dict)    # image path -> embedded capture metadata
+    duplicates: dict = field(default_factory=dict)  # content digest -> [canonical path, copies...]
+    rejected: dict = field(default_factory=dict)    # corrupt image path -> reason it was skipped
+    digests: dict = field(default_factory=dict)     # selected image path -> SHA-256 of its content
+
+    def image_paths(self):
+        """Every selected image, across all pages."""
+        paths = {info.path for info in self.targets.values()}
+        paths.update(self.messier.values())
+        return sorted(paths)
+
+    def section_files(self, section):
+        """Files a page of section ('messier' or 'targets') depends on.
+
+        These are the images it shows with their thumbnails and srcset
+        variants, and the rejected images, which would be selected once
+        repaired.
+        """
+        if section == 'messier':
+            paths = set(self.messier.values())
+        else:
+            paths = {info.path for info in self.targets.values()}
+        for path in list(paths):
+            paths.update(self.thumbnails.get(path, {}).values())
+            paths.update(variant for variant, _ in self.variants.get(path, ()))
+        paths.update(self.rejected)
+        return sorted(paths)
+
+    def thumbnail(self, path, size):
+        """Thumbnail of path at the named size, or the original if there is none."""
+        return self.thumbnails.get(path, {}).get(size, path)
+
+    def img_attrs(self, path):
+        """Lazy-loading attributes, plus intrinsic width/height when known."""
+        attrs = ' loading="lazy" decoding="async"'
+        if path in self.dimensions:
+            width, height = self.dimensions[path]
+            attrs += f' width="{width}" height="{height}"'
+        return attrs
+
+    def capture_details(self, path):
+        """'2026-02-02 · 6 min 40 s · ZWO Seestar S30' for path, or ''.
+
+        Embedded metadata wins; without it the date and integration time
+        come from the file name.
+        """
+        meta = self.metadata.get(path, {})
+        parsed = parse_image_name(os.path.basename(path))
+        captured = meta.get('captured', '')[:10] or (parsed.date if parsed else None)
+        exposure = meta.get('exposure') or (integration_seconds(parsed) if parsed else 0)
+        parts = [captured, format_exposure(exposure) if exposure else None, meta.get('camera')]
+        return ' · '.join(part for part in parts if part)
+
+    def srcset(self, path):
+        """srcset value listing the width variants of path, or '' without variants."""
+        return ', '.join(f'{quote(p)} {w}w' for p, w in self.variants.get(path, ()))
+
+    def srcset_attrs(self, path, sizes):
+        """' srcset="..." sizes="..."' for an <img> of path, or '' without variants."""
+        srcset = self.srcset(path)
+        if not srcset:
+            return ''
+        return f' srcset="{srcset}" sizes="{sizes}"'
+
+
+# Find all stacked Messier images
+def find_messier_images(listing=None, weights=None, canonical=None, rejected=()):
+    """Best image per Messier number across the whole tree.
+
+    Final processed PNGs (M##_YYYY-MM-DD.png, then M##.png) rank above
+    stacked JPGs; best_candidate() breaks ties within a tier by
+    integration time and capture date.  canonical collapses duplicate
+    files and rejected ones are skipped (see target_scan.usable_candidates).
+    """
+    candidates = {}
+
+    # One walk of targets/ (or the manifest listing); each name is parsed once
+    for path in iter_image_files('targets', listing):
+        parsed = parse_image_name(os.path.basename(path))
+        if parsed.ext == 'png' and parsed.stem[:1] in ('M', 'm'):
+            tier = 'dated_png' if parsed.date is not None else 'exact_png'
+        elif parsed.ext == 'jpg' and parsed.stack_count is not None:
+            tier = 'stacked_jpg'
+        else:
+            continue
+
+        m_num = parsed.messier_number()
+        # Only accept valid Messier numbers (1-110)
+        if m_num is None or m_num < 1 or m_num > 110:
+            continue
+        candidates.setdefault(m_num, []).append((tier, path, parsed))
+
+    best = {m_num: best_candidate(usable_candidates(group, canonical, rejected), weights)
+            for m_num, group in candidates.items()}
+    return {m_num: path for m_num, path in best.items() if path}
+
+
+def find_all_target_images(listing=None, weights=None, canonical=None, rejected=()):
+    """Find the best image for each target across all categories.
+
+    listing is an optional scan-manifest listing; without it the target
+    directories are read straight from disk.  weights override
+    target_scan.DEFAULT_WEIGHTS; canonical collapses duplicate files and
+    paths in rejected are never selected.
+    """
+    target_images = {}
+
+    for category, obj_type in CATEGORIES.items():
+        category_path = os.path.join('targets', category)
+
+        # Get all target directories
+        for target_dir in list_subdirs(category_path, listing):
+            target_name = os.path.basename(target_dir)
+
+            # One pass over the directory builds the candidate index;
+            # selection then reads from it instead of re-walking the tree
+            candidates = index_target_dir(target_dir, target_name, listing)
+            best_image = select_best_image(candidates, weights, canonical, rejected)
+
+            if best_image:
+                target_images[target_name] = TargetImage(
+                    name=target_name,
+                    path=best_image,
+                    type=obj_type,
+                    category=category,
+                    display_name=format_target_name(target_name),
+                    sky=lookup_target(target_name),
+                )
+
+    return target_images
+
+
+def format_target_name(name):
+    """Format target name for display."""
+    # Handle Messier objects
+    if name.lower().startswith('m') and name[1:].split('_')[0].isdigit():
+        m_num = name[1:].split('_')[0]
+        return f'M{m_num}'
+
+    # Handle NGC objects
+    if 'ngc' in name.lower():
+        ngc_match = re.search(r'ngc(\d+)', name, re.IGNORECASE)
+        if ngc_match:
+            return f'NGC {ngc_match.group(1)}'
+
+    # Handle IC objects
+    if 'ic' in name.lower():
+        ic_match = re.search(r'ic(\d+)', name, re.IGNORECASE)
+        if ic_match:
+            return f'IC {ic_match.group(1)}'
+
+    # Handle Caldwell objects
+    if name.lower().startswith('c') and name[1:].split('_')[0].isdigit():
+        c_num = name[1:].split('_')[0]
+        return f'C{c_num}'
+
+    # Otherwise, title case with underscores replaced by spaces
+    return name.replace('_', ' ').title()
+
+
+def _weights_arg(text):
+    try:
+        return parse_weights(text)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def selection_parser():
+    """Argument parser holding --weights, for use as a parent parser."""
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument('--weights', type=_weights_arg, metavar='NAME=VALUE,...',
+                        help='image selection weights, e.g. tier=0 to let newer or longer stacks beat '
+                             'processed images (default: ' +
+                             ','.join(f'{name}={value:g}' for name, value in DEFAULT_WEIGHTS.items()) + ')')
+    return parser
+
+
+def discover(listing=None, rescanned=None, weights=None, concurrency=None, profiler=None):
+    """Scan targets/ once and return the Catalog every page renders from.
+
+    Pass the listing from scan_manifest.scan_targets() to reuse the
+    manifest; otherwise the tree is walked from disk exactly once.
+    weights tune image selection (see target_scan.best_candidate).
+    Identical copies of an image are collapsed to one path (see dedup.py),
+    and selected files that fail header validation (see image_probe.py)
+    are rejected in favour of the next best candidate.  concurrency
+    runs the filesystem calls that many at a time (see concurrent_scan.py).
+    profiler times the discovery and selection phases (see profiling.py).
+    """
+    with timed_phase(profiler, 'discovery') as phase:
+        if listing is None:
+            listing = build_listing('targets', concurrency)
+        images = list(iter_image_files('targets', listing))
+        hash_index = load_dedup_index()
+        duplicates = find_duplicates(images, hash_index, concurrency)
+        canonical = canonical_paths(duplicates)
+        phase.count('images', len(images))
+        phase.count('duplicates', len(canonical))
+
+    with timed_phase(profiler, 'selection') as phase:
+        catalog = _select(listing, rescanned, weights, duplicates, canonical)
+        # Thumbnails are named by content; most digests are already cached
+        catalog.digests = cached_digests(catalog.image_paths(), hash_index)
+        save_dedup_index(hash_index)
+        phase.count('selected', len(catalog.metadata))
+        phase.count('rejected', len(catalog.rejected))
+    return catalog
+
+
+def _select(listing, rescanned, weights, duplicates, canonical):
+    """Catalog of the best valid images; see discover()."""
+    # Only selected images are validated: select, drop the corrupt ones,
+    # select again until every pick holds up
+    rejected = {}
+    probed = set()
+    while True:
+        catalog = Catalog(
+            targets=find_all_target_images(listing, weights, canonical, rejected),
+            messier=find_messier_images(listing, weights, canonical, rejected),
+            listing=listing,
+            rescanned=list(rescanned or []),
+            duplicates=duplicates,
+        )
+        probed.update(catalog.image_paths())
+        # Header-only reads, cached by size and mtime; give every <img> its
+        # intrinsic size up front and every card its capture details
+        metadata = cached_metadata(sorted(probed))
+        corrupt = {path: metadata[path]['error'] for path in catalog.image_paths()
+                   if 'error' in metadata.get(path, {})}
+        if not corrupt:
+            break
+        rejected.update(corrupt)
+
+    catalog.rejected = rejected
+    catalog.metadata = {path: metadata[path] for path in catalog.image_paths() if path in metadata}
+    catalog.dimensions = {path: (meta['width'], meta['height'])
+                          for path, meta in catalog.metadata.items()}
+    return catalog
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""Capture metadata embedded in the images, read from headers only.
+
+Seestar JPGs carry EXIF (capture time, total exposure, model, firmware)
+in their APP1 segment; processed PNGs may carry tEXt/zTXt/iTXt chunks or
+an eXIf chunk, including the hex-encoded 'Raw profile type exif' that
+ImageMagick and GIMP write.  Reading stops at the first frame header
+(JPEG) or image data chunk (PNG), so pixels are never decoded; files
+are validated and memory-mapped as in image_probe.py, and a corrupt one
+is recorded with its error instead of its metadata.
+
+Results are cached in .metadata_cache.json by (path, size, mtime): a
+warm rebuild only stats the files and never opens them.
+"""
+import json
+import os
+import re
+import struct
+import zlib
+
+from image_probe import PNG_SIGNATURE, jpeg_segments, mapped, png_chunks, probe_images, validated_size
+
+METADATA_CACHE = '.metadata_cache.json'
+CACHE_VERSION = 2
+
+APP1_MARKER = 0xE1
+
+# EXIF tags read from IFD0 and the Exif sub-IFD
+TAG_MAKE = 0x010F
+TAG_MODEL = 0x0110
+TAG_SOFTWARE = 0x0131
+TAG_DATETIME = 0x0132
+TAG_EXIF_IFD = 0x8769
+TAG_EXPOSURE_TIME = 0x829A
+TAG_DATETIME_ORIGINAL = 0x9003
+
+# TIFF field type -> (struct code, size); RATIONAL is two LONGs
+TIFF_TYPES = {1: ('B', 1), 2: ('s', 1), 3: ('H', 2), 4: ('I', 4), 5: ('II', 8),
+              7: ('s', 1), 9: ('i', 4), 10: ('ii', 8)}
+
+# EXIF 'YYYY:MM:DD HH:MM:SS', Seestar 'YYYY.MM.DD HH:MM:SS', ISO dates
+DATETIME_RE = re.compile(r'(\d{4})\D(\d{2})\D(\d{2})(?:[ T](\d{2}):(\d{2})(?::(\d{2}))?)?')
+
+# PNG text keywords holding an EXIF blob as hex
+RAW_EXIF_KEYWORDS = ('Raw profile type exif', 'Raw profile type APP1')
+
+
+def normalise_datetime(text):
+    """'2026:02:02 20:36:15' -> '2026-02-02T20:36:15' (date only if no time), else None."""
+    match = DATETIME_RE.match(text.strip())
+    if not match:
+        return None
+    year, month, day, hour, minute, second = match.groups()
+    if hour is None:
+        return f'{year}-{month}-{day}'
+    return f'{year}-{month}-{day}T{hour}:{minute}:{second or "00"}'
+
+
+def _ifd_entries(tiff, offset, order):
+    """{tag: value} of the IFD at offset; strings decoded, rationals as floats."""
+    (count,) = struct.unpack_from(order + 'H', tiff, offset)
+    entries = {}
+    for i in range(count):
+        tag, kind, n, value_offset = struct.unpack_from(order + 'HHI4s', tiff, offset + 2 + 12 * i)
+        if kind not in TIFF_TYPES:
+            continue
+        code, size = TIFF_TYPES[kind]
+        if size * n <= 4:
+            data = value_offset[:size * n]
+        else:
+            (start,) = struct.unpack(order + 'I', value_offset)
+            data = tiff[start:start + size * n]
+        if len(data) < size * n:
+            continue
+        if code == 's':
+            entries[tag] = data.split(b'\0', 1)[0].decode('utf-8', 'replace').strip()
+        elif code in ('II', 'ii'):
+            num, den = struct.unpack_from(order + code, data)
+            entries[tag] = num / den if den else None
+        else:
+            entries[tag] = struct.unpack_from(order + code, data)[0]
+    return entries
+
+
+def parse_exif(data):
+    """Capture fields from an EXIF blob (optionally 'Exif\\0\\0'-prefixed TIFF)."""
+    if data.startswith(b'Exif\0\0'):
+        data = data[6:]
+    order = {b'II': '<', b'MM': '>'}.get(data[:2])
+    if order is None:
+        return {}
+    try:
+        (ifd0,) = struct.unpack_from(order + 'I', data, 4)
+        tags = _ifd_entries(data, ifd0, order)
+        if TAG_EXIF_IFD in tags:
+            tags.update(_ifd_entries(data, tags[TAG_EXIF_IFD], order))
+    except struct.error:
+        return {}
+
+    meta = {}
+    captured = tags.get(TAG_DATETIME_ORIGINAL) or tags.get(TAG_DATETIME)
+    if isinstance(captured, str) and normalise_datetime(captured):
+        meta['captured'] = normalise_datetime(captured)
+    if isinstance(tags.get(TAG_EXPOSURE_TIME), float):
+        meta['exposure'] = tags[TAG_EXPOSURE_TIME]
+    make, model = str(tags.get(TAG_MAKE) or ''), str(tags.get(TAG_MODEL) or '')
+    camera = model if make in model else f'{make} {model}'.strip()
+    if camera:
+        meta['camera'] = camera
+    if tags.get(TAG_SOFTWARE):
+        meta['software'] = str(tags[TAG_SOFTWARE])
+    return meta
+
+
+def _raw_profile(text):
+    """Bytes of an ImageMagick raw profile: '\\nexif\\n  <length>\\n<hex lines>'."""
+    lines = text.strip().split('\n')
+    return bytes.fromhex(''.join(lines[2:]))
+
+
+def _png_text(kind, data):
+    """(keyword, text) of a tEXt/zTXt/iTXt chunk."""
+    keyword, _, rest = data.partition(b'\0')
+    if kind == b'zTXt':
+        rest = zlib.decompress(rest[1:])
+    elif kind == b'iTXt':
+        compressed, rest = rest[0], rest[2:]
+        rest = rest.split(b'\0', 2)[2]  # skip language tag and translated keyword
+        if compressed:
+            rest = zlib.decompress(rest)
+        return keyword.decode('latin-1'), rest.decode('utf-8', 'replace')
+    return keyword.decode('latin-1'), rest.decode('latin-1')
+
+
+def _png_metadata(buf):
+    meta = {}
+    for kind, offset, length in png_chunks(buf):
+        if kind not in (b'tEXt', b'zTXt', b'iTXt', b'eXIf'):
+            continue
+        data = buf[offset:offset + length]
+        try:
+            if kind == b'eXIf':
+                meta.update(parse_exif(data))
+                continue
+            keyword, text = _png_text(kind, data)
+            if keyword in RAW_EXIF_KEYWORDS:
+                meta.update(parse_exif(_raw_profile(text)))
+            elif keyword == 'Software':
+                meta['software'] = text.strip()
+            elif keyword == 'Creation Time' and normalise_datetime(text):
+                meta.setdefault('captured', normalise_datetime(text))
+        except (ValueError, IndexError, zlib.error):
+            continue
+    return meta
+
+
+def _jpeg_metadata(buf):
+    # EXIF comes before the frame header in practice
+    meta = {}
+    for code, offset, length in jpeg_segments(buf):
+        if code == APP1_MARKER and buf[offset:offset + 6] == b'Exif\0\0':
+            meta.update(parse_exif(buf[offset:offset + length]))
+    return meta
+
+
+def read_metadata(path):
+    """{width, height, and whichever of captured, exposure, camera, software the file has}.
+
+    The file is validated as image_probe.image_size() does; raises
+    ValueError for unknown formats, malformed headers and truncated files.
+    """
+    with mapped(path) as buf:
+        width, height = validated_size(buf)
+        meta = _png_metadata(buf) if buf[:8] == PNG_SIGNATURE else _jpeg_metadata(buf)
+    return dict(meta, width=width, height=height)
+
+
+def format_exposure(seconds):
+    """Total exposure for display: '45 s', '6 min 40 s', '1 h 25 min'."""
+    seconds = round(seconds)
+    if seconds < 60:
+        return f'{seconds} s'
+    minutes, seconds = divmod(seconds, 60)
+    if minutes < 60:
+        return f'{minutes} min {seconds} s' if seconds else f'{minutes} min'
+    hours, minutes = divmod(minutes, 60)
+    return f'{hours} h {minutes} min' if minutes else f'{hours} h'
+
+
+def load_metadata_cache(path=METADATA_CACHE):
+    """{image path: [size, mtime_ns, metadata]}, or {} if missing or stale."""
+    try:
+        with open(path) as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get('version') != CACHE_VERSION:
+        return {}
+    return data.get('files', {})
+
+
+def save_metadata_cache(cache, path=METADATA_CACHE):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump({'version': CACHE_VERSION, 'files': cache}, f, separators=(',', ':'), sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def cached_metadata(paths, cache_path=METADATA_CACHE):
+    """{path: metadata} for paths, reading only files whose size or mtime changed.
+
+    Changed files are read on a thread pool.  A corrupt or unreadable one
+    gets {'error': reason}.  The cache is rewritten only when an entry was
+    added, refreshed or dropped, and keeps just the given paths.
+    """
+    cache = load_metadata_cache(cache_path)
+    fresh = {}
+    stale = {}
+    for path in paths:
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        entry = cache.get(path)
+        if entry is None or entry[0] != st.st_size or entry[1] != st.st_mtime_ns:
+            stale[path] = st
+        else:
+            fresh[path] = entry
+
+    for path, meta in probe_images(stale, read_metadata).items():
+        if isinstance(meta, Exception):
+            meta = {'error': str(meta)}
+        fresh[path] = [stale[path].st_size, stale[path].st_mtime_ns, meta]
+
+    if fresh != cache:
+        save_metadata_cache(fresh, cache_path)
+    return {path: entry[2] for path, entry in fresh.items()}
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""Parsing of Seestar and processed image file names.
+
+Every name the scanner sees goes through one precompiled regex, which
+recognises the three shapes found under targets/:
+
+  Stacked_514_M 42_10.0s_LP_20260121-221643.jpg   Seestar stack
+  m42_2026-01-21.png                              processed, dated
+  eastern_veil.png                                anything else
+
+and returns an ImageName record with whatever the name carries: stack
+count, object designation, sub-exposure, filter and capture date/time.
+"""
+import re
+
+NAME_RE = re.compile(r'''
+    (?:
+        # Seestar stack: Stacked_<count>_<object>_<exp>s_<filter>_<YYYYMMDD>[-<HHMMSS>]
+        Stacked_(?:(?P<count>\d+)_)?(?P<object>.+?)
+        (?:_(?P<exposure>\d+(?:\.\d+)?)s_(?P<filter>[A-Za-z0-9]+)
+           _(?P<stamp>\d{8})(?:-(?P<time>\d{6}))?)?
+      |
+        # Processed image: <title>_YYYY-MM-DD
+        (?:.*\W)?(?P<title>\w+)_(?P<date>\d{4}-\d{2}-\d{2})
+      |
+        .*
+    )
+    \.(?P<ext>\w+)$
+''', re.VERBOSE)
+
+# Messier designation inside a stack's object name ("M 42") and at the end
+# of a processed name ("m42", "M31")
+STACK_MESSIER_RE = re.compile(r'(?:^|[\s_])M\s+(\d{1,3})(?:[\s_.]|$)', re.IGNORECASE)
+MESSIER_SUFFIX_RE = re.compile(r'M(\d{1,3})$', re.IGNORECASE)
+
+
+class ImageName:
+    """Fields parsed from one image file name.
+
+    stack_count is None for anything that is not a Seestar stack (and 0
+    for a stack name without a count); date is always 'YYYY-MM-DD' and
+    time 'HHMMSS' when the name carries them.
+    """
+    __slots__ = ('stem', 'ext', 'stack_count', 'designation',
+                 'exposure', 'filter', 'date', 'time')
+
+    def __init__(self, stem, ext, stack_count=None, designation=None,
+                 exposure=None, filter=None, date=None, time=None):
+        self.stem = stem
+        self.ext = ext
+        self.stack_count = stack_count
+        self.designation = designation
+        self.exposure = exposure
+        self.filter = filter
+        self.date = date
+        self.time = time
+
+    def __repr__(self):
+        fields = ', '.join(f'{name}={getattr(self, name)!r}' for name in self.__slots__
+                           if getattr(self, name) is not None)
+        return f'ImageName({fields})'
+
+    def messier_number(self):
+        """Messier number the name refers to, or None (range is not checked)."""
+        if self.stack_count is not None:
+            match = STACK_MESSIER_RE.search(self.designation)
+        else:
+            match = MESSIER_SUFFIX_RE.search(self.designation)
+        return int(match.group(1)) if match else None
+
+
+def parse_image_name(name):
+    """Parse a file name (no directory part); None if it has no extension."""
+    match = NAME_RE.match(name)
+    if match is None:
+        return None
+    count, obj, exposure, filt, stamp, time, title, date, ext = match.group(
+        'count', 'object', 'exposure', 'filter', 'stamp', 'time', 'title', 'date', 'ext')
+    stem = name[:-len(ext) - 1]
+
+    if obj is not None:
+        return ImageName(
+            stem, ext,
+            stack_count=int(count) if count else 0,
+            designation=obj,
+            exposure=float(exposure) if exposure else None,
+            filter=filt,
+            date=f'{stamp[:4]}-{stamp[4:6]}-{stamp[6:]}' if stamp else None,
+            time=time,
+        )
+    if title is not None:
+        return ImageName(stem, ext, designation=title, date=date)
+    return ImageName(stem, ext, designation=stem)
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""Header-only image probing and validation.
+
+Each file is memory-mapped and only the pages holding its headers and its
+end are touched: the IHDR chunk and IEND trailer of a PNG, the SOI
+marker, first SOFn segment and EOI marker of a JPEG.  Pixel data is
+never decoded, so probing a 10 MB stack costs a few page faults, and a
+truncated upload (no IEND / EOI) is rejected instead of published.
+
+probe_images() runs over many files on a thread pool, since on a cold
+cache the time goes into opening, mapping and faulting in files.
+"""
+import mmap
+import os
+import struct
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+# Zero-length IEND chunk with its fixed CRC; always the last 12 bytes
+PNG_IEND = b'\x00\x00\x00\x00IEND\xaeB`\x82'
+
+JPEG_SOI = b'\xff\xd8'
+JPEG_EOI = b'\xff\xd9'
+# Some writers pad after EOI; it must appear within this many final bytes
+JPEG_TAIL = 1024
+
+# JPEG start-of-frame markers carry the dimensions; C4/C8/CC share the
+# range but are DHT/JPG/DAC segments
+SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+# Markers without a length field (RSTn, SOI, TEM); EOI is handled apart
+STANDALONE_MARKERS = frozenset(range(0xD0, 0xD9)) | {0x01}
+
+SOS_MARKER = 0xDA
+
+# Threads for probe_images(); mostly waiting on the disk, so more than CPUs
+PROBE_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+PROBE_CHUNKS_PER_WORKER = 4
+
+
+@contextmanager
+def mapped(path):
+    """Read-only memory map of a whole file (ValueError if it is empty)."""
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            raise ValueError('empty file')
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            yield buf
+
+
+def png_chunks(buf):
+    """Yield (type, data offset, length) of each PNG chunk before the image data."""
+    offset = len(PNG_SIGNATURE)
+    while offset + 8 <= len(buf):
+        length, kind = struct.unpack_from('>I4s', buf, offset)
+        if kind in (b'IDAT', b'IEND'):
+            return
+        yield kind, offset + 8, length
+        offset += 12 + length
+
+
+def jpeg_segments(buf):
+    """Yield (marker, data offset, length) of each JPEG segment up to the first frame header.
+
+    The SOFn segment is the last one yielded; raises ValueError if the
+    scan data or the end of the file comes first.
+    """
+    offset = len(JPEG_SOI)
+    end = len(buf)
+    while True:
+        offset = buf.find(b'\xff', offset)
+        # Skip fill bytes between markers
+        while 0 <= offset < end - 1 and buf[offset + 1] == 0xFF:
+            offset += 1
+        if offset < 0 or offset >= end - 1:
+            raise ValueError('JPEG ended before a frame header')
+        code = buf[offset + 1]
+        offset += 2
+        if code in STANDALONE_MARKERS or code == 0x00:
+            continue
+        if code in (0xD9, SOS_MARKER):
+            raise ValueError('JPEG has no frame header')
+        if offset + 2 > end:
+            raise ValueError('truncated JPEG segment')
+        (length,) = struct.unpack_from('>H', buf, offset)
+        if length < 2 or offset + length > end:
+            raise ValueError('truncated JPEG segment')
+        yield code, offset + 2, length - 2
+        if code in SOF_MARKERS:
+            return
+        offset += length
+
+
+def png_size(buf):
+    """(width, height) of a mapped PNG after checking its IHDR and IEND."""
+    if buf[12:16] != b'IHDR' or len(buf) < 8 + 25:
+        raise ValueError('PNG without IHDR chunk')
+    if buf[-len(PNG_IEND):] != PNG_IEND:
+        raise ValueError('truncated PNG (no IEND chunk)')
+    return struct.unpack_from('>II', buf, 16)
+
+
+def jpeg_size(buf):
+    """(width, height) of a mapped JPEG after checking its SOF and EOI."""
+    for code, offset, length in jpeg_segments(buf):
+        if code in SOF_MARKERS:
+            if length < 5:
+                raise ValueError('truncated JPEG frame header')
+            height, width = struct.unpack_from('>xHH', buf, offset)
+            break
+    if buf.rfind(JPEG_EOI, max(0, len(buf) - JPEG_TAIL)) < 0:
+        raise ValueError('truncated JPEG (no EOI marker)')
+    return width, height
+
+
+def validated_size(buf):
+    """(width, height) of a mapped PNG or JPEG; ValueError if it is unknown or corrupt."""
+    if buf[:8] == PNG_SIGNATURE:
+        return png_size(buf)
+    if buf[:2] == JPEG_SOI:
+        return jpeg_size(buf)
+    raise ValueError('not a PNG or JPEG file')
+
+
+def image_size(path):
+    """(width, height) of a PNG or JPEG, read from its header.
+
+    The file is validated too; raises ValueError for unknown formats,
+    malformed headers and truncated files.
+    """
+    with mapped(path) as buf:
+        return validated_size(buf)
+
+
+def probe_images(paths, probe=image_size, workers=None):
+    """{path: probe(path) or the ValueError/OSError it raised}, on a thread pool."""
+    def run(path):
+        try:
+            return probe(path)
+        except (OSError, ValueError) as e:
+            return e
+        except struct.error as e:
+            return ValueError(f'malformed header: {e}')
+
+    def run_chunk(chunk):
+        return [run(path) for path in chunk]
+
+    paths = list(paths)
+    workers = max(1, min(workers or PROBE_WORKERS, len(paths)))
+    if workers == 1:
+        return {path: run(path) for path in paths}
+    # A few chunks per thread keeps the pool busy without a task per file
+    size = -(-len(paths) // (workers * PROBE_CHUNKS_PER_WORKER))
+    chunks = [paths[i:i + size] for i in range(0, len(paths), size)]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = [result for chunk in pool.map(run_chunk, chunks) for result in chunk]
+    return dict(zip(paths, results))
+
+
+def probe_dimensions(paths, workers=None):
+    """{path: (width, height)} for every path that is a valid PNG or JPEG."""
+    return {path: result for path, result in probe_images(paths, workers=workers).items()
+            if not isinstance(result, Exception)}
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""Write sky_catalog.bin from the built-in Messier table and OpenNGC data.
+
+The Messier objects below (names and coordinates as shown on the Messier
+pages) are always included.  Pass OpenNGC's NGC.csv and addendum.csv
+(https://github.com/mattiaverga/OpenNGC) to add the ~13k NGC/IC objects;
+their magnitudes and sizes are copied onto the Messier entries they
+cross-reference.  Caldwell numbers come from an optional CSV of
+"C14,NGC869" lines and are stored as aliases.
+
+Usage: python make_sky_catalog.py [NGC.csv [addendum.csv ...]] [--caldwell FILE]
+"""
+import argparse
+import csv
+import os
+
+from sky_catalog import (ALIAS_FORMAT, CATALOG_PATH, HEADER_FORMAT, MAGIC, RECORD_FORMAT, TYPES,
+                         designation_key)
+
+# Messier number -> (name, RA hours, Dec degrees, OpenNGC type, constellation)
+MESSIER = {
+    1: ("Crab Nebula", 5.575, 22.017, "SNR", "Tau"),
+    2: ("Globular Cluster", 21.558, -0.823, "GCl", "Aqr"),
+    3: ("Globular Cluster", 13.703, 28.377, "GCl", "CVn"),
+    4: ("Globular Cluster", 16.393, -26.525, "GCl", "Sco"),
+    5: ("Globular Cluster", 15.308, 2.081, "GCl", "Ser"),
+    6: ("Butterfly Cluster", 17.667, -32.217, "OCl", "Sco"),
+    7: ("Ptolemy Cluster", 17.897, -34.817, "OCl", "Sco"),
+    8: ("Lagoon Nebula", 18.061, -24.383, "HII", "Sgr"),
+    9: ("Globular Cluster", 17.318, -18.517, "GCl", "Oph"),
+    10: ("Globular Cluster", 16.95, -4.1, "GCl", "Oph"),
+    11: ("Wild Duck Cluster", 18.85, -6.267, "OCl", "Sct"),
+    12: ("Globular Cluster", 16.783, -1.95, "GCl", "Oph"),
+    13: ("Hercules Cluster", 16.694, 36.46, "GCl", "Her"),
+    14: ("Globular Cluster", 17.628, -3.25, "GCl", "Oph"),
+    15: ("Globular Cluster", 21.5, 12.167, "GCl", "Peg"),
+    16: ("Eagle Nebula", 18.314, -13.783, "Cl+N", "Ser"),
+    17: ("Omega Nebula", 18.344, -16.183, "HII", "Sgr"),
+    18: ("Open Cluster", 18.333, -17.117, "OCl", "Sgr"),
+    19: ("Globular Cluster", 17.044, -26.267, "GCl", "Oph"),
+    20: ("Trifid Nebula", 18.035, -23.033, "HII", "Sgr"),
+    21: ("Open Cluster", 18.079, -22.5, "OCl", "Sgr"),
+    22: ("Sagittarius Cluster", 18.605, -23.9, "GCl", "Sgr"),
+    23: ("Open Cluster", 17.95, -19.017, "OCl", "Sgr"),
+    24: ("Sagittarius Star Cloud", 18.283, -18.417, "*Ass", "Sgr"),
+    25: ("Open Cluster", 18.528, -19.25, "OCl", "Sgr"),
+    26: ("Open Cluster", 18.758, -9.4, "OCl", "Sct"),
+    27: ("Dumbbell Nebula", 19.992, 22.717, "PN", "Vul"),
+    28: ("Globular Cluster", 18.408, -24.867, "GCl", "Sgr"),
+    29: ("Open Cluster", 20.397, 38.533, "OCl", "Cyg"),
+    30: ("Globular Cluster", 21.673, -23.183, "GCl", "Cap"),
+    31: ("Andromeda Galaxy", 0.712, 41.269, "G", "And"),
+    32: ("Dwarf Galaxy", 0.712, 40.867, "G", "And"),
+    33: ("Triangulum Galaxy", 1.564, 30.66, "G", "Tri"),
+    34: ("Open Cluster", 2.708, 42.767, "OCl", "Per"),
+    35: ("Open Cluster", 6.148, 24.333, "OCl", "Gem"),
+    36: ("Open Cluster", 5.602, 34.133, "OCl", "Aur"),
+    37: ("Open Cluster", 5.875, 32.55, "OCl", "Aur"),
+    38: ("Open Cluster", 5.478, 35.833, "OCl", "Aur"),
+    39: ("Open Cluster", 21.533, 48.433, "OCl", "Cyg"),
+    40: ("Winnecke 4", 12.367, 58.083, "**", "UMa"),
+    41: ("Open Cluster", 6.783, -20.75, "OCl", "CMa"),
+    42: ("Orion Nebula", 5.588, -5.4, "HII", "Ori"),
+    43: ("De Mairan's Nebula", 5.592, -5.267, "HII", "Ori"),
+    44: ("Beehive Cluster", 8.667, 19.983, "OCl", "Cnc"),
+    45: ("Pleiades", 3.783, 24.117, "OCl", "Tau"),
+    46: ("Open Cluster", 7.698, -14.817, "OCl", "Pup"),
+    47: ("Open Cluster", 7.608, -14.5, "OCl", "Pup"),
+    48: ("Open Cluster", 8.227, -5.8, "OCl", "Hya"),
+    49: ("Elliptical Galaxy", 12.498, 8.0, "G", "Vir"),
+    50: ("Open Cluster", 7.053, -8.333, "OCl", "Mon"),
+    51: ("Whirlpool Galaxy", 13.498, 47.195, "G", "CVn"),
+    52: ("Open Cluster", 23.408, 61.583, "OCl", "Cas"),
+    53: ("Globular Cluster", 13.213, 18.167, "GCl", "Com"),
+    54: ("Globular Cluster", 18.917, -30.483, "GCl", "Sgr"),
+    55: ("Globular Cluster", 19.667, -30.967, "GCl", "Sgr"),
+    56: ("Globular Cluster", 19.278, 30.183, "GCl", "Lyr"),
+    57: ("Ring Nebula", 18.892, 33.033, "PN", "Lyr"),
+    58: ("Barred Spiral Galaxy", 12.62, 11.817, "G", "Vir"),
+    59: ("Elliptical Galaxy", 12.703, 11.65, "G", "Vir"),
+    60: ("Elliptical Galaxy", 12.728, 11.55, "G", "Vir"),
+    61: ("Spiral Galaxy", 12.365, 4.467, "G", "Vir"),
+    62: ("Globular Cluster", 17.017, -30.117, "GCl", "Oph"),
+    63: ("Sunflower Galaxy", 13.26, 42.033, "G", "CVn"),
+    64: ("Black Eye Galaxy", 12.943, 21.683, "G", "Com"),
+    65: ("Spiral Galaxy", 11.308, 13.1, "G", "Leo"),
+    66: ("Spiral Galaxy", 11.333, 12.983, "G", "Leo"),
+    67: ("Open Cluster", 8.85, 11.8, "OCl", "Cnc"),
+    68: ("Globular Cluster", 12.658, -26.75, "GCl", "Hya"),
+    69: ("Globular Cluster", 18.517, -32.35, "GCl", "Sgr"),
+    70: ("Globular Cluster", 18.723, -32.283, "GCl", "Sgr"),
+    71: ("Globular Cluster", 19.897, 18.783, "GCl", "Sge"),
+    72: ("Globular Cluster", 20.892, -12.533, "GCl", "Aqr"),
+    73: ("Asterism", 20.98, -12.633, "*Ass", "Aqr"),
+    74: ("Spiral Galaxy", 1.614, 15.783, "G", "Psc"),
+    75: ("Globular Cluster", 20.101, -21.917, "GCl", "Sgr"),
+    76: ("Little Dumbbell Nebula", 1.703, 51.575, "PN", "Per"),
+    77: ("Spiral Galaxy", 2.713, -0.013, "G", "Cet"),
+    78: ("Reflection Nebula", 5.775, 0.05, "RfN", "Ori"),
+    79: ("Globular Cluster", 5.405, -24.533, "GCl", "Lep"),
+    80: ("Globular Cluster", 16.283, -22.983, "GCl", "Sco"),
+    81: ("Bode's Galaxy", 9.928, 69.067, "G", "UMa"),
+    82: ("Cigar Galaxy", 9.928, 69.683, "G", "UMa"),
+    83: ("Southern Pinwheel", 13.617, -29.867, "G", "Hya"),
+    84: ("Lenticular Galaxy", 12.423, 12.883, "G", "Vir"),
+    85: ("Lenticular Galaxy", 12.425, 18.192, "G", "Com"),
+    86: ("Lenticular Galaxy", 12.433, 12.95, "G", "Vir"),
+    87: ("Virgo A", 12.514, 12.392, "G", "Vir"),
+    88: ("Spiral Galaxy", 12.533, 14.417, "G", "Com"),
+    89: ("Elliptical Galaxy", 12.592, 12.55, "G", "Vir"),
+    90: ("Spiral Galaxy", 12.61, 13.167, "G", "Vir"),
+    91: ("Barred Spiral Galaxy", 12.59, 14.5, "G", "Com"),
+    92: ("Globular Cluster", 17.283, 43.133, "GCl", "Her"),
+    93: ("Open Cluster", 7.745, -23.867, "OCl", "Pup"),
+    94: ("Spiral Galaxy", 12.85, 41.12, "G", "CVn"),
+    95: ("Barred Spiral Galaxy", 10.738, 11.7, "G", "Leo"),
+    96: ("Spiral Galaxy", 10.775, 11.817, "G", "Leo"),
+    97: ("Owl Nebula", 11.247, 55.017, "PN", "UMa"),
+    98: ("Spiral Galaxy", 12.23, 14.9, "G", "Com"),
+    99: ("Spiral Galaxy", 12.315, 14.417, "G", "Com"),
+    100: ("Spiral Galaxy", 12.373, 15.817, "G", "Com"),
+    101: ("Pinwheel Galaxy", 14.053, 54.35, "G", "UMa"),
+    102: ("Spindle Galaxy", 15.1, 55.75, "G", "Dra"),
+    103: ("Open Cluster", 1.558, 60.667, "OCl", "Cas"),
+    104: ("Sombrero Galaxy", 12.667, -11.617, "G", "Vir"),
+    105: ("Elliptical Galaxy", 10.788, 12.583, "G", "Leo"),
+    106: ("Spiral Galaxy", 12.317, 47.3, "G", "CVn"),
+    107: ("Globular Cluster", 16.542, -13.05, "GCl", "Oph"),
+    108: ("Spiral Galaxy", 11.193, 55.667, "G", "UMa"),
+    109: ("Barred Spiral Galaxy", 11.958, 53.383, "G", "UMa"),
+    110: ("Dwarf Galaxy", 0.672, 41.683, "G", "And"),
+}
+
+NAN = float('nan')
+
+# OpenNGC types not worth a catalog entry
+SKIP_TYPES = {'Dup', 'NonEx'}
+
+
+def sexagesimal(text, scale=1.0):
+    """'05:35:17.3' or '-05:23:28' as a decimal number (divided by scale)."""
+    sign = -1.0 if text.startswith('-') else 1.0
+    parts = [float(p) for p in text.lstrip('+-').split(':')]
+    value = sum(p / 60 ** i for i, p in enumerate(parts))
+    return sign * value / scale
+
+
+def to_float(text):
+    try:
+        return float(text)
+    except (TypeError, ValueError):
+        return NAN
+
+
+def read_openngc(paths):
+    """{designation key: (name, ra, dec, type, magnitude, major, minor, constellation)}
+    and {M number: key}."""
+    objects = {}
+    messier_ids = {}
+    for path in paths:
+        with open(path, newline='', encoding='utf-8') as f:
+            for row in csv.DictReader(f, delimiter=';'):
+                obj_type = row['Type']
+                if obj_type in SKIP_TYPES or not row['RA'] or not row['Dec']:
+                    continue
+                if obj_type not in TYPES:
+                    obj_type = 'Other'
+                key = designation_key(row['Name'])
+                magnitude = to_float(row.get('V-Mag'))
+                if magnitude != magnitude:
+                    magnitude = to_float(row.get('B-Mag'))
+                name = (row.get('Common names') or '').split(',')[0].strip()
+                objects[key] = (name, sexagesimal(row['RA']), sexagesimal(row['Dec']), obj_type,
+                                magnitude, to_float(row.get('MajAx')), to_float(row.get('MinAx')),
+                                row.get('Const') or '')
+                if row.get('M'):
+                    messier_ids.setdefault(int(row['M']), key)
+    return objects, messier_ids
+
+
+def read_caldwell(path):
+    """[(C designation key, designation key it refers to)]."""
+    aliases = []
+    with open(path, newline='', encoding='utf-8') as f:
+        for row in csv.reader(f):
+            if len(row) >= 2 and not row[0].startswith('#'):
+                aliases.append((designation_key(row[0]), designation_key(row[1])))
+    return aliases
+
+
+def write_catalog(path, objects, aliases):
+    """objects: {key: (name, ra, dec, type, magnitude, major, minor, constellation)};
+    aliases: [(alias, key)]."""
+    keys = list(objects)
+    position = {key: i for i, key in enumerate(keys)}
+    names = bytearray()
+    records = bytearray()
+    for key in keys:
+        name, ra, dec, obj_type, magnitude, major, minor, constellation = objects[key]
+        encoded = name.encode('utf-8')
+        records += RECORD_FORMAT.pack(key.encode('ascii'), ra, dec, TYPES.index(obj_type),
+                                      magnitude, major, minor, len(names), len(encoded),
+                                      constellation.encode('ascii'))
+        names += encoded
+
+    alias_bytes = bytearray()
+    alias_count = 0
+    for alias, key in aliases:
+        if key in position and alias not in position:
+            alias_bytes += ALIAS_FORMAT.pack(alias.encode('ascii'), position[key])
+            alias_count += 1
+
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER_FORMAT.pack(MAGIC, len(keys), alias_count, len(names)))
+        f.write(records)
+        f.write(alias_bytes)
+        f.write(names)
+    os.replace(tmp_path, path)
+    return len(keys), alias_count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('openngc', nargs='*', help='OpenNGC CSV files (NGC.csv, addendum.csv)')
+    parser.add_argument('--caldwell', help='CSV of Caldwell,designation pairs')
+    parser.add_argument('--output', default=CATALOG_PATH)
+    args = parser.parse_args()
+
+    ngc, messier_ids = read_openngc(args.openngc)
+
+    # Messier entries keep the names and coordinates the Messier pages show
+    objects = {}
+    for m_num, (name, ra, dec, obj_type, constellation) in MESSIER.items():
+        extra = ngc.get(messier_ids.get(m_num))
+        magnitude, major, minor = extra[4:7] if extra else (NAN, NAN, NAN)
+        objects[f'M{m_num}'] = (name, ra, dec, obj_type, magnitude, major, minor, constellation)
+    objects.update(ngc)
+
+    aliases = read_caldwell(args.caldwell) if args.caldwell else []
+    count, alias_count = write_catalog(args.output, objects, aliases)
+    print(f"Wrote {args.output}: {count} objects, {alias_count} aliases, "
+          f"{os.path.getsize(args.output) / 1024:.0f} KB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""Command line and build state shared by build.py and the page generators.
+
+Each build_*.py script can also be run on its own to rebuild its one page;
+generator_parser() gives them and build.py the same options, and
+page_state() the same record of what a page was built from.
+"""
+import argparse
+
+from discovery import selection_parser
+from profiling import profile_parser
+from scan_manifest import output_state
+from site_assets import ASSETS
+from sky_catalog import CATALOG_PATH
+from target_scan import DEFAULT_WEIGHTS
+from thumbnails import VARIANT_WIDTHS
+
+
+def generator_parser(description):
+    """Argument parser with --force and the profiling and selection options."""
+    parser = argparse.ArgumentParser(description=description, parents=[profile_parser(), selection_parser()])
+    parser.add_argument('--force', action='store_true', help='rebuild even if nothing changed')
+    return parser
+
+
+def page_state(manifest, listing, generator_file, files, weights=None, feed=False, compress=False,
+               widths=VARIANT_WIDTHS):
+    """output_state() of a page, plus its asset names, selection weights, srcset widths and how it is written.
+
+    The weights are recorded as in effect, so naming a default changes nothing.
+    """
+    state = dict(output_state(manifest, listing, generator_file, (CATALOG_PATH,), files), assets=sorted(ASSETS),
+                 weights={**DEFAULT_WEIGHTS, **(weights or {})}, variants=sorted(widths))
+    if feed:
+        state['feed'] = True
+    if compress:
+        state['minified'] = True
+    return state
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""Observability planner: what is up, when, and how far from the Moon.
+
+For a site (latitude/longitude) and a range of nights this computes, for
+every object in the sky catalog:
+
+  hours_up   dark hours spent above the minimum altitude
+  transit    local clock time of transit (meridian crossing)
+  max_alt    highest altitude reached while it is dark
+  moon_sep   angular distance from the Moon at local midnight
+
+Each night is sampled every few minutes from noon to noon and only the
+dark samples are kept; the altitude of every object at every sample
+comes out of one small matrix product (cos(LST - RA) expanded into
+cos/sin terms), so the whole catalog over a year takes seconds.  Sun and Moon use low-precision almanac
+formulae (about 0.01 and 0.3 degrees), plenty for planning.
+
+Results go to observability.json (site, nights, designations) plus a
+binary table of uint8 cells (nights x objects x 4 fields, see FIELDS)
+that the RA chart loads to highlight and sort what is up tonight.
+NumPy is required.
+
+Usage: python planner.py --lat 40.0 --lon -105.0 [--start 2026-10-18] [--nights 365]
+                         [--min-altitude 30] [--sun-altitude -12] [--prefix M]
+"""
+import argparse
+import json
+import os
+import sys
+from datetime import date, timedelta
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from sky_catalog import load_catalog
+
+PLAN_JSON = 'observability.json'
+PLAN_TABLE = 'observability.bin'
+
+# Binary table fields and their uint8 quantisation: value = byte * scale + offset
+FIELDS = (
+    ('hours_up', 0.1, 0),       # 0 - 25.5 h
+    ('transit', 1 / 6, 0),      # local clock hours in 10-minute steps
+    ('max_alt', 1, -90),        # degrees; 0 means never up while dark
+    ('moon_sep', 1, 0),         # degrees
+)
+
+J2000 = 2451545.0
+SIDEREAL_RATE = 1.00273790935
+NIGHT_SPAN_HOURS = 24  # samples run from local noon to local noon
+
+
+def julian_day(day):
+    """Julian day number of 0h UT on a datetime.date."""
+    return day.toordinal() + 1721424.5
+
+
+def gmst_hours(jd):
+    """Greenwich mean sidereal time in hours."""
+    return (18.697374558 + 24.06570982441908 * (jd - J2000)) % 24
+
+
+def sun_radec(jd):
+    """Apparent Sun (RA hours, Dec degrees), low precision."""
+    n = jd - J2000
+    mean_long = np.radians(280.460 + 0.9856474 * n)
+    anomaly = np.radians(357.528 + 0.9856003 * n)
+    ecl_long = mean_long + np.radians(1.915) * np.sin(anomaly) + np.radians(0.020) * np.sin(2 * anomaly)
+    obliquity = np.radians(23.439 - 0.0000004 * n)
+    return _equatorial(ecl_long, 0.0, obliquity)
+
+
+def moon_radec(jd):
+    """Moon (RA hours, Dec degrees), low precision (main periodic terms)."""
+    t = (jd - J2000) / 36525
+    d = np.radians
+    ecl_long = d(218.32 + 481267.881 * t
+                 + 6.29 * np.sin(d(135.0 + 477198.87 * t)) - 1.27 * np.sin(d(259.3 - 413335.36 * t))
+                 + 0.66 * np.sin(d(235.7 + 890534.22 * t)) + 0.21 * np.sin(d(269.9 + 954397.74 * t))
+                 - 0.19 * np.sin(d(357.5 + 35999.05 * t)) - 0.11 * np.sin(d(186.5 + 966404.03 * t)))
+    ecl_lat = d(5.13 * np.sin(d(93.3 + 483202.02 * t)) + 0.28 * np.sin(d(228.2 + 960400.89 * t))
+                - 0.28 * np.sin(d(318.3 + 6003.15 * t)) - 0.17 * np.sin(d(217.6 - 407332.21 * t)))
+    return _equatorial(ecl_long, ecl_lat, d(23.439 - 0.0000004 * (jd - J2000)))
+
+
+def _equatorial(ecl_long, ecl_lat, obliquity):
+    ra = np.arctan2(np.sin(ecl_long) * np.cos(obliquity) - np.tan(ecl_lat) * np.sin(obliquity),
+                    np.cos(ecl_long))
+    dec = np.arcsin(np.sin(ecl_lat) * np.cos(obliquity)
+                    + np.cos(ecl_lat) * np.sin(obliquity) * np.sin(ecl_long))
+    return np.degrees(ra) / 15 % 24, np.degrees(dec)
+
+
+def separation(ra1, dec1, ra2, dec2):
+    """Angular separation in degrees (RA in hours, Dec in degrees)."""
+    ra1, ra2 = np.radians(ra1 * 15), np.radians(ra2 * 15)
+    dec1, dec2 = np.radians(dec1), np.radians(dec2)
+    cos_sep = np.sin(dec1) * np.sin(dec2) + np.cos(dec1) * np.cos(dec2) * np.cos(ra1 - ra2)
+    return np.degrees(np.arccos(np.clip(cos_sep, -1, 1)))
+
+
+def plan_nights(ra, dec, latitude, longitude, start, nights=365, min_altitude=30.0,
+                sun_altitude=-12.0, step_minutes=10, utc_offset=None):
+    """Observability of objects (RA hours, Dec degrees arrays) over nights from start.
+
+    Returns a dict of (nights x objects) arrays hours_up, transit, max_alt,
+    moon_sep, plus a per-night list of dicts (date, dark hours, Moon
+    illumination, local dusk/dawn and the RA overhead at dusk).
+    """
+    if utc_offset is None:
+        utc_offset = round(longitude / 15)
+    ra = np.asarray(ra, dtype=np.float64)
+    dec = np.asarray(dec, dtype=np.float64)
+    lat = np.radians(latitude)
+
+    # sin(alt) = sin(lat) sin(dec) + cos(lat) cos(dec) cos(LST - RA)
+    #          = a + b cos(RA) cos(LST) + b sin(RA) sin(LST)
+    a = np.sin(lat) * np.sin(np.radians(dec))
+    b = np.cos(lat) * np.cos(np.radians(dec))
+    ra_rad = np.radians(ra * 15)
+    ra_terms = np.stack([b * np.cos(ra_rad), b * np.sin(ra_rad)], axis=1)   # objects x 2
+    sin_min = np.sin(np.radians(min_altitude))
+
+    step = step_minutes / 60
+    offsets = np.arange(-NIGHT_SPAN_HOURS / 2, NIGHT_SPAN_HOURS / 2, step)
+
+    shape = (nights, len(ra))
+    hours_up = np.zeros(shape, dtype=np.float32)
+    transit = np.zeros(shape, dtype=np.float32)
+    max_alt = np.full(shape, -90.0, dtype=np.float32)
+    moon_sep = np.zeros(shape, dtype=np.float32)
+    night_info = []
+
+    for n in range(nights):
+        day = start + timedelta(days=n)
+        # Local mean midnight at the end of this evening, in UT
+        midnight_jd = julian_day(day + timedelta(days=1)) - longitude / 15 / 24
+        sample_jd = midnight_jd + offsets / 24
+
+        sun_ra, sun_dec = sun_radec(sample_jd)
+        lst = (gmst_hours(sample_jd) + longitude / 15) % 24
+        sun_sin_alt = np.sin(lat) * np.sin(np.radians(sun_dec)) + \
+            np.cos(lat) * np.cos(np.radians(sun_dec)) * np.cos(np.radians((lst - sun_ra) * 15))
+        dark = sun_sin_alt < np.sin(np.radians(sun_altitude))
+
+        if dark.any():
+            lst_rad = np.radians(lst[dark] * 15)
+            sin_alt = a[:, None] + ra_terms @ np.stack([np.cos(lst_rad), np.sin(lst_rad)])
+            hours_up[n] = (sin_alt > sin_min).sum(axis=1) * step
+            max_alt[n] = np.degrees(np.arcsin(np.clip(sin_alt.max(axis=1), -1, 1)))
+
+        # Transit nearest local midnight, as a local clock time
+        lst_midnight = (gmst_hours(midnight_jd) + longitude / 15) % 24
+        until_transit = (ra - lst_midnight + 12) % 24 - 12
+        local_midnight = 24 - longitude / 15 + utc_offset
+        transit[n] = (local_midnight + until_transit / SIDEREAL_RATE) % 24
+
+        moon_ra, moon_dec = moon_radec(midnight_jd)
+        moon_sep[n] = separation(ra, dec, moon_ra, moon_dec)
+        sun_ra_mid, sun_dec_mid = sun_radec(midnight_jd)
+        elongation = np.radians(separation(moon_ra, moon_dec, sun_ra_mid, sun_dec_mid))
+
+        dark_offsets = offsets[dark]
+        night_info.append({
+            'date': day.isoformat(),
+            'dark_hours': round(float(dark.sum() * step), 2),
+            'dusk': round(float((local_midnight + dark_offsets[0]) % 24), 2) if dark.any() else None,
+            'dawn': round(float((local_midnight + dark_offsets[-1]) % 24), 2) if dark.any() else None,
+            'start_ra': int(lst[dark][0]) if dark.any() else None,
+            'moon_illumination': round(float((1 - np.cos(elongation)) / 2), 2),
+        })
+
+    return {'hours_up': hours_up, 'transit': transit, 'max_alt': max_alt,
+            'moon_sep': moon_sep, 'nights': night_info, 'utc_offset': utc_offset}
+
+
+def quantise(plan):
+    """(nights x objects x len(FIELDS)) uint8 table of a plan."""
+    cells = [np.clip(np.rint((plan[name] - offset) / scale), 0, 255)
+             for name, scale, offset in FIELDS]
+    return np.stack(cells, axis=-1).astype(np.uint8)
+
+
+def write_plan(plan, designations, site, json_path=PLAN_JSON, table_path=PLAN_TABLE):
+    """Write the JSON index and binary table next to each other."""
+    table = quantise(plan)
+    tmp_path = table_path + '.tmp'
+    table.tofile(tmp_path)
+    os.replace(tmp_path, table_path)
+
+    index = {
+        'site': site,
+        'nights': plan['nights'],
+        'designations': designations,
+        'table': {
+            'file': os.path.basename(table_path),
+            'shape': list(table.shape),
+            'fields': [{'name': name, 'scale': scale, 'offset': offset}
+                       for name, scale, offset in FIELDS],
+        },
+    }
+    tmp_path = json_path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(index, f, separators=(',', ':'))
+    os.replace(tmp_path, json_path)
+    return table
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Precompute object observability for the RA chart.')
+    parser.add_argument('--lat', type=float, required=True, help='site latitude, degrees north')
+    parser.add_argument('--lon', type=float, required=True, help='site longitude, degrees east')
+    parser.add_argument('--start', type=date.fromisoformat, default=date.today(),
+                        help='first night (evening date), default today')
+    parser.add_argument('--nights', type=int, default=365)
+    parser.add_argument('--min-altitude', type=float, default=30.0)
+    parser.add_argument('--sun-altitude', type=float, default=-12.0,
+                        help='Sun altitude below which it counts as dark (default: %(default)s)')
+    parser.add_argument('--utc-offset', type=float,
+                        help='hours added to UT for local clock times (default: longitude / 15)')
+    parser.add_argument('--prefix', default='',
+                        help='only objects whose designation starts with this (e.g. M)')
+    args = parser.parse_args()
+
+    if np is None:
+        sys.exit("NumPy is required for the planner (pip install numpy)")
+
+    records = load_catalog().as_array()
+    designations = np.char.decode(records['designation'], 'ascii')
+    if args.prefix:
+        keep = np.char.startswith(designations, args.prefix.upper())
+        records, designations = records[keep], designations[keep]
+
+    plan = plan_nights(records['ra'], records['dec'], args.lat, args.lon, args.start,
+                       nights=args.nights, min_altitude=args.min_altitude,
+                       sun_altitude=args.sun_altitude, utc_offset=args.utc_offset)
+    site = {'latitude': args.lat, 'longitude': args.lon, 'utc_offset': plan['utc_offset'],
+            'min_altitude': args.min_altitude, 'sun_altitude': args.sun_altitude}
+    table = write_plan(plan, designations.tolist(), site)
+
+    tonight = plan['nights'][0]
+    up = int((plan['hours_up'][0] >= 1).sum())
+    print(f"Wrote {PLAN_JSON} and {PLAN_TABLE} ({table.nbytes / 1024:.0f} KB): "
+          f"{len(designations)} objects x {args.nights} nights")
+    print(f"Tonight ({tonight['date']}): {tonight['dark_hours']} h dark, "
+          f"Moon {tonight['moon_illumination']:.0%} lit, {up} objects up for an hour or more")
+
+
+if __name__ == '__main__':
+    main()
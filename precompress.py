@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""Precompressed .gz and .br siblings of the generated site files.
+
+Static hosts (nginx gzip_static / brotli_static, most CDNs) serve
+page.html.gz or page.html.br directly when the browser accepts it, so
+compressing once at build time at maximum level costs nothing per
+request.  compress_outputs() writes both siblings for every HTML, CSS,
+JS and JSON output on a process pool, skipping files whose siblings are
+already newer than they are (write_page leaves unchanged pages' mtime
+alone, so those are never recompressed).
+
+Brotli is optional: without the brotli package only .gz is written.
+
+A page rewritten without compression (or without brotli) would leave
+its old siblings behind to be served in its place;
+remove_stale_siblings() deletes any sibling older than its file.
+"""
+import gzip
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from thumbnails import default_workers
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE = ('.html', '.css', '.js', '.json')
+
+# Every sibling suffix a build may have written, with or without brotli now
+SIBLING_SUFFIXES = ('.gz', '.br')
+
+
+def sibling_suffixes():
+    """Compressed siblings written for each output."""
+    return ('.gz', '.br') if brotli is not None else ('.gz',)
+
+
+def is_current(path):
+    """True if every compressed sibling of path exists and is at least as new."""
+    mtime = os.stat(path).st_mtime_ns
+    for suffix in sibling_suffixes():
+        try:
+            if os.stat(path + suffix).st_mtime_ns < mtime:
+                return False
+        except OSError:
+            return False
+    return True
+
+
+def _write_sibling(path, data):
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return len(data)
+
+
+def compress_file(path):
+    """Write path.gz (and path.br) at maximum compression.
+
+    Runs inside a pool worker.  Returns (path, size, gz size, br size or
+    None, seconds).
+    """
+    start = time.perf_counter()
+    with open(path, 'rb') as f:
+        data = f.read()
+    # mtime=0 keeps the .gz byte-identical across rebuilds of the same page
+    gz_size = _write_sibling(path + '.gz', gzip.compress(data, compresslevel=9, mtime=0))
+    br_size = None
+    if brotli is not None:
+        br_size = _write_sibling(path + '.br', brotli.compress(data, quality=11))
+    return path, len(data), gz_size, br_size, time.perf_counter() - start
+
+
+def compress_outputs(paths, workers=None, force=False):
+    """Compress the site files among paths that need it; return compress_file results.
+
+    Uses a process pool unless workers is 1 or there is only one file.
+    """
+    todo = sorted(path for path in paths
+                  if path.endswith(COMPRESSIBLE) and os.path.exists(path)
+                  and (force or not is_current(path)))
+    if not todo:
+        return []
+    if workers is None:
+        workers = default_workers()
+    workers = max(1, min(workers, len(todo)))
+
+    if workers == 1:
+        return [compress_file(path) for path in todo]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(compress_file, todo))
+
+
+def written_siblings(results):
+    """Paths of the siblings written, from compress_outputs() results."""
+    paths = []
+    for path, _, _, br_size, _ in results:
+        paths.append(path + '.gz')
+        if br_size is not None:
+            paths.append(path + '.br')
+    return paths
+
+
+def remove_stale_siblings(paths):
+    """Delete .gz/.br siblings older than their file among paths; return the deleted paths."""
+    removed = []
+    for path in sorted(paths):
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            continue
+        for suffix in SIBLING_SUFFIXES:
+            try:
+                if os.stat(path + suffix).st_mtime_ns < mtime:
+                    os.remove(path + suffix)
+                    removed.append(path + suffix)
+            except OSError:
+                pass
+    return removed
+
+
+def format_size(size):
+    return f'{size / 1024:.1f} KB' if size >= 1024 else f'{size} B'
+
+
+def report_sizes(results, minified=None):
+    """Print each compressed file's size before and after.
+
+    minified maps page path -> minify_html() sizes for pages minified in
+    this run, whose size before minification is shown too.
+    """
+    if not results:
+        return
+    minified = minified or {}
+    total = sum(seconds for *_, seconds in results)
+    print(f"Compressed {len(results)} files in {total:.2f}s of worker time:")
+    for path, size, gz_size, br_size, _ in results:
+        sizes = [format_size(size)]
+        if path in minified:
+            sizes[0] += ' minified'
+            sizes.insert(0, format_size(minified[path]['before']))
+        sizes.append(f'{format_size(gz_size)} gz')
+        if br_size is not None:
+            sizes.append(f'{format_size(br_size)} br')
+        print(f"  {path}: {' -> '.join(sizes)}")
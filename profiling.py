@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""Per-phase timing for build.py and the page generators (--profile).
+
+A Profiler accumulates wall and CPU time plus counters (directories,
+files, bytes) for each named phase of a build: discovery (scanning and
+duplicate detection), selection (choosing and validating images),
+thumbnails, rendering, writing and compression.  The report is printed
+as text, and can be appended as one JSON line per run to a file for
+tracking trends; each phase can also be run under cProfile and dumped
+as <phase>.pstats for pstats / snakeviz.
+
+While profiling, pages are rendered into a list before they are written
+(see write_profiled) so rendering and writing are timed apart.
+"""
+import argparse
+import cProfile
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, field
+
+from site_output import write_page
+
+PROFILE_VERSION = 1
+
+
+@dataclass
+class Phase:
+    """Totals for one phase, over every time it ran."""
+    wall: float = 0.0
+    cpu: float = 0.0
+    calls: int = 0
+    counts: dict = field(default_factory=dict)  # counter name -> total
+
+    def count(self, name, n=1):
+        self.counts[name] = self.counts.get(name, 0) + n
+
+
+class Profiler:
+    """Collects Phase totals in the order phases first run."""
+
+    def __init__(self, pstats_dir=None):
+        self.phases = {}
+        self.pstats_dir = pstats_dir
+        self._profiles = {}  # phase name -> cProfile.Profile
+        self._start = time.perf_counter(), time.process_time()
+        self._started_at = time.strftime('%Y-%m-%dT%H:%M:%S')
+
+    @contextmanager
+    def phase(self, name):
+        """Time the body as phase name; yields its Phase for counters.
+
+        Phases must not nest when pstats are collected (only one cProfile
+        can be active).
+        """
+        phase = self.phases.setdefault(name, Phase())
+        profile = None
+        if self.pstats_dir:
+            profile = self._profiles.setdefault(name, cProfile.Profile())
+            profile.enable()
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield phase
+        finally:
+            phase.wall += time.perf_counter() - wall
+            phase.cpu += time.process_time() - cpu
+            phase.calls += 1
+            if profile is not None:
+                profile.disable()
+
+    def totals(self):
+        """(wall, CPU) seconds since the profiler was created."""
+        return time.perf_counter() - self._start[0], time.process_time() - self._start[1]
+
+    def report(self):
+        """The phases as a text table."""
+        lines = [f"{'phase':<12} {'wall ms':>9} {'cpu ms':>9}  counts"]
+        for name, phase in self.phases.items():
+            counts = ' '.join(f'{key}={value}' for key, value in phase.counts.items())
+            lines.append(f'{name:<12} {phase.wall * 1000:9.1f} {phase.cpu * 1000:9.1f}  {counts}')
+        wall, cpu = self.totals()
+        lines.append(f"{'total':<12} {wall * 1000:9.1f} {cpu * 1000:9.1f}")
+        return '\n'.join(lines)
+
+    def as_json(self):
+        """One run as a JSON-serialisable dict."""
+        wall, cpu = self.totals()
+        return {
+            'version': PROFILE_VERSION,
+            'started': self._started_at,
+            'argv': sys.argv,
+            'wall': wall,
+            'cpu': cpu,
+            'phases': {name: {'wall': phase.wall, 'cpu': phase.cpu, 'calls': phase.calls, **phase.counts}
+                       for name, phase in self.phases.items()},
+        }
+
+    def dump_pstats(self):
+        """Write <pstats_dir>/<phase>.pstats for each profiled phase; returns the paths."""
+        if not self.pstats_dir:
+            return []
+        os.makedirs(self.pstats_dir, exist_ok=True)
+        paths = []
+        for name, profile in self._profiles.items():
+            path = os.path.join(self.pstats_dir, f'{name}.pstats')
+            profile.dump_stats(path)
+            paths.append(path)
+        return paths
+
+    def finish(self, json_path=None):
+        """Print the report, append the JSON line and dump pstats as configured."""
+        print(f"\nBuild profile:\n{self.report()}")
+        if json_path:
+            with open(json_path, 'a') as f:
+                f.write(json.dumps(self.as_json()) + '\n')
+            print(f"Profile appended to {json_path}")
+        for path in self.dump_pstats():
+            print(f"cProfile stats written to {path}")
+
+
+def profile_parser():
+    """Argument parser holding the --profile options, for use as a parent parser."""
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument('--profile', action='store_true',
+                        help='print wall/CPU time, file counts and bytes per build phase')
+    parser.add_argument('--profile-json', metavar='FILE',
+                        help='with --profile, append the report to FILE as one JSON line per run')
+    parser.add_argument('--profile-pstats', metavar='DIR',
+                        help='with --profile, run each phase under cProfile and write DIR/<phase>.pstats')
+    return parser
+
+
+def profiler_from_args(args):
+    """A Profiler if args (from profile_parser) ask for one, else None."""
+    if not args.profile:
+        return None
+    return Profiler(pstats_dir=args.profile_pstats)
+
+
+def timed_phase(profiler, name):
+    """profiler.phase(name), or a throwaway Phase when profiler is None."""
+    return profiler.phase(name) if profiler is not None else nullcontext(Phase())
+
+
+def write_profiled(profiler, path, fragments):
+    """write_page(path, fragments), timing rendering and writing separately.
+
+    Without a profiler the fragments are streamed straight to disk.
+    """
+    if profiler is None:
+        return write_page(path, fragments)
+    with profiler.phase('rendering') as phase:
+        fragments = list(fragments)
+        phase.count('pages')
+        phase.count('bytes', sum(len(fragment.encode('utf-8')) for fragment in fragments))
+    with profiler.phase('writing') as phase:
+        changed = write_page(path, fragments)
+        phase.count('changed', int(changed))
+    return changed
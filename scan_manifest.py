@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""Persistent scan manifest for incremental rebuilds.
+
+The manifest is a JSON-lines file kept next to the generated pages.  It
+records, for every directory under targets/, the directory mtime and the
+image candidates / subdirectories found inside it.  On the next run only
+directories whose mtime changed are listed again; everything else is
+served from the manifest after a single stat() per directory.
+
+It also remembers which scan state each output page was built from, so a
+generator can skip rendering entirely when nothing it depends on changed.
+That state covers the size and mtime of the images the page was built
+from and of their thumbnails, since an image overwritten in place leaves
+its directory mtime alone and thumbnails live outside targets/, and the
+sizes and mtimes of the modules next to the generator.
+"""
+import hashlib
+import json
+import os
+
+from concurrent_scan import walk_concurrent
+from target_scan import list_directory
+
+MANIFEST_PATH = '.scan_manifest.jsonl'
+MANIFEST_VERSION = 1
+
+
+def load_manifest(path=MANIFEST_PATH):
+    """Load the manifest, or return an empty one if missing or unreadable."""
+    manifest = {'dirs': {}, 'outputs': {}}
+    try:
+        with open(path) as f:
+            header = json.loads(f.readline() or '{}')
+            if header.get('version') != MANIFEST_VERSION:
+                return manifest
+            for line in f:
+                record = json.loads(line)
+                if 'dir' in record:
+                    manifest['dirs'][record['dir']] = (
+                        record['mtime_ns'], record['files'], record['dirs'])
+                elif 'output' in record:
+                    manifest['outputs'][record['output']] = record['state']
+    except (OSError, ValueError, KeyError):
+        return {'dirs': {}, 'outputs': {}}
+    return manifest
+
+
+def save_manifest(manifest, path=MANIFEST_PATH):
+    """Write the manifest atomically (temp file + rename)."""
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        f.write(json.dumps({'version': MANIFEST_VERSION}) + '\n')
+        for dir_path in sorted(manifest['dirs']):
+            mtime_ns, files, subdirs = manifest['dirs'][dir_path]
+            f.write(json.dumps({'dir': dir_path, 'mtime_ns': mtime_ns,
+                                'files': files, 'dirs': subdirs}) + '\n')
+        for output in sorted(manifest['outputs']):
+            f.write(json.dumps({'output': output,
+                                'state': manifest['outputs'][output]}) + '\n')
+    os.replace(tmp_path, path)
+
+
+def refresh_listing(manifest, root='targets', concurrency=None):
+    """Bring the manifest's directory records up to date with the disk.
+
+    Returns (listing, rescanned) where listing maps each directory path
+    under root to (image file names, subdirectory names), and rescanned is
+    the sorted list of directories that had to be listed again.
+    Directories that disappeared are dropped from the manifest.  With
+    concurrency the stats and listings run that many at a time (see
+    concurrent_scan.py); the result is the same.
+    """
+    cached = manifest['dirs']
+    listing = {}
+    rescanned = []
+
+    def visit(current):
+        # One stat per directory; list it again only if its mtime moved
+        try:
+            mtime_ns = os.stat(current).st_mtime_ns
+        except OSError:
+            return []
+
+        record = cached.get(current)
+        if record is None or record[0] != mtime_ns:
+            files, subdirs = list_directory(current)
+            record = (mtime_ns, files, subdirs)
+            rescanned.append(current)
+
+        listing[current] = (record[1], record[2])
+        cached[current] = record
+        return [os.path.join(current, d) for d in record[2]]
+
+    if concurrency:
+        walk_concurrent(root, visit, concurrency)
+    else:
+        stack = [os.fspath(root)]
+        while stack:
+            stack.extend(visit(stack.pop()))
+
+    # Forget directories that no longer exist below this root
+    prefix = os.path.join(os.fspath(root), '')
+    for dir_path in list(cached):
+        if dir_path not in listing and (dir_path == os.fspath(root) or dir_path.startswith(prefix)):
+            del cached[dir_path]
+            rescanned.append(dir_path)
+
+    return {path: listing[path] for path in sorted(listing)}, sorted(rescanned)
+
+
+def listing_digest(manifest, listing):
+    """Digest of the scan state (directory paths and mtimes) of a listing."""
+    h = hashlib.sha1()
+    for dir_path in sorted(listing):
+        h.update(f"{dir_path}\0{manifest['dirs'][dir_path][0]}\n".encode())
+    return h.hexdigest()
+
+
+def source_files(path):
+    """path and every other module next to it, sorted.
+
+    Any of them may be imported by the page.  Stamping them all takes one
+    listdir() and a stat() each; following the imports meant parsing every
+    module on every build.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    return sorted(os.path.join(directory, name) for name in os.listdir(directory) if name.endswith('.py'))
+
+
+def file_stamps(paths):
+    """{path: [size, mtime_ns]} for each file; None for files that are gone."""
+    stamps = {}
+    for path in sorted(set(paths)):
+        try:
+            st = os.stat(path)
+        except OSError:
+            stamps[path] = None
+            continue
+        stamps[path] = [st.st_size, st.st_mtime_ns]
+    return stamps
+
+
+def recorded_files(manifest, output):
+    """The files output was last built from, per its recorded state."""
+    return sorted(manifest['outputs'].get(output, {}).get('files') or ())
+
+
+def output_state(manifest, listing, generator_file, data_files=(), files=()):
+    """State key for an output: scan digest, source and file stamps.
+
+    The generator and the modules next to it count as its source, by
+    size and mtime.
+    data_files are other inputs the page is built from (the sky catalog);
+    their mtimes are part of the state too.  files are the images the
+    page shows and the thumbnails it links: after rendering the
+    catalog's (Catalog.section_files), before discovery (to check whether
+    a rebuild is needed) recorded_files(), so a rewritten image or a
+    deleted thumbnail makes the page stale.
+    """
+    state = {
+        'scan': listing_digest(manifest, listing),
+        'sources': {os.path.basename(path): stamp
+                    for path, stamp in file_stamps(source_files(generator_file)).items()},
+        'files': file_stamps(files),
+    }
+    if data_files:
+        state['data_mtime_ns'] = [os.stat(path).st_mtime_ns for path in data_files]
+    return state
+
+
+def output_is_current(manifest, output, state):
+    """True if output exists and was last built from exactly this state."""
+    return os.path.exists(output) and manifest['outputs'].get(output) == state
+
+
+def record_output(manifest, output, state):
+    """Remember the state an output was built from."""
+    manifest['outputs'][output] = state
+
+
+def scan_targets(root='targets', path=MANIFEST_PATH, concurrency=None):
+    """Load the manifest and refresh it against root.
+
+    Returns (manifest, listing, rescanned); see refresh_listing().
+    """
+    manifest = load_manifest(path)
+    listing, rescanned = refresh_listing(manifest, root, concurrency)
+    return manifest, listing, rescanned
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""Prebuilt client-side search index for the gallery pages.
+
+Generators collect the searchable text of every card (name, aliases,
+types, constellation) as they render it; search_index_html() turns that
+into a sorted token list with a posting list of card numbers per token,
+embedded as JSON.  The script that filters with it is part of the shared
+site script.
+
+In the browser each query word is prefix-matched against the sorted
+tokens with a binary search, the posting lists are intersected, and only
+cards whose visibility actually changes are touched.  Input is debounced.
+"""
+import json
+import re
+import unicodedata
+
+WORD_RE = re.compile(r'[a-z0-9]+')
+PART_RE = re.compile(r'[a-z]+|[0-9]+')
+
+
+def normalise(text):
+    """Lowercase ASCII with accents stripped ('Boötes' -> 'bootes')."""
+    decomposed = unicodedata.normalize('NFKD', text.lower())
+    return decomposed.encode('ascii', 'ignore').decode('ascii')
+
+
+def card_tokens(*texts):
+    """Search tokens for one card.
+
+    Every word, its letter/digit parts ('m31' -> 'm', '31') and a catalog
+    prefix joined to the number after it ('NGC 7000' -> 'ngc7000'), so
+    'm31', 'M 31' and '31' all find M31.
+    """
+    tokens = set()
+    for text in texts:
+        if not text:
+            continue
+        words = WORD_RE.findall(normalise(text))
+        tokens.update(words)
+        for word in words:
+            tokens.update(PART_RE.findall(word))
+        for first, second in zip(words, words[1:]):
+            if first.isalpha() and second.isdigit():
+                tokens.add(first + second)
+    return tokens
+
+
+def build_index(cards):
+    """{'t': sorted tokens, 'p': card numbers per token} for a list of token sets."""
+    postings = {}
+    for number, tokens in enumerate(cards):
+        for token in tokens:
+            postings.setdefault(token, []).append(number)
+    terms = sorted(postings)
+    return {'t': terms, 'p': [postings[term] for term in terms]}
+
+
+# JavaScript bundled into the shared site script (see site_assets.py).
+# searchMatches(index, text) returns the Set of matching card numbers, or
+# null for an empty query; the feed pages call it directly.
+MATCH_SCRIPT = """function searchMatches(index, text) {
+    const words = text.toLowerCase().normalize('NFKD').replace(/[\\u0300-\\u036f]/g, '')
+        .match(/[a-z0-9]+/g) || [];
+    let matches = null;
+    for (const word of words) {
+        // Binary search for the first token >= word, then take every
+        // token it is a prefix of
+        const terms = index.t;
+        let lo = 0, hi = terms.length;
+        while (lo < hi) {
+            const mid = (lo + hi) >> 1;
+            if (terms[mid] < word) lo = mid + 1; else hi = mid;
+        }
+        const found = new Set();
+        for (let i = lo; i < terms.length && terms[i].startsWith(word); i++) {
+            index.p[i].forEach(n => found.add(n));
+        }
+        matches = matches === null ? found : new Set([...matches].filter(n => found.has(n)));
+    }
+    return matches;
+}
+"""
+
+# Filters the cards of a page that embeds an index (search_index_html);
+# runs where the site script is included, after the cards
+FILTER_SCRIPT = """(function() {
+    const data = document.getElementById('searchIndex');
+    if (!data) return;
+    const index = JSON.parse(data.textContent);
+    const cards = Array.from(document.querySelectorAll(data.dataset.cards));
+    const input = document.getElementById(data.dataset.input);
+    const shown = cards.map(() => true);
+
+    function filter() {
+        const matches = searchMatches(index, input.value);
+        cards.forEach((card, n) => {
+            const show = matches === null || matches.has(n);
+            if (show !== shown[n]) {
+                card.hidden = !show;
+                shown[n] = show;
+            }
+        });
+    }
+
+    let timer = null;
+    input.addEventListener('input', function() {
+        clearTimeout(timer);
+        timer = setTimeout(filter, 150);
+    });
+})();
+"""
+
+def search_index_html(cards, card_selector, input_id='filterInput'):
+    """The embedded index, to place after the cards and before the site script.
+
+    cards holds one token set per card (see card_tokens), in the order the
+    cards appear in the page.
+    """
+    payload = json.dumps(build_index(cards), separators=(',', ':')).replace('</', '<\\/')
+    return (f'    <script type="application/json" id="searchIndex" data-cards="{card_selector}" '
+            f'data-input="{input_id}">{payload}</script>\n')
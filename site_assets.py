@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""Shared, fingerprinted static assets for the gallery pages.
+
+The CSS and JavaScript every page uses (page basics, the home link, the
+filter box, the image modal, index search, windowed rendering) live here
+once and are written as site.<hash>.css and site.<hash>.js, named by a
+hash of their content.  A changed asset gets a new name, so both can be
+served with 'Cache-Control: public, max-age=31536000, immutable' and
+browsers fetch them once for the whole site.
+
+Pages link SITE_CSS in their <head> and load SITE_JS after their cards,
+before their own inline script; their page-specific CSS stays inline,
+minified with minify_css() when the generator module is imported.
+"""
+import hashlib
+import os
+import re
+
+from search_index import FILTER_SCRIPT, MATCH_SCRIPT
+from site_output import write_page
+from virtual_feed import VIRTUAL_SCRIPT
+
+FINGERPRINT_LENGTH = 10
+
+COMMENT_RE = re.compile(r'/\*.*?\*/', re.DOTALL)
+SPACE_AROUND_RE = re.compile(r'\s*([{};,>])\s*')
+
+
+def minify_css(css):
+    """Drop comments and insignificant whitespace from a stylesheet."""
+    css = COMMENT_RE.sub('', css)
+    css = ' '.join(css.split())
+    css = SPACE_AROUND_RE.sub(r'\1', css)
+    # Space after a property colon; selector pseudo-classes never have one
+    css = re.sub(r':\s+', ':', css)
+    return css.replace(';}', '}').strip()
+
+
+SHARED_CSS = minify_css("""
+body {
+    font-family: Arial, sans-serif;
+    background: #000;
+    color: #fff;
+    margin: 0;
+    padding: 20px;
+}
+h1 {
+    text-align: center;
+    margin-bottom: 10px;
+}
+.filter-box {
+    text-align: center;
+    margin-bottom: 15px;
+}
+.filter-box input {
+    padding: 10px;
+    width: 300px;
+    font-size: 16px;
+    border: 2px solid #4a9eff;
+    border-radius: 5px;
+    background: #1a1a1a;
+    color: #fff;
+}
+.filter-box input:focus {
+    outline: none;
+    border-color: #6bb6ff;
+}
+.stats {
+    text-align: center;
+    margin-bottom: 20px;
+    font-size: 1.2em;
+}
+.nav-home {
+    position: fixed;
+    top: 20px;
+    left: 20px;
+    padding: 10px 20px;
+    background: #1a1a1a;
+    border: 2px solid #4a9eff;
+    border-radius: 5px;
+    color: #4a9eff;
+    text-decoration: none;
+    font-size: 0.9em;
+    transition: all 0.2s;
+    z-index: 100;
+}
+.nav-home:hover {
+    background: #4a9eff;
+    color: #000;
+}
+/* Modal for full-size image viewing */
+.modal {
+    display: none;
+    position: fixed;
+    z-index: 1000;
+    left: 0;
+    top: 0;
+    width: 100%;
+    height: 100%;
+    background-color: rgba(0, 0, 0, 0.95);
+    cursor: pointer;
+}
+.modal.active {
+    display: flex;
+    align-items: center;
+    justify-content: center;
+}
+.modal-content {
+    max-width: 90%;
+    max-height: 90vh;
+    object-fit: contain;
+    border: 3px solid #4a9eff;
+    border-radius: 8px;
+    box-shadow: 0 0 30px rgba(74, 158, 255, 0.5);
+}
+.modal-close {
+    position: absolute;
+    top: 20px;
+    right: 35px;
+    color: #fff;
+    font-size: 40px;
+    font-weight: bold;
+    cursor: pointer;
+}
+.modal-close:hover {
+    color: #4a9eff;
+}
+""")
+
+MODAL_SCRIPT = """// Modal functions
+function openModal(imagePath) {
+    const modal = document.getElementById('imageModal');
+    const modalImg = document.getElementById('modalImage');
+    modal.classList.add('active');
+    modalImg.src = imagePath;
+}
+
+function closeModal() {
+    const modal = document.getElementById('imageModal');
+    modal.classList.remove('active');
+}
+
+// Close modal on Escape key
+document.addEventListener('keydown', function(event) {
+    if (event.key === 'Escape') {
+        closeModal();
+    }
+});
+"""
+
+SHARED_JS = '\n'.join((MODAL_SCRIPT, MATCH_SCRIPT, FILTER_SCRIPT, VIRTUAL_SCRIPT))
+
+# Image modal markup, placed after the page content
+MODAL_HTML = """    <!-- Modal for full-size image viewing -->
+    <div id="imageModal" class="modal" onclick="closeModal()">
+        <span class="modal-close">&times;</span>
+        <img class="modal-content" id="modalImage">
+    </div>
+"""
+
+
+def fingerprint(name, content):
+    """'site.css' -> 'site.<first hex digits of the content's SHA-256>.css'."""
+    digest = hashlib.sha256(content.encode('utf-8')).hexdigest()[:FINGERPRINT_LENGTH]
+    stem, ext = os.path.splitext(name)
+    return f'{stem}.{digest}{ext}'
+
+
+SITE_CSS = fingerprint('site.css', SHARED_CSS)
+SITE_JS = fingerprint('site.js', SHARED_JS)
+ASSETS = {SITE_CSS: SHARED_CSS, SITE_JS: SHARED_JS}
+
+# Script tag loading the shared script; goes after the cards and any
+# embedded search index, before the page's own inline script
+SITE_SCRIPT_TAG = f'    <script src="{SITE_JS}"></script>\n'
+
+
+def write_assets(directory=''):
+    """Write the shared assets into directory; return {path: content changed}.
+
+    A fingerprinted file's content never changes, so an existing one is
+    left alone.  Superseded versions are kept for pages still cached.
+    """
+    results = {}
+    for name, content in ASSETS.items():
+        path = os.path.join(directory, name)
+        results[path] = not os.path.exists(path) and write_page(path, [content])
+    return results
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""Writing generated pages to disk.
+
+Renderers yield the page in fragments; write_page streams them into a
+temporary file next to the target while hashing the bytes.  The temp
+file only replaces the existing page (atomically, via os.replace) when
+the content actually differs, so unchanged pages keep their mtime and
+rsync/CDN sync does not re-upload them.
+
+minify_html() can sit between a renderer and write_page to drop the
+indentation and whole-line comments from the stream before it is written.
+"""
+import hashlib
+import os
+import re
+
+WRITE_BUFFER = 1 << 16
+HASH_CHUNK = 1 << 20
+
+# Elements whose content is whitespace-sensitive and passed through as is
+VERBATIM_OPEN_RE = re.compile(r'<(pre|textarea)[\s>]', re.IGNORECASE)
+VERBATIM_CLOSE_RE = re.compile(r'</(pre|textarea)>', re.IGNORECASE)
+
+
+def file_sha256(path):
+    """SHA-256 of an existing file, or None if it cannot be read."""
+    h = hashlib.sha256()
+    try:
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK), b''):
+                h.update(chunk)
+    except OSError:
+        return None
+    return h.digest()
+
+
+def write_page(path, fragments):
+    """Write an iterable of str fragments to path as UTF-8.
+
+    Returns True if path was created or its content changed, False if the
+    existing file was already identical (in which case it is not touched).
+    """
+    path = os.fspath(path)
+    directory, name = os.path.split(path)
+    tmp_path = os.path.join(directory, f'.{name}.{os.getpid()}.tmp')
+    h = hashlib.sha256()
+    size = 0
+
+    try:
+        with open(tmp_path, 'wb', buffering=WRITE_BUFFER) as f:
+            for fragment in fragments:
+                data = fragment.encode('utf-8')
+                h.update(data)
+                size += len(data)
+                f.write(data)
+
+        try:
+            unchanged = os.path.getsize(path) == size and file_sha256(path) == h.digest()
+        except OSError:
+            unchanged = False
+
+        if unchanged:
+            os.remove(tmp_path)
+            return False
+        os.replace(tmp_path, path)
+        return True
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def report_changes(results):
+    """Print which outputs changed; results maps path -> changed flag."""
+    changed = [path for path, did_change in results.items() if did_change]
+    unchanged = [path for path, did_change in results.items() if not did_change]
+    for path in changed:
+        print(f"  changed:   {path}")
+    for path in unchanged:
+        print(f"  unchanged: {path}")
+    return changed
+
+
+def _minify_lines(lines, verbatim):
+    """Minified form of complete lines; returns (kept lines, still verbatim)."""
+    kept = []
+    for line in lines:
+        if verbatim:
+            kept.append(line)
+            verbatim = not VERBATIM_CLOSE_RE.search(line)
+            continue
+        stripped = line.strip()
+        if not stripped:
+            continue
+        if stripped.startswith('<!--') and stripped.endswith('-->') and '<!--[' not in stripped:
+            continue
+        opened = VERBATIM_OPEN_RE.search(stripped)
+        verbatim = bool(opened) and not VERBATIM_CLOSE_RE.search(stripped, opened.end())
+        # Trailing whitespace after an opening <pre> is part of its content
+        kept.append(line.lstrip() if verbatim else stripped)
+    return kept, verbatim
+
+
+def minify_html(fragments, sizes=None):
+    """Strip indentation, blank lines and whole-line comments from streamed HTML.
+
+    Line breaks are kept, so whitespace between inline elements renders
+    the same and inline scripts need no parsing; <pre> and <textarea>
+    contents pass through untouched.  If sizes is a dict, 'before' and
+    'after' are set to the UTF-8 byte counts in and out.
+    """
+    before = after = 0
+    pending = ''
+    verbatim = False
+    for fragment in fragments:
+        before += len(fragment.encode('utf-8'))
+        lines = (pending + fragment).split('\n')
+        pending = lines.pop()
+        kept, verbatim = _minify_lines(lines, verbatim)
+        if kept:
+            out = '\n'.join(kept) + '\n'
+            after += len(out.encode('utf-8'))
+            yield out
+    kept, _ = _minify_lines([pending], verbatim)
+    if kept:
+        after += len(kept[0].encode('utf-8'))
+        yield kept[0]
+    if sizes is not None:
+        sizes.update(before=before, after=after)
@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""Deep-sky object catalog (Messier, NGC, IC, Caldwell) from a compact binary file.
+
+sky_catalog.bin is written by make_sky_catalog.py.  Layout (little endian):
+
+  header   8s magic, u32 record count, u32 alias count, u32 names size
+  records  fixed RECORD_FORMAT entries, one per object
+  aliases  16s designation + u32 record index (e.g. C14 -> NGC869)
+  names    UTF-8 common names, addressed by (offset, length) from records
+
+Designations are stored normalised (see designation_key) so lookups are a
+single dict access.  The file is memory-mapped; records are unpacked only
+when asked for.  With NumPy installed, as_array() exposes the records as
+a zero-copy structured array for vectorised work.
+"""
+import mmap
+import os
+import re
+import struct
+from dataclasses import dataclass
+
+CATALOG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sky_catalog.bin')
+
+MAGIC = b'SKYCAT\x00\x02'
+HEADER_FORMAT = struct.Struct('<8sIII')
+# designation, RA (hours), Dec (degrees), type code, magnitude,
+# major/minor axis (arcmin), name offset, name length, constellation
+RECORD_FORMAT = struct.Struct('<16sddBfffIH3s')
+ALIAS_FORMAT = struct.Struct('<16sI')
+
+# Field layout of RECORD_FORMAT for as_array()
+RECORD_FIELDS = [
+    ('designation', 'S16'), ('ra', '<f8'), ('dec', '<f8'), ('type', 'u1'),
+    ('magnitude', '<f4'), ('major', '<f4'), ('minor', '<f4'),
+    ('name_offset', '<u4'), ('name_length', '<u2'), ('constellation', 'S3'),
+]
+
+# OpenNGC object types; the position in this tuple is the stored type code
+TYPES = ('', '*', '**', '*Ass', 'OCl', 'GCl', 'Cl+N', 'G', 'GPair', 'GTrpl', 'GGroup',
+         'PN', 'HII', 'DrkN', 'EmN', 'Neb', 'RfN', 'SNR', 'Nova', 'Other')
+
+TYPE_LABELS = {
+    '*': 'Star', '**': 'Double Star', '*Ass': 'Asterism', 'OCl': 'Open Cluster',
+    'GCl': 'Globular Cluster', 'Cl+N': 'Cluster with Nebula', 'G': 'Galaxy',
+    'GPair': 'Galaxy Pair', 'GTrpl': 'Galaxy Triplet', 'GGroup': 'Galaxy Group',
+    'PN': 'Planetary Nebula', 'HII': 'Emission Nebula', 'DrkN': 'Dark Nebula',
+    'EmN': 'Emission Nebula', 'Neb': 'Nebula', 'RfN': 'Reflection Nebula',
+    'SNR': 'Supernova Remnant', 'Nova': 'Nova', 'Other': 'Other',
+}
+
+# IAU abbreviation -> constellation name
+CONSTELLATIONS = {
+    'And': 'Andromeda', 'Ant': 'Antlia', 'Aps': 'Apus', 'Aqr': 'Aquarius', 'Aql': 'Aquila',
+    'Ara': 'Ara', 'Ari': 'Aries', 'Aur': 'Auriga', 'Boo': 'Boötes', 'Cae': 'Caelum',
+    'Cam': 'Camelopardalis', 'Cnc': 'Cancer', 'CVn': 'Canes Venatici', 'CMa': 'Canis Major',
+    'CMi': 'Canis Minor', 'Cap': 'Capricornus', 'Car': 'Carina', 'Cas': 'Cassiopeia',
+    'Cen': 'Centaurus', 'Cep': 'Cepheus', 'Cet': 'Cetus', 'Cha': 'Chamaeleon', 'Cir': 'Circinus',
+    'Col': 'Columba', 'Com': 'Coma Berenices', 'CrA': 'Corona Australis', 'CrB': 'Corona Borealis',
+    'Crv': 'Corvus', 'Crt': 'Crater', 'Cru': 'Crux', 'Cyg': 'Cygnus', 'Del': 'Delphinus',
+    'Dor': 'Dorado', 'Dra': 'Draco', 'Equ': 'Equuleus', 'Eri': 'Eridanus', 'For': 'Fornax',
+    'Gem': 'Gemini', 'Gru': 'Grus', 'Her': 'Hercules', 'Hor': 'Horologium', 'Hya': 'Hydra',
+    'Hyi': 'Hydrus', 'Ind': 'Indus', 'Lac': 'Lacerta', 'Leo': 'Leo', 'LMi': 'Leo Minor',
+    'Lep': 'Lepus', 'Lib': 'Libra', 'Lup': 'Lupus', 'Lyn': 'Lynx', 'Lyr': 'Lyra', 'Men': 'Mensa',
+    'Mic': 'Microscopium', 'Mon': 'Monoceros', 'Mus': 'Musca', 'Nor': 'Norma', 'Oct': 'Octans',
+    'Oph': 'Ophiuchus', 'Ori': 'Orion', 'Pav': 'Pavo', 'Peg': 'Pegasus', 'Per': 'Perseus',
+    'Phe': 'Phoenix', 'Pic': 'Pictor', 'Psc': 'Pisces', 'PsA': 'Piscis Austrinus', 'Pup': 'Puppis',
+    'Pyx': 'Pyxis', 'Ret': 'Reticulum', 'Sge': 'Sagitta', 'Sgr': 'Sagittarius', 'Sco': 'Scorpius',
+    'Scl': 'Sculptor', 'Sct': 'Scutum', 'Ser': 'Serpens', 'Sex': 'Sextans', 'Tau': 'Taurus',
+    'Tel': 'Telescopium', 'Tri': 'Triangulum', 'TrA': 'Triangulum Australe', 'Tuc': 'Tucana',
+    'UMa': 'Ursa Major', 'UMi': 'Ursa Minor', 'Vel': 'Vela', 'Vir': 'Virgo', 'Vol': 'Volans',
+    'Vul': 'Vulpecula',
+}
+
+DESIGNATION_RE = re.compile(r'([A-Z]+)0*(\d+)(.*)')
+TARGET_DESIGNATION_RE = re.compile(r'(ngc|ic|m|c)_?0*(\d+)(?![\d])', re.IGNORECASE)
+
+
+@dataclass(frozen=True)
+class SkyObject:
+    """One catalog object; magnitude and sizes are None when unknown."""
+    designation: str
+    name: str
+    type: str
+    ra: float            # hours, J2000
+    dec: float           # degrees, J2000
+    magnitude: float = None
+    major: float = None  # arcmin
+    minor: float = None
+    constellation: str = ''  # IAU abbreviation
+
+    @property
+    def type_label(self):
+        return TYPE_LABELS.get(self.type, self.type)
+
+    @property
+    def constellation_name(self):
+        return CONSTELLATIONS.get(self.constellation, self.constellation)
+
+
+def designation_key(text):
+    """Normalise 'NGC 0224', 'ngc224', 'M 31' to 'NGC224', 'M31'."""
+    key = text.upper().replace(' ', '').replace('_', '')
+    match = DESIGNATION_RE.fullmatch(key)
+    if match:
+        prefix, number, rest = match.groups()
+        key = f'{prefix}{int(number)}{rest}'
+    return key
+
+
+def target_designation(target_name):
+    """Catalog key for a target directory name ('ngc281_pacman' -> 'NGC281'), or None."""
+    match = TARGET_DESIGNATION_RE.match(target_name)
+    if not match:
+        return None
+    return f'{match.group(1).upper()}{int(match.group(2))}'
+
+
+def _unset(value):
+    # NaN marks an unknown float in the file; the rest are float32
+    return None if value != value else round(value, 2)
+
+
+class SkyCatalog:
+    """Read-only view of a sky_catalog.bin file."""
+
+    def __init__(self, path=CATALOG_PATH):
+        with open(path, 'rb') as f:
+            self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self._count, alias_count, _ = HEADER_FORMAT.unpack_from(self._data, 0)
+        if magic != MAGIC:
+            raise ValueError(f'{path} is not a sky catalog file')
+        self._records_at = HEADER_FORMAT.size
+        aliases_at = self._records_at + self._count * RECORD_FORMAT.size
+        self._names_at = aliases_at + alias_count * ALIAS_FORMAT.size
+
+        # designation -> record index; only the 16-byte keys are decoded here
+        size = RECORD_FORMAT.size
+        records = self._data[self._records_at:aliases_at]
+        self._index = {
+            records[at:at + 16].rstrip(b'\0').decode('ascii'): i
+            for i, at in enumerate(range(0, len(records), size))
+        }
+        for designation, i in ALIAS_FORMAT.iter_unpack(self._data[aliases_at:self._names_at]):
+            self._index.setdefault(designation.rstrip(b'\0').decode('ascii'), i)
+
+    def __len__(self):
+        return self._count
+
+    def __contains__(self, designation):
+        return designation_key(designation) in self._index
+
+    def _record(self, i):
+        (designation, ra, dec, type_code, magnitude, major, minor,
+         name_offset, name_length, constellation) = RECORD_FORMAT.unpack_from(
+            self._data, self._records_at + i * RECORD_FORMAT.size)
+        at = self._names_at + name_offset
+        return SkyObject(
+            designation=designation.rstrip(b'\0').decode('ascii'),
+            name=self._data[at:at + name_length].decode('utf-8'),
+            type=TYPES[type_code],
+            ra=ra,
+            dec=dec,
+            magnitude=_unset(magnitude),
+            major=_unset(major),
+            minor=_unset(minor),
+            constellation=constellation.rstrip(b'\0').decode('ascii'),
+        )
+
+    def get(self, designation):
+        """SkyObject for a designation ('M42', 'NGC 7000', 'C14'), or None."""
+        i = self._index.get(designation_key(designation))
+        return None if i is None else self._record(i)
+
+    def __iter__(self):
+        return (self._record(i) for i in range(self._count))
+
+    def as_array(self):
+        """All records as a zero-copy NumPy structured array (RECORD_FIELDS).
+
+        NumPy is imported here rather than at module level so that pages
+        which only need lookups do not pay for it.
+        """
+        import numpy as np
+        return np.frombuffer(self._data, dtype=np.dtype(RECORD_FIELDS), count=self._count,
+                             offset=self._records_at)
+
+
+_loaded = {}
+
+# Inputs below this many objects are laid out in plain Python; NumPy saves
+# about 1.3 us per object, which repays its import from about here on
+NUMPY_MIN_OBJECTS = 100_000
+
+
+def load_catalog(path=CATALOG_PATH):
+    """The SkyCatalog at path, opened once per process."""
+    if path not in _loaded:
+        _loaded[path] = SkyCatalog(path)
+    return _loaded[path]
+
+
+def lookup_target(target_name):
+    """SkyObject for a target directory name, or None if it is not cataloged."""
+    designation = target_designation(target_name)
+    if designation is None:
+        return None
+    return load_catalog().get(designation)
+
+
+def format_coordinates(ra, dec):
+    """'RA 5h35m, Dec -5°' from decimal hours and degrees."""
+    ra_h = int(ra)
+    ra_m = int((ra - ra_h) * 60)
+    dec_sign = '+' if dec >= 0 else ''
+    return f"RA {ra_h}h{ra_m}m, Dec {dec_sign}{int(dec)}°"
+
+
+def _numpy(count):
+    # NumPy is optional, and only worth importing for large inputs: the
+    # import alone (~0.15 s) outweighs what it saves on the RA chart's
+    # 110 Messier objects.  Without it the batch helpers use plain Python
+    if count < NUMPY_MIN_OBJECTS:
+        return None
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def ra_hour_columns(ra, dec):
+    """Indices of objects per RA hour (0-23), each column sorted north to south.
+
+    ra and dec are sequences (or arrays) of decimal hours and degrees.
+    Objects with equal declination keep their input order.  For large
+    inputs, with NumPy, this is one lexsort instead of 24 Python sorts.
+    """
+    np = _numpy(len(ra))
+    if np is None:
+        columns = [[] for _ in range(24)]
+        for i, hours in enumerate(ra):
+            columns[int(hours) % 24].append(i)
+        for column in columns:
+            column.sort(key=lambda i: dec[i], reverse=True)
+        return columns
+
+    ra = np.asarray(ra, dtype=np.float64)
+    dec = np.asarray(dec, dtype=np.float64)
+    hours = ra.astype(np.int64) % 24
+    # lexsort is stable: last key (hour) first, then descending Dec
+    order = np.lexsort((-dec, hours))
+    bounds = np.concatenate(([0], np.cumsum(np.bincount(hours, minlength=24))))
+    return [order[bounds[h]:bounds[h + 1]].tolist() for h in range(24)]
+
+
+def format_coordinates_batch(ra, dec):
+    """format_coordinates() for whole sequences of RA/Dec at once."""
+    np = _numpy(len(ra))
+    if np is None:
+        return [format_coordinates(r, d) for r, d in zip(ra, dec)]
+
+    ra = np.asarray(ra, dtype=np.float64)
+    dec = np.asarray(dec, dtype=np.float64)
+    ra_h = np.trunc(ra)
+    ra_m = np.trunc((ra - ra_h) * 60).astype(np.int64).tolist()
+    dec_d = np.trunc(dec).astype(np.int64).tolist()
+    signs = np.where(dec >= 0, '+', '').tolist()
+    return [f"RA {h}h{m}m, Dec {s}{d}°"
+            for h, m, s, d in zip(ra_h.astype(np.int64).tolist(), ra_m, signs, dec_d)]
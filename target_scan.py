@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""Single-pass scanner for the targets/ tree.
+
+Each target directory is walked once with os.scandir.  Raw subframe
+directories (lights/, process/) are pruned before descending, and every
+image file is parsed and classified into a selection tier as it is seen.
+Selection then scores each candidate once (see best_candidate): the tier
+dominates, then total integration time and recency of capture.
+"""
+import math
+import os
+from datetime import date
+
+from concurrent_scan import walk_concurrent
+from image_names import parse_image_name
+
+# Directories holding raw subframes / intermediate files; never descended into
+SKIP_DIRS = frozenset({'lights', 'process'})
+
+
+def is_candidate_image(name):
+    """True for .png/.jpg files that are not Seestar thumbnails."""
+    if not (name.endswith('.png') or name.endswith('.jpg')):
+        return False
+    return not (name.endswith('_thn.png') or name.endswith('_thn.jpg'))
+
+
+def list_directory(path):
+    """Return (image file names, subdirectory names) of one directory.
+
+    Both lists are sorted.  Pruned directories, thumbnails and broken
+    symlinks are already filtered out.  A missing directory lists as empty.
+    """
+    files = []
+    subdirs = []
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                name = entry.name
+                if entry.is_dir():
+                    if name.lower() not in SKIP_DIRS:
+                        subdirs.append(name)
+                # is_file() follows symlinks, so broken links drop out here
+                elif is_candidate_image(name) and entry.is_file():
+                    files.append(name)
+    except OSError:
+        pass
+    files.sort()
+    subdirs.sort()
+    return files, subdirs
+
+
+def iter_image_files(root, listing=None):
+    """Yield the path of every candidate image below root in a single walk.
+
+    Directories are visited in sorted order (files before subdirectories)
+    so tie-breaking in the selection logic is deterministic.  When a
+    listing ({dir path: (files, subdirs)}, see scan_manifest) is given it
+    is read instead of touching the filesystem.
+    """
+    stack = [os.fspath(root)]
+    while stack:
+        current = stack.pop()
+        if listing is not None:
+            files, subdirs = listing.get(current, ((), ()))
+        else:
+            files, subdirs = list_directory(current)
+
+        for name in files:
+            yield os.path.join(current, name)
+
+        # Push in reverse so subdirectories are popped in sorted order
+        stack.extend(os.path.join(current, d) for d in reversed(subdirs))
+
+
+def build_listing(root, concurrency=None):
+    """Walk root once and return {dir path: (files, subdirs)} for every directory.
+
+    With concurrency the directories are listed that many at a time (see
+    concurrent_scan.py); the result is the same.
+    """
+    listing = {}
+
+    def visit(current):
+        listing[current] = list_directory(current)
+        return [os.path.join(current, d) for d in listing[current][1]]
+
+    if concurrency:
+        walk_concurrent(root, visit, concurrency)
+    else:
+        stack = [os.fspath(root)]
+        while stack:
+            stack.extend(visit(stack.pop()))
+    return {path: listing[path] for path in sorted(listing)}
+
+
+def list_subdirs(path, listing=None):
+    """Sorted subdirectory paths of path, from the listing if given."""
+    path = os.fspath(path)
+    if listing is not None:
+        subdirs = listing.get(path, ((), ()))[1]
+    else:
+        subdirs = list_directory(path)[1]
+    return [os.path.join(path, d) for d in subdirs]
+
+
+# Selection tiers, best first.  With the default weights a candidate
+# never loses to one from a lower tier.
+TIER_SCORES = {
+    'dated_png': 4,    # name_YYYY-MM-DD.png
+    'exact_png': 3,    # png whose stem is the target name
+    'partial_png': 2,  # png whose stem overlaps the target name
+    'dated_jpg': 1,    # name_YYYY-MM-DD.jpg
+    'stacked_jpg': 0,  # Stacked_N_*.jpg
+}
+
+# score = tier * TIER_SCORES + integration * (seconds / longest in group)
+#         + recency * 0.5 ** (days older than newest / half-life)
+DEFAULT_WEIGHTS = {'tier': 10.0, 'integration': 1.0, 'recency': 1.0}
+RECENCY_HALF_LIFE_DAYS = 365
+
+
+def parse_weights(text):
+    """Weights from 'name=value,...' (e.g. 'tier=0,recency=2'), for --weights."""
+    weights = {}
+    for item in text.split(','):
+        if not item.strip():
+            continue
+        name, sep, value = item.partition('=')
+        name = name.strip()
+        if not sep or name not in DEFAULT_WEIGHTS:
+            raise ValueError(f'expected name=value with name one of {", ".join(DEFAULT_WEIGHTS)}: {item!r}')
+        weights[name] = float(value)
+        # NaN would make every score comparison false
+        if not math.isfinite(weights[name]):
+            raise ValueError(f'weight must be a finite number: {item!r}')
+    return weights
+
+# Seestar sub-exposure assumed when a stack name does not carry one
+DEFAULT_SUB_EXPOSURE = 10.0
+
+
+def new_candidate_index():
+    """Return an empty per-target candidate index: tier -> [(path, ImageName)]."""
+    return {tier: [] for tier in TIER_SCORES}
+
+
+def classify_image(index, target_name, path):
+    """Add one image path to the candidate index of target_name."""
+    parsed = parse_image_name(os.path.basename(path))
+    target_lower = target_name.lower()
+    # Only processed names carry an ISO date next to a title
+    dated = parsed.date is not None and parsed.stack_count is None and \
+        parsed.designation.lower() in target_lower
+
+    if parsed.ext == 'png':
+        if dated:
+            index['dated_png'].append((path, parsed))
+
+        stem = parsed.stem.lower()
+        if stem == target_lower:
+            index['exact_png'].append((path, parsed))
+        elif stem in target_lower or target_lower in stem:
+            index['partial_png'].append((path, parsed))
+        return
+
+    if dated:
+        index['dated_jpg'].append((path, parsed))
+
+    if parsed.stack_count:
+        index['stacked_jpg'].append((path, parsed))
+
+
+def index_target_dir(target_dir, target_name=None, listing=None):
+    """Scan one target directory and return its candidate index."""
+    if target_name is None:
+        target_name = os.path.basename(os.fspath(target_dir))
+    index = new_candidate_index()
+    for path in iter_image_files(target_dir, listing):
+        classify_image(index, target_name, path)
+    return index
+
+
+def integration_seconds(parsed):
+    """Total integration time of a stack (count x sub-exposure); 0 otherwise."""
+    if not parsed.stack_count:
+        return 0.0
+    return parsed.stack_count * (parsed.exposure or DEFAULT_SUB_EXPOSURE)
+
+
+def capture_day(parsed):
+    """Capture date as a day ordinal, or None if the name has no valid date."""
+    if parsed.date is None:
+        return None
+    try:
+        return date.fromisoformat(parsed.date).toordinal()
+    except ValueError:
+        return None
+
+
+def best_candidate(candidates, weights=None):
+    """Path of the best-scoring (tier, path, ImageName) candidate, or None.
+
+    Two passes over the candidates: one for the group's longest integration
+    and newest capture, one to score.  The first candidate wins ties.
+    """
+    weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+    facts = [(tier, path, integration_seconds(parsed), capture_day(parsed))
+             for tier, path, parsed in candidates]
+    if not facts:
+        return None
+
+    longest = max(seconds for _, _, seconds, _ in facts) or 1.0
+    newest = max((day for _, _, _, day in facts if day is not None), default=None)
+
+    best_score = None
+    best_path = None
+    for tier, path, seconds, day in facts:
+        score = weights['tier'] * TIER_SCORES[tier] + weights['integration'] * seconds / longest
+        if day is not None:
+            score += weights['recency'] * 0.5 ** ((newest - day) / RECENCY_HALF_LIFE_DAYS)
+        if best_score is None or score > best_score:
+            best_score = score
+            best_path = path
+    return best_path
+
+
+def usable_candidates(candidates, canonical=None, rejected=()):
+    """(tier, path, ImageName) candidates without duplicate copies or corrupt files.
+
+    canonical maps the path of a duplicate file to the copy kept (see
+    dedup.py).  A copy repeated within a tier is dropped; one whose name
+    puts it in another tier keeps that tier, so the best name still wins.
+    Paths in rejected (files that failed validation) are dropped.
+    """
+    canonical = canonical or {}
+    seen = set()
+    for tier, path, parsed in candidates:
+        path = canonical.get(path, path)
+        if path not in rejected and (tier, path) not in seen:
+            seen.add((tier, path))
+            yield tier, path, parsed
+
+
+def select_best_image(index, weights=None, canonical=None, rejected=()):
+    """Pick the best image from a candidate index, or None (see best_candidate).
+
+    Duplicates and rejected files are filtered first (see usable_candidates).
+    """
+    candidates = usable_candidates(((tier, path, parsed)
+                                    for tier, entries in index.items()
+                                    for path, parsed in entries), canonical, rejected)
+    return best_candidate(candidates, weights)
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""Thumbnail and srcset variant generation with a content-hash cache.
+
+Pages show small thumbnails (with width variants for srcset) and keep the
+full-resolution originals for the modal viewer.  Derivatives live in
+thumbs/ and are named after the SHA-256 of the source file, so an
+unchanged source is never encoded twice, whatever its path.  The
+digests come from the dedup hash cache and the dimensions from the
+header probe, both via the Catalog, so warm builds do not even re-read
+the originals.
+
+Encoding runs on a process pool (see run_encoders) with per-file timings.
+Pillow is optional: without it pages simply keep pointing at originals.
+"""
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+try:
+    from PIL import Image, ImageOps, features
+except ImportError:
+    Image = None
+
+THUMB_DIR = 'thumbs'
+
+# Thumbnail name -> (box, mode), at 2x the CSS size for high-DPI screens.
+# 'cover' scales the image down until it just covers the box, keeping the
+# whole frame; 'crop' then also crops it to the box; 'fit' (srcset
+# variants) scales it to fit inside.  The Seestar stacks are portrait
+# 1080x1920, so fitting them in a landscape box would leave them too narrow.
+THUMB_SIZES = {
+    # .target-image (300x180 object-fit: cover) / .image-container (400x250 contain)
+    'card': ((600, 500), 'cover'),
+    # RA chart .thumbnail (~120x80 object-fit: cover)
+    'chart': ((240, 160), 'crop'),
+}
+
+# srcset width variants for gallery cards; the original is always the
+# largest candidate, so "full" needs no derivative of its own
+VARIANT_WIDTHS = (320, 640, 1280)
+
+# Per-worker address-space cap for the encoding pool, and how many sources
+# a worker encodes before it is replaced by a fresh process
+WORKER_MEMORY_MB = 2048
+TASKS_PER_WORKER = 16
+
+
+def thumbnail_format():
+    """(Pillow format, file extension) used for thumbnails."""
+    if features.check('webp'):
+        return 'WEBP', 'webp'
+    return 'JPEG', 'jpg'
+
+
+def default_workers():
+    """Number of CPUs this process may actually run on."""
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def _init_worker(memory_limit_mb):
+    """Pool initializer: cap the address space of each encoding worker."""
+    if memory_limit_mb and resource is not None:
+        limit = memory_limit_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+def scaled_size(size, box, mode):
+    """Size an image of size is scaled to for a (box, mode) job; never enlarged."""
+    width, height = size
+    ratios = (box[0] / width, box[1] / height)
+    scale = min(1.0, min(ratios) if mode == 'fit' else max(ratios))
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def encode_derivatives(src, jobs, fmt):
+    """Decode src once and write each (dest, box, mode) job as a downscaled copy.
+
+    Runs inside a pool worker.  Returns (src, seconds, error message or None)
+    so one bad source never takes down the whole batch.
+    """
+    start = time.perf_counter()
+    try:
+        with Image.open(src) as im:
+            needed = [scaled_size(im.size, box, mode) for _, box, mode in jobs]
+            # Let the JPEG decoder downscale while decoding when it can
+            im.draft('RGB', max(needed, key=lambda s: s[0] * s[1]))
+            im = im.convert('RGB')
+        for (dest, box, mode), _ in sorted(zip(jobs, needed), key=lambda j: -j[1][0] * j[1][1]):
+            if mode == 'crop':
+                out = ImageOps.fit(im, box, Image.LANCZOS)
+            else:
+                out = im.resize(scaled_size(im.size, box, mode), Image.LANCZOS)
+            tmp_path = f'{dest}.{os.getpid()}.tmp'
+            out.save(tmp_path, fmt, quality=80)
+            os.replace(tmp_path, dest)
+    except (OSError, ValueError, MemoryError, Image.DecompressionBombError) as e:
+        return src, time.perf_counter() - start, f'{type(e).__name__}: {e}'
+    return src, time.perf_counter() - start, None
+
+
+def run_encoders(work, fmt, workers=None, memory_limit_mb=WORKER_MEMORY_MB):
+    """Encode {src: [(dest, box), ...]} and return results in sorted src order.
+
+    Uses a process pool unless workers is 1 or there is only one source.
+    Workers are recycled after a few tasks so fragmented decoder memory is
+    returned to the OS.
+    """
+    sources = sorted(work)
+    if workers is None:
+        workers = default_workers()
+    workers = max(1, min(workers, len(sources)))
+
+    if workers == 1:
+        return [encode_derivatives(src, work[src], fmt) for src in sources]
+
+    with ProcessPoolExecutor(max_workers=workers,
+                             initializer=_init_worker,
+                             initargs=(memory_limit_mb,),
+                             max_tasks_per_child=TASKS_PER_WORKER) as pool:
+        # map() yields in submission order, so output is deterministic
+        return list(pool.map(encode_derivatives, sources,
+                             [work[src] for src in sources], [fmt] * len(sources)))
+
+
+def report_timings(results, slowest=10):
+    """Print per-file encode timings, slowest first."""
+    if not results:
+        return
+    total = sum(seconds for _, seconds, _ in results)
+    print(f"Encoded {len(results)} sources in {total:.2f}s of worker time; slowest:")
+    for src, seconds, error in sorted(results, key=lambda r: -r[1])[:slowest]:
+        status = f"  FAILED ({error})" if error else ''
+        print(f"  {seconds * 1000:8.1f} ms  {src}{status}")
+
+
+def generate_derivatives(paths, digests, dimensions, sizes=THUMB_SIZES, widths=VARIANT_WIDTHS,
+                         thumb_dir=THUMB_DIR, workers=None, memory_limit_mb=WORKER_MEMORY_MB):
+    """Make sure every source in paths has its thumbnails and width variants.
+
+    digests ({path: SHA-256}, see dedup.cached_digests) name the files and
+    dimensions ({path: (width, height)}) decide which variants to build.
+    sizes are the fixed-box thumbnails ({name: ((w, h), mode)}); widths are the
+    srcset variants, only built when narrower than the source itself.
+    Missing files are encoded on a process pool of `workers` processes
+    (default: one per usable CPU), each limited to memory_limit_mb of
+    address space.
+
+    Returns (thumbnails, variants): {source: {size name: path}} and
+    {source: [(path, width), ...]} ending with the original at full width.
+    Sources that cannot be read or decoded are left out, so pages fall
+    back to the original for them.
+    """
+    if Image is None:
+        print("Pillow not installed; pages will reference original images")
+        return {}, {}
+
+    os.makedirs(thumb_dir, exist_ok=True)
+    fmt, ext = thumbnail_format()
+    thumbnails = {}
+    variants = {}
+    work = {}
+    scheduled = set()
+
+    def schedule(src, dest, box, mode):
+        # Identical sources share a digest; encode each derivative once
+        if dest not in scheduled and not os.path.exists(dest):
+            work.setdefault(src, []).append((dest, box, mode))
+            scheduled.add(dest)
+
+    for src in sorted(set(paths)):
+        if src not in digests or src not in dimensions:
+            print(f"Skipping thumbnails for {src}: not readable")
+            continue
+        digest, (width, _) = digests[src], dimensions[src]
+        stem = os.path.join(thumb_dir, digest[:20])
+
+        thumbs = {}
+        for size_name, (box, mode) in sizes.items():
+            # The spec is in the name, so changing it never reuses old files
+            dest = f'{stem}-{size_name}-{mode}{box[0]}x{box[1]}.{ext}'
+            schedule(src, dest, box, mode)
+            thumbs[size_name] = dest
+        thumbnails[src] = thumbs
+
+        srcset = []
+        for w in sorted(widths):
+            if w < width:
+                dest = f'{stem}-w{w}.{ext}'
+                schedule(src, dest, (w, w * 8), 'fit')
+                srcset.append((dest, w))
+        srcset.append((src, width))
+        variants[src] = srcset
+
+    results = run_encoders(work, fmt, workers, memory_limit_mb) if work else []
+    failed = set()
+    for src, _, error in results:
+        if error:
+            print(f"Skipping thumbnails for {src}: {error}")
+            failed.update(dest for dest, _, _ in work[src])
+    for src in list(thumbnails):
+        if failed.intersection(thumbnails[src].values()) or \
+                failed.intersection(dest for dest, _ in variants[src]):
+            del thumbnails[src]
+            del variants[src]
+
+    report_timings(results)
+    print(f"Derivatives: {len(thumbnails)} sources, {len(scheduled)} files encoded")
+    return thumbnails, variants
+
+
+def add_derivatives(catalog, workers=None, widths=VARIANT_WIDTHS):
+    """Build thumbnails and srcset variants for every image in catalog."""
+    catalog.thumbnails, catalog.variants = generate_derivatives(
+        catalog.image_paths(), catalog.digests, catalog.dimensions, widths=widths, workers=workers)
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""Feed mode: a thin page shell plus a JSON data file rendered on demand.
+
+Static pages bake every card into the HTML, so the DOM grows with the
+catalog.  In feed mode (build.py --feed) a generator instead writes its
+cards to a compact JSON feed next to the page, and the shell fetches it
+and keeps only the cards near the viewport in the DOM (VirtualRows
+below), so load time and memory stay flat as the catalog grows.
+
+Cards are stored as positional arrays (the feed's "fields" names them)
+with URLs already quoted, plus the search index from search_index.py.
+"""
+import json
+
+FEED_VERSION = 1
+
+
+def feed_path(output):
+    """Feed file written next to a page ('all_targets.html' -> 'all_targets.json')."""
+    return output.rsplit('.', 1)[0] + '.json'
+
+
+def feed_fragments(feed):
+    """The feed dict as compact JSON, in write_page() fragment form."""
+    yield json.dumps(dict(feed, version=FEED_VERSION), separators=(',', ':'), ensure_ascii=False)
+
+
+# Bundled into the shared site script (see site_assets.py)
+VIRTUAL_SCRIPT = """// Windowed rendering (see virtual_feed.py).  Rows are {height, render}
+// objects; only those within overscan pixels of the part of scroller
+// on screen exist in the DOM, absolutely positioned in container.
+function VirtualRows(container, scroller, overscan) {
+    this.container = container;
+    this.scroller = scroller;
+    this.overscan = overscan || 600;
+    this.rows = [];
+    this.offsets = [0];
+    this.shown = new Map();  // row index -> element
+    container.style.position = 'relative';
+
+    let queued = false;
+    const schedule = () => {
+        if (queued) return;
+        queued = true;
+        requestAnimationFrame(() => { queued = false; this.update(); });
+    };
+    scroller.addEventListener('scroll', schedule, {passive: true});
+    window.addEventListener('resize', schedule);
+}
+
+VirtualRows.prototype.setRows = function(rows) {
+    this.rows = rows;
+    this.offsets = [0];
+    rows.forEach((row, i) => this.offsets.push(this.offsets[i] + row.height));
+    this.container.style.height = this.offsets[rows.length] + 'px';
+    this.shown.forEach(element => element.remove());
+    this.shown.clear();
+    this.update();
+};
+
+// Index of the row covering y (pixels from the container top)
+VirtualRows.prototype.rowAt = function(y) {
+    let lo = 0, hi = this.rows.length - 1;
+    while (lo < hi) {
+        const mid = (lo + hi + 1) >> 1;
+        if (this.offsets[mid] <= y) lo = mid; else hi = mid - 1;
+    }
+    return lo;
+};
+
+VirtualRows.prototype.update = function() {
+    if (!this.rows.length) return;
+    const box = this.container.getBoundingClientRect();
+    const view = this.scroller === window
+        ? {top: 0, bottom: window.innerHeight}
+        : this.scroller.getBoundingClientRect();
+    const first = this.rowAt(view.top - box.top - this.overscan);
+    const last = this.rowAt(view.bottom - box.top + this.overscan);
+
+    this.shown.forEach((element, i) => {
+        if (i < first || i > last) {
+            element.remove();
+            this.shown.delete(i);
+        }
+    });
+    for (let i = first; i <= last; i++) {
+        if (this.shown.has(i)) continue;
+        const element = this.rows[i].render();
+        element.style.position = 'absolute';
+        element.style.top = this.offsets[i] + 'px';
+        element.style.left = '0';
+        element.style.right = '0';
+        this.container.appendChild(element);
+        this.shown.set(i, element);
+    }
+};
+
+// Element with a class and optional text
+function make(tag, className, text) {
+    const element = document.createElement(tag);
+    if (className) element.className = className;
+    if (text !== undefined) element.textContent = text;
+    return element;
+}
+"""
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""Filesystem watchers for build.py --watch.
+
+InotifyWatcher uses Linux inotify through ctypes; PollingWatcher is the
+portable fallback that compares directory mtimes on an interval.  Both
+report the set of paths that changed, and wait_for_batch() debounces a
+burst of events (a night's worth of stacks being copied in) into one
+rebuild.
+"""
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import time
+
+# inotify event bits (linux/inotify.h)
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+
+WATCH_MASK = (IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE |
+              IN_DELETE | IN_DELETE_SELF | IN_ATTRIB)
+
+EVENT_HEADER = struct.Struct('iIII')
+
+
+class InotifyWatcher:
+    """Recursive directory watcher on top of inotify(7)."""
+
+    def __init__(self):
+        libc_name = ctypes.util.find_library('c')
+        if libc_name is None:
+            raise OSError('libc not found')
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        if not hasattr(self._libc, 'inotify_init1'):
+            raise OSError('inotify is not available')
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        self._dirs = {}  # watch descriptor -> directory path
+        self._watched = set()
+
+    def watch_dirs(self, dirs):
+        """Start watching any directories in dirs not already watched."""
+        for path in dirs:
+            if path in self._watched:
+                continue
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(path), WATCH_MASK)
+            if wd < 0:
+                continue  # vanished, or out of watches; polling picks the rest up
+            self._dirs[wd] = path
+            self._watched.add(path)
+
+    def read_changes(self, timeout):
+        """Return the set of paths touched within timeout seconds (may be empty)."""
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return set()
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+
+        changed = set()
+        offset = 0
+        while offset + EVENT_HEADER.size <= len(data):
+            wd, mask, _, name_len = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = data[offset:offset + name_len].rstrip(b'\0')
+            offset += name_len
+
+            if mask & IN_Q_OVERFLOW:
+                # Events were dropped; report every watched directory
+                changed.update(self._watched)
+                continue
+            directory = self._dirs.get(wd)
+            if directory is None:
+                continue
+            if mask & IN_IGNORED:
+                self._watched.discard(self._dirs.pop(wd))
+                continue
+            path = os.path.join(directory, os.fsdecode(name)) if name else directory
+            changed.add(directory)
+            changed.add(path)
+        return changed
+
+    def close(self):
+        os.close(self._fd)
+
+
+class PollingWatcher:
+    """Portable fallback: compares directory mtimes every interval seconds."""
+
+    def __init__(self, interval=2.0):
+        self.interval = interval
+        self._mtimes = {}
+
+    def _stat(self, path):
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+    def watch_dirs(self, dirs):
+        for path in dirs:
+            if path not in self._mtimes:
+                self._mtimes[path] = self._stat(path)
+
+    def read_changes(self, timeout):
+        time.sleep(min(timeout, self.interval))
+        changed = set()
+        for path, mtime in list(self._mtimes.items()):
+            current = self._stat(path)
+            if current != mtime:
+                changed.add(path)
+                if current is None:
+                    del self._mtimes[path]
+                else:
+                    self._mtimes[path] = current
+        return changed
+
+    def close(self):
+        pass
+
+
+def make_watcher(poll_interval=2.0):
+    """inotify where available, otherwise a polling watcher."""
+    try:
+        return InotifyWatcher()
+    except (OSError, AttributeError):
+        return PollingWatcher(poll_interval)
+
+
+def wait_for_batch(watcher, debounce=2.0):
+    """Block until something changes, then until debounce seconds pass quietly.
+
+    Returns every path reported during the burst.
+    """
+    changed = set()
+    while not changed:
+        changed = watcher.read_changes(60.0)
+    while True:
+        more = watcher.read_changes(debounce)
+        if not more:
+            return changed
+        changed |= more